@@ -0,0 +1,129 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from PIL import ImageFont
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class FontRegistry:
+    """进程级字体注册表：按 (路径, 字号) 缓存 FreeTypeFont，并缓存字形外接框与前进宽度。
+
+    - 字体目录与候选字体路径只解析一次（首次使用时）
+    - 字体对象按 LRU 淘汰，最多保留 max_fonts 个；淘汰时一并丢弃其字形缓存
+    - Pillow 的文字测量/绘制在持有 GIL 时执行，多线程共享同一字体对象是安全的
+    """
+
+    CHINESE_FONTS = ("msyh.ttc", "simhei.ttf", "simsun.ttc")  # 微软雅黑 / 黑体 / 宋体
+    EMOJI_FONTS = ("seguiemj.ttf", "seguisym.ttf", "segoeui.ttf")  # Segoe UI Emoji / Symbol / UI
+
+    def __init__(self, max_fonts=32):
+        self.max_fonts = max(2, int(max_fonts))
+        self._lock = threading.RLock()
+        self._fonts = OrderedDict()  # (path, size) -> font
+        self._glyphs = {}  # id(font) -> ({char: bbox}, {char: advance})
+        self._paths = None  # role -> path 或 None
+
+    @staticmethod
+    def fonts_dir():
+        # 根据运行环境确定基础路径：EXE所在目录，或开发环境下项目根目录
+        if getattr(sys, 'frozen', False):
+            base_path = os.path.dirname(sys.executable)
+        else:
+            base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return os.path.join(base_path, "fonts")
+
+    def _resolve_paths(self):
+        fonts_dir = self.fonts_dir()
+        if not os.path.exists(fonts_dir):
+            os.makedirs(fonts_dir)
+            print(f"创建字体目录: {fonts_dir}")
+        paths = {}
+        for role, candidates in (('chinese', self.CHINESE_FONTS), ('emoji', self.EMOJI_FONTS)):
+            paths[role] = None
+            for name in candidates:
+                path = os.path.join(fonts_dir, name)
+                if not os.path.exists(path):
+                    continue
+                try:
+                    ImageFont.truetype(path, 12)
+                except Exception:
+                    continue
+                paths[role] = path
+                print(f"成功加载{role}字体: {path}")
+                break
+        if paths['chinese'] is None:
+            print("警告：无法加载中文字体，将使用默认字体")
+        if paths['emoji'] is None:
+            print("警告：无法加载emoji字体，将使用中文字体作为后备")
+        return paths
+
+    def path_for(self, role):
+        """返回角色（'chinese' / 'emoji'）对应的字体路径，找不到时为 None"""
+        with self._lock:
+            if self._paths is None:
+                self._paths = self._resolve_paths()
+            return self._paths.get(role)
+
+    def get(self, path, size):
+        """按 (path, size) 取字体；path 为 None 时返回 Pillow 默认字体"""
+        key = (path, int(size))
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is not None:
+                self._fonts.move_to_end(key)
+                return font
+        font = ImageFont.truetype(path, int(size)) if path else ImageFont.load_default()
+        with self._lock:
+            existing = self._fonts.get(key)
+            if existing is not None:
+                return existing
+            self._fonts[key] = font
+            self._glyphs[id(font)] = ({}, {})
+            while len(self._fonts) > self.max_fonts:
+                _, evicted = self._fonts.popitem(last=False)
+                self._glyphs.pop(id(evicted), None)
+        return font
+
+    def fonts(self, size):
+        """返回 {'chinese', 'emoji'} 字体对，emoji 字体缺失时回退到中文字体"""
+        chinese = self.get(self.path_for('chinese'), size)
+        emoji_path = self.path_for('emoji')
+        emoji = self.get(emoji_path, size) if emoji_path else chinese
+        return {'chinese': chinese, 'emoji': emoji}
+
+    def char_bbox(self, font, char):
+        """字形外接框 font.getbbox(char)，按字体缓存"""
+        glyphs = self._glyphs.get(id(font))
+        if glyphs is None:
+            return font.getbbox(char)
+        bbox = glyphs[0].get(char)
+        if bbox is None:
+            bbox = glyphs[0][char] = font.getbbox(char)
+        return bbox
+
+    def char_advance(self, font, char):
+        """字形前进宽度 font.getlength(char)，按字体缓存；排版时逐字累加即可得到行宽"""
+        glyphs = self._glyphs.get(id(font))
+        if glyphs is None:
+            return font.getlength(char)
+        advance = glyphs[1].get(char)
+        if advance is None:
+            advance = glyphs[1][char] = font.getlength(char)
+        return advance
+
+    def text_width(self, font, text):
+        return sum(self.char_advance(font, char) for char in text)
+
+    def clear(self):
+        with self._lock:
+            self._fonts.clear()
+            self._glyphs.clear()
+            self._paths = None
+
+
+font_registry = FontRegistry()
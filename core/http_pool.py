@@ -0,0 +1,96 @@
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config_manager import config
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class HttpPool:
+    """共享的HTTP连接池（keep-alive），供所有翻译引擎与网络客户端复用。
+
+    配置位于 [NETWORK]：
+    - http_pool_connections: 缓存的主机连接池数量
+    - http_pool_maxsize: 每个主机的默认连接数
+    - http_host_pool_sizes: 按主机覆盖连接数，如 {'translate.google.com': 8}
+    - http_connect_timeout / http_read_timeout: 默认连接/读取超时（秒）
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._session = None
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """按当前配置重建连接池，旧会话的连接随之关闭"""
+        pool_connections = int(config.get('NETWORK', 'HTTP_POOL_CONNECTIONS', 10))
+        pool_maxsize = int(config.get('NETWORK', 'HTTP_POOL_MAXSIZE', 8))
+        host_sizes = config.get('NETWORK', 'HTTP_HOST_POOL_SIZES', {})
+        self.connect_timeout = float(config.get('NETWORK', 'HTTP_CONNECT_TIMEOUT', 5))
+        self.read_timeout = float(config.get('NETWORK', 'HTTP_READ_TIMEOUT', 30))
+
+        session = requests.Session()
+        default_adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        session.mount('http://', default_adapter)
+        session.mount('https://', default_adapter)
+        if isinstance(host_sizes, dict):
+            for host, size in host_sizes.items():
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, int(size)))
+                session.mount(f'http://{host}', adapter)
+                session.mount(f'https://{host}', adapter)
+
+        with self._lock:
+            old, self._session = self._session, session
+        if old is not None:
+            try:
+                old.close()
+            except Exception:
+                pass
+        logger.info(f"HTTP连接池已就绪: pools={pool_connections}, maxsize={pool_maxsize}, "
+                    f"timeout=({self.connect_timeout}, {self.read_timeout})")
+
+    def timeout(self, read: Optional[float] = None):
+        """返回 (connect, read) 超时元组；read 为空时使用配置的默认值"""
+        return (self.connect_timeout, self.read_timeout if read is None else read)
+
+    def request(self, method: str, url: str, read_timeout: Optional[float] = None, **kwargs):
+        kwargs.setdefault('timeout', self.timeout(read_timeout))
+        with self._lock:
+            session = self._session
+        return session.request(method, url, **kwargs)
+
+    def get(self, url: str, read_timeout: Optional[float] = None, **kwargs):
+        return self.request('GET', url, read_timeout=read_timeout, **kwargs)
+
+    def post(self, url: str, read_timeout: Optional[float] = None, **kwargs):
+        return self.request('POST', url, read_timeout=read_timeout, **kwargs)
+
+    def close(self) -> None:
+        with self._lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+
+_shared_pool: Optional[HttpPool] = None
+_shared_lock = threading.Lock()
+
+
+def set_shared_pool(pool: HttpPool) -> None:
+    """注册进程级共享连接池（由 Translator 持有）"""
+    global _shared_pool
+    with _shared_lock:
+        _shared_pool = pool
+
+
+def get_shared_pool() -> HttpPool:
+    """获取共享连接池；若 Translator 尚未创建则按配置新建一个"""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = HttpPool()
+        return _shared_pool
@@ -1,6 +1,7 @@
 import cv2
 import numpy as np
 from PIL import ImageGrab
+from config_manager import config
 from .signals import COLOR_RGB2BGR
 
 # Optional fast screenshot backend
@@ -10,6 +11,60 @@ try:
 except Exception:
     MSS_AVAILABLE = False
 
+class ScreenCapture:
+    """一次截屏的原始像素缓冲区，按需切片转换。
+
+    mss 的 BGRA 缓冲区以零拷贝方式包装；选区预览按需缩小，
+    OCR只转换所选矩形，整屏BGR仅在确实需要时（如覆盖显示）才生成。
+    """
+
+    def __init__(self, pixels, color_code=None, left=0, top=0):
+        self.pixels = pixels  # HxWx4 (BGRA) 或 HxWx3 (RGB/BGR)
+        self.color_code = color_code  # 转为BGR的cv2颜色转换码，None表示已是BGR
+        self.left, self.top = int(left), int(top)  # 截屏左上角在虚拟屏幕中的位置
+        self.height, self.width = pixels.shape[:2]
+        self.shape = (self.height, self.width, 3)
+        self.preview_scale = 1.0
+        self._full_bgr = None
+
+    def _to_bgr(self, pixels):
+        if self.color_code is None:
+            return np.ascontiguousarray(pixels)
+        return cv2.cvtColor(pixels, self.color_code)
+
+    def region(self, x1, y1, x2, y2):
+        """返回指定矩形的全分辨率BGR图像（仅转换该区域）"""
+        x1, x2 = max(0, int(x1)), min(self.width, int(x2))
+        y1, y2 = max(0, int(y1)), min(self.height, int(y2))
+        if self._full_bgr is not None:
+            return self._full_bgr[y1:y2, x1:x2]
+        return self._to_bgr(self.pixels[y1:y2, x1:x2])
+
+    def preview(self, max_side=0):
+        """选区用的BGR预览；长边超过 max_side 时按比例缩小（记录在 preview_scale）"""
+        longest = max(self.width, self.height)
+        if max_side and longest > max_side:
+            self.preview_scale = float(max_side) / longest
+            size = (max(1, round(self.width * self.preview_scale)), max(1, round(self.height * self.preview_scale)))
+            return self._to_bgr(cv2.resize(self.pixels, size, interpolation=cv2.INTER_AREA))
+        self.preview_scale = 1.0
+        # 未缩小时预览即整屏BGR，顺便缓存供后续复用
+        return self.full_bgr()
+
+    def full_bgr(self):
+        """整屏BGR图像（首次调用时转换并缓存）"""
+        if self._full_bgr is None:
+            self._full_bgr = self._to_bgr(self.pixels)
+        return self._full_bgr
+
+    def to_capture_coords(self, x, y):
+        """把预览坐标换算为截屏（全分辨率）坐标"""
+        if self.preview_scale == 1.0:
+            return int(x), int(y)
+        return (min(self.width, int(round(x / self.preview_scale))),
+                min(self.height, int(round(y / self.preview_scale))))
+
+
 class ImageProcessor:
     def __init__(self, denoise_strength=10, contrast_alpha=1.3, contrast_beta=0):
         self.denoise_strength = denoise_strength
@@ -20,29 +75,55 @@ class ImageProcessor:
                                       [-1,-1,-1]], dtype=np.float32)
 
     def take_screenshot(self):
-        """Take a screenshot of the entire screen"""
+        """Take a screenshot of the entire screen
+
+        Returns:
+            (preview, capture): 选区用的BGR预览（大屏时按 [UI] selection_preview_max_side
+            缩小）与冻结的 ScreenCapture（按需切出全分辨率区域）
+        """
+        max_side = int(config.get('UI', 'selection_preview_max_side', 2560) or 0)
         try:
             if MSS_AVAILABLE:
                 with mss.mss() as sct:
                     monitor = sct.monitors[0]  # full virtual screen
                     sct_img = sct.grab(monitor)
-                    img = np.array(sct_img)  # BGRA
-                    screenshot_cv = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+                    # 直接包装 mss 的原始BGRA缓冲区，不复制、不整屏转换
+                    pixels = np.frombuffer(sct_img.raw, dtype=np.uint8).reshape(sct_img.height, sct_img.width, 4)
+                    capture = ScreenCapture(pixels, cv2.COLOR_BGRA2BGR, monitor['left'], monitor['top'])
             else:
                 # 使用PIL的ImageGrab获取屏幕截图
                 screenshot = ImageGrab.grab()
-                # 将PIL图像转换为numpy数组(OpenCV格式)
-                screenshot_cv = cv2.cvtColor(np.array(screenshot), COLOR_RGB2BGR)
+                capture = ScreenCapture(np.asarray(screenshot), COLOR_RGB2BGR)
             
-            print("截图成功")
-            return screenshot_cv, screenshot_cv  # 返回两个OpenCV格式的图像
+            preview = capture.preview(max_side)
+            print(f"截图成功: {capture.width}x{capture.height}, 预览缩放={capture.preview_scale:.2f}")
+            return preview, capture
         except Exception as e:
             print(f"截图过程中出错: {e}")
             import traceback
             traceback.print_exc()
             # 创建一个空白图像作为备用
             blank_image = np.zeros((100, 100, 3), dtype=np.uint8)
-            return blank_image, blank_image
+            return blank_image, ScreenCapture(blank_image)
+
+    def grab_region(self, rect, sct=None):
+        """只截取指定矩形 (left, top, width, height)，返回BGR图像；失败返回None
+
+        sct: 调用线程自己的 mss 实例（mss 实例不能跨线程共享）
+        """
+        left, top, width, height = (int(v) for v in rect)
+        if width <= 0 or height <= 0:
+            return None
+        try:
+            if MSS_AVAILABLE and sct is not None:
+                sct_img = sct.grab({'left': left, 'top': top, 'width': width, 'height': height})
+                pixels = np.frombuffer(sct_img.raw, dtype=np.uint8).reshape(sct_img.height, sct_img.width, 4)
+                return cv2.cvtColor(pixels, cv2.COLOR_BGRA2BGR)
+            screenshot = ImageGrab.grab(bbox=(left, top, left + width, top + height), all_screens=True)
+            return cv2.cvtColor(np.asarray(screenshot), COLOR_RGB2BGR)
+        except Exception as e:
+            print(f"区域截图出错: {e}")
+            return None
 
     def preprocess_image(self, image):
         """Enhance image quality for better OCR results"""
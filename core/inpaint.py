@@ -0,0 +1,103 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# 档位 -> (工作分辨率下允许的最大掩码像素数, 最多金字塔层数)
+INPAINT_TIERS = {
+    'fast': (15000, 4),
+    'balanced': (60000, 3),
+    'quality': (250000, 1),
+}
+_DENSE_MASK = 0.3  # 掩码占比超过该值视为大面积空洞
+
+
+class _CostModel:
+    """记录 cv2.inpaint 的实测耗时（秒 / (掩码像素 × 半径²)），用于按时间预算挑选金字塔层数"""
+
+    def __init__(self, initial=4e-8):
+        self._lock = threading.Lock()
+        self.rate = initial
+
+    def predict(self, pixels, radius):
+        return self.rate * pixels * radius * radius
+
+    def update(self, pixels, radius, seconds):
+        work = pixels * radius * radius
+        if work < 1000:
+            return
+        with self._lock:
+            self.rate = 0.7 * self.rate + 0.3 * (seconds / work)
+
+
+_cost = _CostModel()
+
+
+def _mask_bounds(mask, margin):
+    points = cv2.findNonZero(mask)
+    if points is None:
+        return None
+    x, y, w, h = cv2.boundingRect(points)
+    height, width = mask.shape[:2]
+    return (max(0, x - margin), max(0, y - margin),
+            min(width, x + w + margin), min(height, y + h + margin))
+
+
+def pyramid_inpaint(roi, mask, radius=3, tier='balanced', budget_ms=300):
+    """金字塔降采样修复：只在掩码外接框内、于缩小后的图上 inpaint，再把结果放大写回掩码像素。
+
+    - 掩码像素数超过档位上限、或按实测耗时预计超出 budget_ms 时逐级减半分辨率
+    - 稀疏笔画用 Telea；掩码占比高（大块空洞）时用 NS 并额外降一级，低频背景不损失细节
+    - 非掩码像素保持原样；返回 (新数组, 实际用时秒)
+    """
+    start = time.perf_counter()
+    out = roi.copy()
+    radius = max(1, int(radius))
+    bounds = _mask_bounds(mask, radius * 4)
+    if bounds is None:
+        return out, 0.0
+    x0, y0, x1, y1 = bounds
+    crop, crop_mask = roi[y0:y1, x0:x1], mask[y0:y1, x0:x1]
+
+    max_pixels, max_levels = INPAINT_TIERS.get(str(tier).lower(), INPAINT_TIERS['balanced'])
+    pixels = int(cv2.countNonZero(crop_mask))
+    density = pixels / float(crop_mask.size)
+    dense = density > _DENSE_MASK
+    budget = max(0.0, float(budget_ms)) / 1000.0
+
+    levels = 0
+    work_pixels = pixels
+    while levels < max_levels and min(crop.shape[:2]) >> (levels + 1) >= 16:
+        over_size = work_pixels > max_pixels
+        over_time = budget > 0 and _cost.predict(work_pixels, radius) > budget
+        if not (over_size or over_time):
+            break
+        levels += 1
+        work_pixels //= 4
+    if dense and levels < max_levels and min(crop.shape[:2]) >> (levels + 1) >= 16:
+        levels += 1
+
+    small, small_mask = crop, crop_mask
+    if levels:
+        # 图像与掩码用同一次按面积缩小：只要粗像素覆盖到任一掩码像素就属于掩码，
+        # 未被掩码的粗像素只由背景像素平均得到，笔画颜色不会渗入"已知"区域
+        size = (max(1, crop.shape[1] >> levels), max(1, crop.shape[0] >> levels))
+        small = cv2.resize(crop, size, interpolation=cv2.INTER_AREA)
+        small_mask = cv2.resize(crop_mask, size, interpolation=cv2.INTER_AREA)
+        small_mask = (small_mask > 0).astype(np.uint8) * 255
+    work_radius = max(2, radius >> levels) if levels else radius
+
+    flag = cv2.INPAINT_NS if dense else cv2.INPAINT_TELEA
+    t0 = time.perf_counter()
+    try:
+        filled = cv2.inpaint(small, small_mask, work_radius, flag)
+    except Exception:
+        filled = cv2.inpaint(small, small_mask, work_radius, cv2.INPAINT_NS)
+    _cost.update(int(cv2.countNonZero(small_mask)), work_radius, time.perf_counter() - t0)
+
+    if levels:
+        filled = cv2.resize(filled, (crop.shape[1], crop.shape[0]), interpolation=cv2.INTER_LINEAR)
+    region = out[y0:y1, x0:x1]
+    np.copyto(region, filled, where=(crop_mask > 0)[..., None] if region.ndim == 3 else crop_mask > 0)
+    return out, time.perf_counter() - start
@@ -0,0 +1,108 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+from utils.logger import get_logger
+from .translation_cache import TranslationCache
+
+logger = get_logger(__name__)
+
+
+def _popcount(value: int) -> int:
+    try:
+        return value.bit_count()
+    except AttributeError:  # Python < 3.10
+        return bin(value).count('1')
+
+
+class OCRResultCache:
+    """按截图内容哈希缓存OCR结果的LRU缓存。
+
+    - 精确匹配：区域像素 + 形状 + OCR配置签名的 blake2b 摘要
+    - 可选近似匹配：同尺寸区域的 dHash（64位）汉明距离不超过阈值
+    - 可选持久化：精确键写入 SQLite（复用 TranslationCache），重启后仍可命中
+    内存中保存完整结果对象（如 OCRResult），SQLite 只保存其文本（str(value)）。
+    """
+
+    def __init__(self, max_size: int = 128, perceptual: bool = False, dhash_threshold: int = 4,
+                 db_path: Optional[str] = None):
+        self.max_size = max(1, int(max_size))
+        self.perceptual = bool(perceptual)
+        self.dhash_threshold = max(0, int(dhash_threshold))
+        self._entries = OrderedDict()  # exact_key -> (shape, dhash, value)
+        self._lock = threading.Lock()
+        self._store = TranslationCache(db_path, self.max_size) if db_path else None
+
+    @staticmethod
+    def _as_array(image) -> np.ndarray:
+        if isinstance(image, Image.Image):
+            image = np.asarray(image)
+        return np.ascontiguousarray(image)
+
+    @staticmethod
+    def exact_key(array: np.ndarray, signature: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{array.shape}|{array.dtype.str}|{signature}".encode('utf-8'))
+        digest.update(array.data)
+        return digest.hexdigest()
+
+    @staticmethod
+    def dhash(array: np.ndarray) -> int:
+        """9x8灰度缩略图的水平差分哈希"""
+        gray = Image.fromarray(np.uint8(array)).convert('L').resize((9, 8), Image.BILINEAR)
+        pixels = np.asarray(gray, dtype=np.int16)
+        bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+        return int(''.join('1' if b else '0' for b in bits), 2)
+
+    def lookup(self, image, signature: str):
+        """返回 (缓存值或 None, token)；持久化命中时缓存值为文本。token 供未命中时 store() 使用"""
+        array = self._as_array(image)
+        key = self.exact_key(array, signature)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[2], (key, array.shape, None)
+        if self._store is not None:
+            text = self._store.get(key)
+            if text is not None:
+                self._remember(key, array.shape, None, text)
+                return text, (key, array.shape, None)
+        hash_value = None
+        if self.perceptual:
+            hash_value = self.dhash(array)
+            with self._lock:
+                for other_key, (shape, other_hash, value) in reversed(self._entries.items()):
+                    if (shape == array.shape and other_hash is not None
+                            and _popcount(hash_value ^ other_hash) <= self.dhash_threshold):
+                        self._entries.move_to_end(other_key)
+                        return value, (key, array.shape, hash_value)
+        return None, (key, array.shape, hash_value)
+
+    def store(self, token, value) -> None:
+        text = str(value) if value is not None else ""
+        if not text:
+            return
+        key, shape, hash_value = token
+        self._remember(key, shape, hash_value, value)
+        if self._store is not None:
+            self._store.put(key, text)
+
+    def _remember(self, key, shape, hash_value, value) -> None:
+        with self._lock:
+            self._entries[key] = (shape, hash_value, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def close(self) -> None:
+        if self._store is not None:
+            self._store.close()
@@ -3,24 +3,19 @@ import sys
 import threading
 import io
 import numpy as np
-from PIL import Image, ImageEnhance
+from PIL import Image
 import os
 import nest_asyncio
 from config_manager import config
 from utils.logger import get_logger
-import re
+from .ocr_layout import LayoutEngine
+from .ocr_result import OCRLine, OCRParagraph, OCRResult
 import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 logger = get_logger(__name__)
 
-# 添加sklearn导入
-try:
-    from sklearn.cluster import KMeans
-    SKLEARN_AVAILABLE = True
-except ImportError:
-    SKLEARN_AVAILABLE = False
-    print("警告: sklearn未安装，将使用简化的分段算法")
-
 # 添加PaddleOCR导入，使用try-except防止导入错误（输出真实异常以便排查打包问题）
 try:
     from paddleocr import PaddleOCR  # type: ignore
@@ -30,7 +25,7 @@ except Exception as e:  # ImportError 或其依赖的导入失败都会到这里
     print(f"警告: PaddleOCR导入失败（可能未安装或缺少依赖）: {e}")
 
 class OCRHandler:
-    def __init__(self):
+    def __init__(self, use_worker_pool=None, lazy=False, use_cache=True):
         self.ocr_errors = 0
         self.max_retries = config.get('OCR_TRANSLATION', 'MAX_RETRIES', 3)
         self.ocr_timeout = config.get('PADDLEOCR', 'OCR_TIMEOUT', 30)
@@ -40,8 +35,108 @@ class OCRHandler:
         self.debug = bool(config.get('PADDLEOCR', 'OCR_SHOW_LOG', False))
         # 允许嵌套使用事件循环
         nest_asyncio.apply()
-        # 初始化OCR引擎
-        self._initialize_ocr()
+        # 可选：常驻OCR进程池（[PADDLEOCR] ocr_worker_processes > 0），此时本进程不加载模型
+        self.worker_pool = None
+        self.ocr_engine = None
+        if use_worker_pool is None:
+            use_worker_pool = int(config.get('PADDLEOCR', 'OCR_WORKER_PROCESSES', 0)) > 0
+        self._use_worker_pool = use_worker_pool
+        # 就绪状态：lazy=True 时由 start_background_init() 在后台线程加载引擎
+        self._ready = threading.Event()
+        self._init_lock = threading.Lock()
+        self._init_thread = None
+        self.startup_timings = {}
+        # OCR结果缓存（按截图内容哈希），重复截图跳过检测与识别
+        self._use_cache = use_cache
+        self.ocr_cache = None
+        self._cache_signature = ""
+        self._setup_ocr_cache()
+        # 增量OCR（监视模式）：上一帧各文本框裁剪图哈希 -> (文本, 置信度)
+        self._incremental_lines = {}
+        if not lazy:
+            self._load_engine()
+
+    def _load_engine(self):
+        """加载OCR引擎（进程池或本进程PaddleOCR），完成后标记就绪"""
+        start = time.perf_counter()
+        try:
+            if self._use_worker_pool and PADDLEOCR_AVAILABLE:
+                from .ocr_worker_pool import OCRWorkerPool
+                self.worker_pool = OCRWorkerPool(int(config.get('PADDLEOCR', 'OCR_WORKER_PROCESSES', 0)))
+                # 进程刚启动时仍在导入并初始化PaddleOCR，等全部工作进程发回就绪消息后才算就绪
+                if not self.worker_pool.wait_ready():
+                    logger.error("OCR工作进程未全部就绪，首次识别可能超时")
+            else:
+                # 初始化OCR引擎
+                self._initialize_ocr()
+        finally:
+            self.startup_timings['total'] = time.perf_counter() - start
+            self._ready.set()
+            logger.info(f"OCR引擎就绪，用时 {self.startup_timings['total']:.2f}s")
+
+    @staticmethod
+    def _ocr_config_signature():
+        """影响OCR输出的配置项，作为缓存键的一部分"""
+        keys = [
+            ('PADDLEOCR', 'OCR_LANGUAGE', 'en'),
+            ('PADDLEOCR', 'OCR_USE_ANGLE_CLS', True),
+            ('PADDLEOCR', 'OCR_DYNAMIC_CLS', True),
+            ('PADDLEOCR', 'OCR_DROP_SCORE', 0.5),
+            ('PADDLEOCR', 'OCR_DET_DB_THRESH', 0.3),
+            ('PADDLEOCR', 'OCR_DET_DB_BOX_THRESH', 0.5),
+            ('PADDLEOCR', 'OCR_DET_LIMIT_SIDE_LEN', 960),
+            ('PADDLEOCR', 'OCR_MAX_TEXT_LENGTH', 50),
+            ('PADDLEOCR', 'OCR_MAX_INPUT_SIDE', 1600),
+            ('PADDLEOCR', 'OCR_TILED_MODE', False),
+            ('PADDLEOCR', 'OCR_TILE_SIZE', 960),
+            ('PADDLEOCR', 'OCR_TILE_OVERLAP', 96),
+            ('PADDLEOCR', 'OCR_ENABLE_EN_SPLIT', True),
+            ('IMAGE_PROCESSING', 'ENABLE_PREPROCESSING', True),
+            ('IMAGE_PROCESSING', 'DESKEW_ENABLED', True),
+        ]
+        return "|".join(str(config.get(section, key, default)) for section, key, default in keys)
+
+    def _setup_ocr_cache(self):
+        """按 [PADDLEOCR] ocr_cache_* 配置创建/更新OCR结果缓存"""
+        self._cache_signature = self._ocr_config_signature()
+        if not self._use_cache or not config.get('PADDLEOCR', 'OCR_CACHE_ENABLED', True):
+            if self.ocr_cache is not None:
+                self.ocr_cache.close()
+            self.ocr_cache = None
+            return
+        if self.ocr_cache is not None:
+            self.ocr_cache.close()
+        db_path = None
+        if config.get('PADDLEOCR', 'OCR_CACHE_PERSIST', False):
+            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            cache_dir = os.path.join(project_root, 'cache')
+            os.makedirs(cache_dir, exist_ok=True)
+            db_path = os.path.join(cache_dir, 'ocr_cache.db')
+        from .ocr_cache import OCRResultCache
+        self.ocr_cache = OCRResultCache(
+            max_size=int(config.get('PADDLEOCR', 'OCR_CACHE_SIZE', 128)),
+            perceptual=bool(config.get('PADDLEOCR', 'OCR_CACHE_PERCEPTUAL', False)),
+            dhash_threshold=int(config.get('PADDLEOCR', 'OCR_CACHE_DHASH_THRESHOLD', 4)),
+            db_path=db_path,
+        )
+
+    def start_background_init(self):
+        """在后台线程加载OCR引擎（重复调用无副作用）"""
+        with self._init_lock:
+            if self._ready.is_set() or self._init_thread is not None:
+                return
+            self._init_thread = threading.Thread(target=self._load_engine, name='ocr-init', daemon=True)
+            self._init_thread.start()
+
+    def is_ready(self):
+        """OCR引擎是否已加载完成"""
+        return self._ready.is_set()
+
+    def wait_until_ready(self, timeout=None):
+        """等待OCR引擎就绪；若尚未开始加载则立即开始"""
+        if not self._ready.is_set():
+            self.start_background_init()
+        return self._ready.wait(timeout)
 
     def _get_event_loop(self):
         """Get or create an event loop for the current thread"""
@@ -62,6 +157,7 @@ class OCRHandler:
             return
             
         try:
+            phase_start = time.perf_counter()
             # 从配置中读取OCR设置
             # 自动检测GPU可用性
             auto_use_gpu = config.get('PADDLEOCR', 'OCR_AUTO_USE_GPU', True)
@@ -101,6 +197,9 @@ class OCRHandler:
                 except Exception:
                     pass
             
+            self.startup_timings['device_detect'] = time.perf_counter() - phase_start
+            phase_start = time.perf_counter()
+
             # 优先使用本地模型目录（若存在）以避免重复下载并提升初始化速度
             project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
             det_dir_candidates = [
@@ -140,136 +239,178 @@ class OCRHandler:
             else:
                 logger.info("未检测到本地OCR模型目录，使用默认在线模型")
 
+            self.startup_timings['model_discovery'] = time.perf_counter() - phase_start
+            phase_start = time.perf_counter()
+
             # 初始化PaddleOCR引擎
             self.ocr_engine = PaddleOCR(**ocr_kwargs)
+            self.startup_timings['engine_construct'] = time.perf_counter() - phase_start
             logger.info(f"PaddleOCR初始化成功，语言：{lang}，GPU={use_gpu}, MKLDNN={enable_mkldnn}, rec_batch={rec_batch_num}")
+            logger.info("OCR初始化耗时: " + ", ".join(
+                f"{name}={seconds:.2f}s" for name, seconds in self.startup_timings.items()
+            ))
         except Exception as e:
             logger.error(f"PaddleOCR初始化失败: {e}")
             logger.error("程序将退出")
             sys.exit(1)
 
     @staticmethod
-    def _convert_to_pil_image(image):
-        """Convert various image formats to PIL Image"""
+    def _as_ocr_array(image):
+        """统一转为 uint8 的 RGB/灰度数组（PIL 图像只转换一次，数组尽量不复制）"""
+        if isinstance(image, Image.Image):
+            if image.mode not in ['RGB', 'L']:
+                image = image.convert('RGB')
+            return np.asarray(image)
         if isinstance(image, np.ndarray):
-            # Convert numpy array to PIL Image
-            return Image.fromarray(np.uint8(image))
-        elif isinstance(image, Image.Image):
-            return image
-        else:
-            raise ValueError(f"不支持的图像类型: {type(image)}")
+            array = image if image.dtype == np.uint8 else np.uint8(image)
+            if array.ndim == 3 and array.shape[2] == 4:
+                array = np.ascontiguousarray(array[:, :, :3])  # 丢弃alpha，与 PIL convert('RGB') 一致
+            elif array.ndim == 3 and array.shape[2] == 1:
+                array = array[:, :, 0]
+            return array
+        raise ValueError(f"不支持的图像类型: {type(image)}")
+
+    # PIL ImageFilter.SMOOTH 的卷积核，Sharpness 增强以它作为"退化图"
+    _SMOOTH_KERNEL = np.array([[1, 1, 1], [1, 5, 1], [1, 1, 1]], dtype=np.float32) / 13.0
+
+    @staticmethod
+    def _gray_mean(array):
+        """整图灰度均值（PIL convert('L') 的 ITU-R 601-2 权重），对比度 LUT 以它为中心"""
+        import cv2
+        if array.ndim == 3:
+            means = cv2.mean(array)
+            return means[0] * 0.299 + means[1] * 0.587 + means[2] * 0.114
+        return cv2.mean(array)[0]
+
+    @staticmethod
+    def _enhance_array(array, contrast=1.3, brightness=1.2, sharpness=1.5, mean=None):
+        """一次查表 + 一次卷积完成对比度/亮度/锐度增强，近似 PIL ImageEnhance 的 对比度→锐度→亮度 三连
+
+        - 对比度：按 PIL 语义向灰度均值混合 (x - mean) * contrast + mean
+        - 亮度：乘以 brightness；两者都是逐像素运算，合并为一张 256 项 LUT
+        - 锐度：PIL 为 smooth * (1 - s) + x * s，即卷积核 s*I + (1-s)*SMOOTH，放在 LUT 之后用一次 filter2D 完成
+        这只是近似，不是等价变换：PIL 每一步都截断到 [0,255] 并取整。把亮度提到锐化之前，
+        在不截断时与原顺序一致，但高光/暗部被截断后再锐化，结果就不同了（锐化的过冲被提前截掉或被放大）。
+        典型截图上平均差约 0.5，个别边缘像素差二十多；随机噪声图上最大差可达五十左右，
+        约三分之一像素差超过 2（见 utils/benchmark_preprocess.py）。差异集中在截断的边缘处，文字与背景的对比基本不变。
+        mean: 预先算好的灰度均值；分块处理时传入整图均值，使各块使用同一张 LUT
+        """
+        import cv2
+        if mean is None:
+            mean = OCRHandler._gray_mean(array)
+        mean = int(mean + 0.5)
+        levels = np.arange(256, dtype=np.float32)
+        lut = np.clip(((levels - mean) * contrast + mean) * brightness + 0.5, 0, 255).astype(np.uint8)
+        image = cv2.LUT(array, lut)
+        if abs(sharpness - 1.0) > 1e-6:
+            kernel = (1.0 - sharpness) * OCRHandler._SMOOTH_KERNEL
+            kernel[1, 1] += sharpness
+            image = cv2.filter2D(image, -1, kernel, borderType=cv2.BORDER_REPLICATE)
+        return image
 
     @staticmethod
-    def optimize_image_for_ocr(image):
-        """Optimize image for better OCR recognition"""
+    def optimize_image_for_ocr(image, resize=True, deskew=None, geometry=None):
+        """Optimize image for better OCR recognition
+
+        全程在 numpy 数组上完成（cv2.resize / LUT / filter2D），返回 uint8 数组。
+        resize=False / deskew=False keep the geometry unchanged (used by tiled OCR,
+        whose box coordinates must map back onto the source image).
+        geometry: 可选 dict；纠偏时写入 {'angle': 估计倾角, 'residual': 纠偏后剩余倾角}，
+        供 _decide_cls 复用，避免再做一次 Hough；另记录 'scale' (sx, sy) 与纠偏旋转矩阵
+        'rotation'，供 _boxes_to_source 把框坐标换算回原图。
+        """
+        import cv2
+        image = OCRHandler._as_ocr_array(image)
         try:
-            # Convert to PIL Image if needed
-            image = OCRHandler._convert_to_pil_image(image)
-            
-            # Ensure correct image mode
-            if image.mode not in ['RGB', 'L']:
-                image = image.convert('RGB')
-            
             # Adjust image size: scale up tiny regions and cap huge sides to reduce compute
-            min_height = 50
-            min_width = 200
-            max_side = int(config.get('PADDLEOCR', 'OCR_MAX_INPUT_SIDE', 1600))
-            current_width, current_height = image.size
-            scale_up = max(min_height/current_height, min_width/current_width, 1)
-            scale_down = min(1.0, max_side / max(current_width, current_height))
-            scale = scale_up * scale_down
-            if abs(scale - 1.0) > 1e-3:
-                new_width = max(1, int(current_width * scale))
-                new_height = max(1, int(current_height * scale))
-                image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            if resize:
+                min_height = 50
+                min_width = 200
+                max_side = int(config.get('PADDLEOCR', 'OCR_MAX_INPUT_SIDE', 1600))
+                current_height, current_width = image.shape[:2]
+                scale_up = max(min_height/current_height, min_width/current_width, 1)
+                scale_down = min(1.0, max_side / max(current_width, current_height))
+                scale = scale_up * scale_down
+                if abs(scale - 1.0) > 1e-3:
+                    new_width = max(1, int(current_width * scale))
+                    new_height = max(1, int(current_height * scale))
+                    # 缩小用 INTER_AREA（抗混叠且快），放大用 INTER_CUBIC
+                    interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+                    if geometry is not None:
+                        geometry['scale'] = (new_width / current_width, new_height / current_height)
+                    image = cv2.resize(image, (new_width, new_height), interpolation=interpolation)
             
             # 根据配置调整图像预处理
             enable_preprocessing = config.get('IMAGE_PROCESSING', 'ENABLE_PREPROCESSING', True)
+            if deskew is None:
+                deskew = config.get('IMAGE_PROCESSING', 'DESKEW_ENABLED', True)
             if enable_preprocessing:
-                # Optional deskew to improve OCR on rotated text
+                # Optional deskew to improve OCR on rotated text（倾角只估计一次）
                 try:
-                    if config.get('IMAGE_PROCESSING', 'DESKEW_ENABLED', True):
-                        image = OCRHandler._deskew_image(image)
+                    if deskew:
+                        angle = OCRHandler._estimate_rotation_angle(image)
+                        image = OCRHandler._deskew_image(image, angle, geometry)
+                        if geometry is not None:
+                            geometry['angle'] = angle
+                            geometry['residual'] = angle if abs(angle) < OCRHandler._DESKEW_MIN_ANGLE else 0.0
                 except Exception:
                     pass
-                # 增强对比度
-                contrast_alpha = config.get('IMAGE_PROCESSING', 'CONTRAST_ALPHA', 1.3)
-                enhancer = ImageEnhance.Contrast(image)
-                image = enhancer.enhance(contrast_alpha)
-                
-                # 增强锐度
-                enhancer = ImageEnhance.Sharpness(image)
-                image = enhancer.enhance(1.5)
-                
-                # 调整亮度
-                enhancer = ImageEnhance.Brightness(image)
-                image = enhancer.enhance(1.2)
+                # 对比度 + 锐度 + 亮度：一次 LUT + 一次 filter2D
+                contrast_alpha = float(config.get('IMAGE_PROCESSING', 'CONTRAST_ALPHA', 1.3))
+                image = OCRHandler._enhance_array(image, contrast=contrast_alpha, brightness=1.2, sharpness=1.5)
             
             return image
         except Exception as e:
             if logger:
                 logger.debug(f"图像优化失败: {str(e)}")
-            return OCRHandler._convert_to_pil_image(image)  # 返回原始图像作为PIL图像
+            return image  # 返回（已转换的）原始图像数组
+
+    # 倾角小于该值（度）时不做纠偏旋转
+    _DESKEW_MIN_ANGLE = 0.5
 
     @staticmethod
-    def _deskew_image(pil_img):
-        """Deskew a PIL image using edge-based angle estimation."""
+    def _deskew_image(img, angle=None, geometry=None):
+        """按倾角旋转纠偏；angle 为 None 时先做一次几何分析。实际旋转时把矩阵记入 geometry['rotation']。"""
         import cv2
-        import numpy as np
-        # Convert to grayscale
-        img = np.array(pil_img)
-        if img.ndim == 3:
-            gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = img
-        # Edge detection
-        edges = cv2.Canny(gray, 50, 150)
-        lines = cv2.HoughLines(edges, 1, np.pi / 180.0, 120)
-        angle = 0.0
-        if lines is not None and len(lines) > 0:
-            angles = []
-            for rho, theta in lines[:,0]:
-                a = theta
-                # Map angle to [-90, 90)
-                ang = (a * 180.0 / np.pi) - 90.0
-                if -45 <= ang <= 45:
-                    angles.append(ang)
-            if angles:
-                angle = float(np.median(angles))
-        if abs(angle) < 0.5:
-            return pil_img
+        img = np.asarray(img)
+        if angle is None:
+            angle = OCRHandler._estimate_rotation_angle(img)
+        if abs(angle) < OCRHandler._DESKEW_MIN_ANGLE:
+            return img
         # Rotate to deskew
-        (h, w) = gray.shape[:2]
+        (h, w) = img.shape[:2]
         center = (w // 2, h // 2)
         M = cv2.getRotationMatrix2D(center, angle, 1.0)
-        rotated = cv2.warpAffine(img, M, (w, h), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
-        return Image.fromarray(rotated)
+        if geometry is not None:
+            geometry['rotation'] = M
+        return cv2.warpAffine(img, M, (w, h), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
 
     @staticmethod
-    def _estimate_rotation_angle(pil_img, max_side=640):
-        """快速估计文本旋转角度（单位：度）。"""
+    def _estimate_rotation_angle(img, max_side=640):
+        """几何分析：在缩小的灰度图上用 Canny + Hough 估计文本旋转角度（单位：度）。
+
+        纠偏与角度分类共用这一次结果，不再在原分辨率上重复 Hough。
+        """
         try:
             import cv2
-            import numpy as np
-            img = np.array(pil_img)
+            img = np.asarray(img)
+            h, w = img.shape[:2]
+            scale = min(1.0, float(max_side) / max(h, w))
+            if scale < 1.0:
+                # 先缩小再转灰度，减少颜色转换的像素量
+                img = cv2.resize(img, (max(1, int(w*scale)), max(1, int(h*scale))), interpolation=cv2.INTER_AREA)
             if img.ndim == 3:
                 gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
             else:
                 gray = img
-            h, w = gray.shape[:2]
-            scale = min(1.0, float(max_side) / max(h, w))
-            if scale < 1.0:
-                gray = cv2.resize(gray, (int(w*scale), int(h*scale)), interpolation=cv2.INTER_AREA)
             edges = cv2.Canny(gray, 50, 150)
             lines = cv2.HoughLines(edges, 1, np.pi / 180.0, 120)
             if lines is None or len(lines) == 0:
                 return 0.0
-            angles = []
-            for rho, theta in lines[:,0]:
-                ang = (theta * 180.0 / np.pi) - 90.0
-                if -45 <= ang <= 45:
-                    angles.append(ang)
-            if not angles:
+            # Map angle to [-90, 90)，只保留 ±45° 内的近水平线
+            angles = lines[:, 0, 1] * (180.0 / np.pi) - 90.0
+            angles = angles[(angles >= -45) & (angles <= 45)]
+            if angles.size == 0:
                 return 0.0
             return float(np.median(angles))
         except Exception:
@@ -360,348 +501,78 @@ class OCRHandler:
         return result
 
     def perform_ocr(self, image):
-        """使用PaddleOCR对图像进行OCR识别"""
+        """使用PaddleOCR对图像进行OCR识别，返回分段后的文本"""
+        return self.perform_ocr_detailed(image).text
+
+    def perform_ocr_detailed(self, image):
+        """使用PaddleOCR对图像进行OCR识别，返回 OCRResult（行框、置信度、段落与全文）"""
         if not PADDLEOCR_AVAILABLE:
             print("错误: PaddleOCR未安装，无法执行OCR")
-            return ""
+            return OCRResult()
+
+        # 缓存命中无需等待引擎就绪
+        cached, token = self._cache_lookup(image)
+        if cached is not None:
+            logger.info("使用缓存的OCR结果")
+            return cached
+
+        if not self._ready.is_set():
+            # 引擎仍在后台加载：截图排队，就绪后立即识别
+            logger.info("OCR引擎尚未就绪，截图已排队等待")
+            self.wait_until_ready()
+
+        if self.worker_pool is not None:
+            if self._use_tiled(image):
+                # 大区域分块，各块分发到不同工作进程并行检测与识别
+                result = self._recognize_tiled(image)
+            else:
+                result = self.worker_pool.perform_ocr_detailed(image, timeout=self.ocr_timeout)
+        else:
+            result = self._recognize(image)
+        self._cache_store(token, result)
+        return result
+
+    def _cache_lookup(self, image):
+        """查OCR缓存，返回 (OCRResult 或 None, token)；持久化缓存只保存文本，命中时结果不含几何信息"""
+        cache = self.ocr_cache
+        if cache is None:
+            return None, None
+        try:
+            cached, token = cache.lookup(image, self._cache_signature)
+        except Exception as e:
+            logger.warning(f"OCR缓存查找失败: {e}")
+            return None, None
+        if cached is not None:
+            return (cached if isinstance(cached, OCRResult) else OCRResult.from_text(cached)), token
+        return None, token
+
+    def _cache_store(self, token, result):
+        if self.ocr_cache is not None and token is not None and result:
+            self.ocr_cache.store(token, result)
+
+    def _recognize(self, image):
+        """在本进程内执行检测+识别+分段，返回 OCRResult"""
+        if self.ocr_engine is None:
+            print("错误: OCR引擎初始化失败，无法执行OCR")
+            return OCRResult()
+        if self._use_tiled(image):
+            return self._recognize_tiled(image)
             
         try:
             with self._lock:
-                # 优化图像
-                image_opt = self.optimize_image_for_ocr(image)
-                
-                # 将PIL图像转换为numpy数组
-                if isinstance(image_opt, Image.Image):
-                    image_array = np.array(image_opt)
-                else:
-                    image_array = image_opt
+                # 优化图像（返回numpy数组），倾角只分析一次
+                geometry = {}
+                image_array = self.optimize_image_for_ocr(image, geometry=geometry)
                 
-                # 动态决定是否使用角度分类（速度与准确权衡）
-                dynamic_cls = bool(config.get('PADDLEOCR', 'OCR_DYNAMIC_CLS', True))
-                apply_cls = True
-                if dynamic_cls and config.get('PADDLEOCR', 'OCR_USE_ANGLE_CLS', True):
-                    angle = self._estimate_rotation_angle(image_opt)
-                    apply_cls = abs(angle) >= float(config.get('PADDLEOCR', 'OCR_CLS_MIN_ANGLE', 1.0))
-                    if self.debug:
-                        logger.info(f"估计旋转角度={angle:.2f}°, 应用角度分类={apply_cls}")
-                else:
-                    apply_cls = config.get('PADDLEOCR', 'OCR_USE_ANGLE_CLS', True)
+                apply_cls = self._decide_cls(image_array, geometry)
 
                 # 使用PaddleOCR进行OCR识别
                 result = self.ocr_engine.ocr(image_array, cls=apply_cls)
                 
-                # 处理OCR结果
-                text = ""
                 if self.debug:
                     print(f"PaddleOCR识别结果: {result}")
                 
-                if result is not None and len(result) > 0:
-                    # 保存识别到的各行文本及其位置信息
-                    text_lines = []
-                    
-                    # 根据PaddleOCR 2.6以上版本API调整结果解析方式
-                    for line_result in result:
-                        if not line_result:
-                            continue
-                            
-                        for item in line_result:
-                            if isinstance(item, list) and len(item) >= 2:
-                                coordinates = item[0]  # 坐标信息
-                                line_text = item[1][0]  # 文本内容在[1][0]
-                                confidence = item[1][1]  # 置信度在[1][1]
-                                if confidence > float(config.get('PADDLEOCR', 'OCR_DROP_SCORE', 0.5)):  # 只保留置信度超过阈值的结果
-                                    # 应用英文分词处理（可配置）
-                                    if bool(config.get('PADDLEOCR', 'OCR_ENABLE_EN_SPLIT', True)):
-                                        processed_text = self._split_english_text(line_text)
-                                    else:
-                                        processed_text = line_text
-                                    # 记录文本位置信息和内容
-                                    y_center = (coordinates[0][1] + coordinates[2][1]) / 2
-                                    text_lines.append((y_center, processed_text, coordinates))
-                    
-                    # 按y坐标排序
-                    text_lines.sort(key=lambda x: x[0])
-                    
-                    # 打印原始识别结果（调试）
-                    if self.debug:
-                        print("原始识别行:")
-                        for i, (y, text, _) in enumerate(text_lines):
-                            print(f"行{i+1}: y={y:.2f}, 文本: {text}")
-                    
-                    # 基于Y坐标的段落分段 - 直接使用OCR识别结果的位置信息
-                    # 分析Y坐标差异的分布，以便更智能地确定段落分隔阈值
-                    y_diffs = []  # 初始化y_diffs变量
-                    if len(text_lines) > 1:
-                        # 计算相邻行之间的Y坐标差异
-                        y_diffs = [text_lines[i+1][0] - text_lines[i][0] for i in range(len(text_lines)-1)]
-                        if self.debug:
-                            print(f"相邻行Y坐标差异: {', '.join([f'{diff:.2f}' for diff in y_diffs])}")
-                        
-                        # 根据行距的聚类识别段落
-                        # 先对行距进行排序
-                        sorted_diffs = sorted(y_diffs)
-                        
-                        # 如果至少有两个行距
-                        if len(sorted_diffs) >= 2:
-                            # 使用K-means聚类分析行距
-                            # 将行距分为两组：段落内行距和段落间行距
-                            
-                            try:
-                                # 判断是否有sklearn库
-                                if SKLEARN_AVAILABLE:
-                                    kmeans = KMeans(n_clusters=2, random_state=0).fit([[x] for x in sorted_diffs])
-                                    labels = kmeans.labels_
-                                    
-                                    # 分组
-                                    group_0 = [sorted_diffs[i] for i in range(len(sorted_diffs)) if labels[i] == 0]
-                                    group_1 = [sorted_diffs[i] for i in range(len(sorted_diffs)) if labels[i] == 1]
-                                    
-                                    # 确定哪个组是段落内行距（值较小的组）
-                                    if sum(group_0) / len(group_0) < sum(group_1) / len(group_1):
-                                        small_group = group_0
-                                        large_group = group_1
-                                    else:
-                                        small_group = group_1
-                                        large_group = group_0
-                                else:
-                                    # 如果没有sklearn，使用简化的分组方法
-                                    if self.debug:
-                                        print("使用简化的分组方法进行行距分析")
-                                    # 使用中位数作为分隔点
-                                    median_idx = len(sorted_diffs) // 2
-                                    small_group = sorted_diffs[:median_idx]
-                                    large_group = sorted_diffs[median_idx:]
-                                
-                                # 计算两组的中心点
-                                small_center = sum(small_group) / len(small_group)
-                                large_center = sum(large_group) / len(large_group) if large_group else float('inf')
-                                
-                                if self.debug:
-                                    print(f"聚类结果: 小组(段落内)={small_group}, 大组(段落间)={large_group}")
-                                    print(f"小组中心={small_center:.2f}, 大组中心={large_center:.2f}")
-                                
-                                # 3. 判断聚类结果是否有效
-                                if small_group and large_group and large_center > small_center * 1.3:
-                                    # 聚类有效，使用两组的中点作为阈值
-                                    paragraph_threshold = (small_center + large_center) / 2
-                                    if self.debug:
-                                        print(f"行距聚类: 段落内行距={small_center:.2f}, 段落间行距={large_center:.2f}, 阈值={paragraph_threshold:.2f}")
-                                else:
-                                    # 聚类无效，检查行距分布
-                                    avg_diff = sum(y_diffs) / len(y_diffs)
-                                    std_diff = (sum((diff - avg_diff) ** 2 for diff in y_diffs) / len(y_diffs)) ** 0.5
-                                    
-                                    # 如果行距标准差很小，考虑文本内容而不是立即判定为独立段落
-                                    if std_diff < avg_diff * 0.2 or not large_group:
-                                        # 不立即将paragraph_threshold设为极大值
-                                        # 改为设置为平均行距的两倍，后续会优先使用语义分析判断
-                                        paragraph_threshold = avg_diff * 2
-                                        if self.debug:
-                                            print(f"行距分布均匀，将优先使用语义分析判断段落，阈值设为{paragraph_threshold:.2f}")
-                                    else:
-                                        # 使用平均值作为阈值
-                                        paragraph_threshold = avg_diff * 1.3
-                                        if self.debug:
-                                            print(f"使用平均行距的1.3倍作为阈值: {paragraph_threshold:.2f}")
-                            except Exception as e:
-                                if self.debug:
-                                    print(f"聚类分析出错: {e}，使用简单阈值")
-                                # 使用简单阈值
-                                avg_diff = sum(y_diffs) / len(y_diffs)
-                                paragraph_threshold = avg_diff * 1.3
-                                if self.debug:
-                                    print(f"使用平均行距的1.3倍作为阈值: {paragraph_threshold:.2f}")
-                        else:
-                            # 只有一个行距，直接使用两倍作为阈值
-                            paragraph_threshold = sorted_diffs[0] * 2
-                            if self.debug:
-                                print(f"只有一个行距，使用两倍作为阈值: {paragraph_threshold:.2f}")
-                    else:
-                        # 只有一行文本，不需要分段
-                        paragraph_threshold = float('inf')
-                    
-                    # 基于Y坐标差异分组行
-                    y_based_paragraphs = []
-                    current_paragraph_lines = []
-                    
-                    # 如果设置为无穷大，表示每行需要单独分析
-                    if paragraph_threshold == float('inf'):
-                        # 这里将不再简单地返回独立段落，而是进行语义连贯性分析
-                        if self.debug:
-                            print("段落阈值设为无穷大，但仍将进行语义连贯性分析")
-                        # 重新设置一个较大的阈值，但不是无穷大，让后续分析能够进行
-                        paragraph_threshold = max(y_diffs) * 2 if y_diffs else 50
-                    
-                    # 增加基于内容的智能判断
-                    for i, (y_center, line_text, coords) in enumerate(text_lines):
-                        # 第一行总是新段落的开始
-                        if i == 0:  
-                            current_paragraph_lines.append(line_text)
-                            continue
-                            
-                        # 计算与前一行的Y坐标差异
-                        prev_y = text_lines[i-1][0]
-                        y_diff = y_center - prev_y
-                        prev_text = text_lines[i-1][1]
-                        
-                        # 特征检测：基于语法和格式特征判断是否为独立段落
-                        is_new_paragraph = False
-                        is_semantically_connected = False  # 确保变量在所有条件分支之前已初始化
-                        
-                        # 1. Y坐标差异大于阈值，可能是新段落
-                        if y_diff > paragraph_threshold:
-                            is_new_paragraph = True
-                            if self.debug:
-                                print(f"行{i+1}与上一行Y差异为{y_diff:.2f}，大于阈值{paragraph_threshold:.2f}，识别为新段落")
-                        
-                        # 2. 检测冒号格式的列表项或选项列表
-                        elif (re.match(r'^[A-Za-z][A-Za-z\s]*(AI|API)?(\s+\([^)]+\))?\s*[:：]', line_text) or  # 检测"Open AI:"等格式
-                              re.match(r'^[A-Za-z\s]+[:：]', line_text) or  # 简化的冒号格式
-                              (line_text.split() and ":" in line_text.split()[0])):  # 第一个词包含冒号
-                            is_new_paragraph = True
-                            if self.debug:
-                                print(f"行{i+1}被识别为冒号格式列表项，应为独立段落: {line_text}")
-                        
-                        # 3. 检查前一行是否为冒号格式的列表项，这通常意味着当前行应该是新段落
-                        elif prev_text and (":" in prev_text or "：" in prev_text):
-                            is_new_paragraph = True
-                            if self.debug:
-                                print(f"行{i+1}的前一行含有冒号，应为独立段落: {prev_text} -> {line_text}")
-                        
-                        # 4. 当前行或上一行以特定模式结束，可能是列表项
-                        elif (line_text.rstrip().endswith((':', '：', ' -', '...', '…', '♦', '•', '⦿', '◉', '◈', '▶'))
-                            or prev_text.rstrip().endswith((':', '：', ' -', '...', '…', '♦', '•', '⦿', '◉', '◈', '▶'))
-                            or re.match(r'^[\d]+\.\s+', line_text.strip()) # 数字编号开头，如 "1. "
-                            or re.match(r'^[A-Za-z]\.\s+', line_text.strip()) # 字母编号开头，如 "A. "
-                            or (prev_text.strip() and line_text.strip() and line_text[0].isupper() and 
-                                prev_text[-1] in ['.', '!', '?', '。', '！', '？'])):
-                            is_new_paragraph = True
-                            if self.debug:
-                                print(f"行{i+1}基于内容特征识别为新段落: {line_text}")
-                            
-                        # 5. 检测括号中的特定短语，如"click to expand"通常表示独立项
-                        elif re.search(r'\([^\)]*click[^\)]*\)', line_text.lower()) or re.search(r'\([^\)]*expand[^\)]*\)', line_text.lower()):
-                            is_new_paragraph = True
-                            if self.debug:
-                                print(f"行{i+1}包含展开提示，识别为独立项: {line_text}")
-                            
-                        # 6. 检测上下文连贯性
-                        else:
-                            # 获取前一行的最后一个单词和当前行的第一个单词
-                            prev_words = prev_text.split()
-                            current_words = line_text.split()
-                            
-                            # 首先检查段落语义连贯性
-                            is_semantically_connected = False
-                            
-                            if prev_words and current_words:
-                                # 首先检查特殊情况：明显的句子不完整情况
-                                # a. 前一行以连词、介词等结束
-                                connecting_words = ['a', 'an', 'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 
-                                                  'with', 'for', 'by', 'as', 'from', 'of', 'that', 'which', 'who']
-                                
-                                last_word = prev_words[-1].lower().rstrip(',.;:')
-                                if last_word in connecting_words:
-                                    is_semantically_connected = True
-                                    if self.debug:
-                                        print(f"行{i+1}与上一行存在明显连贯性(连接词): {prev_text} -> {line_text}")
-                                
-                                # b. 检查句子不完整: 没有结束标点且前一行不包含冒号
-                                elif not prev_text.rstrip()[-1] in ['.', '!', '?', '。', '！', '？', ';', '；', ':', '：'] and not (":" in prev_text or "：" in prev_text):
-                                    is_semantically_connected = True
-                                    if self.debug:
-                                        print(f"行{i+1}与上一行存在明显连贯性(不完整句子): {prev_text} -> {line_text}")
-                                
-                                # c. 当前行首字母小写（非专有名词），通常表示句子延续
-                                elif current_words[0][0].islower() and not re.match(r'^[a-z]+\.$', current_words[0]):
-                                    is_semantically_connected = True
-                                    if self.debug:
-                                        print(f"行{i+1}与上一行存在明显连贯性(小写开头): {prev_text} -> {line_text}")
-                                    
-                                # d. 检查技术文档特有的连贯性：如前一行结束词是技术词汇，当前行以技术词汇开始
-                                elif (re.search(r'(artificial|security|intelligence|testing|analysis)$', prev_text.lower()) and
-                                      re.search(r'^(intelligence|technologies|framework|system|engine|tool)', line_text.lower())):
-                                    is_semantically_connected = True
-                                    if self.debug:
-                                        print(f"行{i+1}与上一行存在技术内容连贯性: {prev_text} -> {line_text}")
-                                
-                                # e. 前一行以破折号、逗号结束
-                                elif prev_text.rstrip()[-1] in ['-', ',', '，']:
-                                    is_semantically_connected = True
-                                    if self.debug:
-                                        print(f"行{i+1}与上一行存在标点连贯性: {prev_text} -> {line_text}")
-                                
-                                # f. 前一行太短（通常不是完整句子）且不是标题格式
-                                elif len(prev_text.strip()) < 40 and not re.match(r'^[A-Z][a-z]+(\s+[A-Z][a-z]+)*$', prev_text.strip()):
-                                    # 检查是否符合标题模式（每个单词首字母大写）且不含冒号
-                                    if not all(w[0].isupper() for w in prev_text.split() if w and w[0].isalpha()) and not (":" in prev_text or "：" in prev_text):
-                                        is_semantically_connected = True
-                                        if self.debug:
-                                            print(f"行{i+1}与上一行可能连贯(前一行较短): {prev_text} -> {line_text}")
-                                
-                                # g. 检查明显的句子断开：前一行结束词与当前行开始词组合很常见
-                                last_two_words = " ".join(prev_words[-2:]) if len(prev_words) >= 2 else prev_words[-1] if prev_words else ""
-                                first_two_words = " ".join(current_words[:2]) if len(current_words) >= 2 else current_words[0] if current_words else ""
-                                combined_phrase = f"{last_two_words} {first_two_words}".lower()
-                                
-                                common_phrases = [
-                                    "artificial intelligence", "security testing", "information security", 
-                                    "cutting edge", "edge technologies", "security professionals", 
-                                    "who need", "need a", "a powerful", "flexible solution"
-                                ]
-                                
-                                for phrase in common_phrases:
-                                    if phrase in combined_phrase:
-                                        is_semantically_connected = True
-                                        if self.debug:
-                                            print(f"行{i+1}与上一行存在短语连贯性: '{phrase}' in '{combined_phrase}'")
-                                        break
-                        
-                        # 根据语义连贯性结果设置段落标志
-                        # 先定义默认值，防止在某些分支中没有定义导致错误
-                        is_semantically_connected = False if 'is_semantically_connected' not in locals() else is_semantically_connected
-                        
-                        if is_semantically_connected:
-                            is_new_paragraph = False
-                        # 如果Y差异小于阈值的70%且没有明确的段落特征，可能是同一段落内的换行
-                        elif y_diff < paragraph_threshold * 0.7 and not is_new_paragraph:
-                            is_new_paragraph = False
-                            if self.debug:
-                                print(f"行{i+1}与上一行Y差异小({y_diff:.2f})，视为同一段落: {prev_text} -> {line_text}")
-                        elif not is_new_paragraph:
-                            is_new_paragraph = True
-                            if self.debug:
-                                print(f"行{i+1}未检测到明显连贯性，识别为新段落: {line_text}")
-                    
-                        # 根据分段判断结果处理
-                        if is_new_paragraph:
-                            # 合并当前段落并开始新段落
-                            if current_paragraph_lines:
-                                paragraph_text = " ".join(current_paragraph_lines)
-                                y_based_paragraphs.append(paragraph_text)
-                                current_paragraph_lines = []
-                        
-                        # 添加当前行到段落
-                        current_paragraph_lines.append(line_text)
-                    
-                    # 添加最后一个段落
-                    if current_paragraph_lines:
-                        paragraph_text = " ".join(current_paragraph_lines)
-                        y_based_paragraphs.append(paragraph_text)
-                
-                # 输出基于Y坐标的段落分割结果
-                if self.debug:
-                    print(f"基于Y坐标分段得到{len(y_based_paragraphs)}个段落:")
-                    for i, p in enumerate(y_based_paragraphs):
-                        print(f"Y坐标段落{i+1}: {p}")
-                
-                # 使用Y坐标分段结果作为最终输出
-                raw_text = "\n\n".join(y_based_paragraphs)
-                
-                # 简单清理文本，但保留段落结构
-                return self.clean_text(raw_text)
-            
-            return ""
+                return self._build_result(result, geometry)
             
         except Exception as e:
             self.ocr_errors += 1
@@ -709,7 +580,519 @@ class OCRHandler:
                 print(f"OCR错误: {e}")
             import traceback
             traceback.print_exc()
+            return OCRResult()
+
+    def _decide_cls(self, image_opt, geometry=None):
+        """动态决定是否使用角度分类（速度与准确权衡）
+
+        geometry 中已有预处理阶段的倾角时直接复用，否则在缩小图上估计一次。
+        """
+        dynamic_cls = bool(config.get('PADDLEOCR', 'OCR_DYNAMIC_CLS', True))
+        apply_cls = True
+        if dynamic_cls and config.get('PADDLEOCR', 'OCR_USE_ANGLE_CLS', True):
+            if geometry and 'residual' in geometry:
+                angle = geometry['residual']
+            else:
+                angle = self._estimate_rotation_angle(image_opt)
+            apply_cls = abs(angle) >= float(config.get('PADDLEOCR', 'OCR_CLS_MIN_ANGLE', 1.0))
+            if self.debug:
+                logger.info(f"估计旋转角度={angle:.2f}°, 应用角度分类={apply_cls}")
+        else:
+            apply_cls = config.get('PADDLEOCR', 'OCR_USE_ANGLE_CLS', True)
+        return apply_cls
+
+    def reset_incremental(self):
+        """清空增量OCR保存的上一帧文本框"""
+        with self._lock:
+            self._incremental_lines = {}
+
+    def perform_ocr_incremental(self, image):
+        """监视模式的增量OCR：每帧重新检测文本框，只识别像素有变化的框
+
+        上一帧各文本框裁剪图的哈希与识别结果保存在 _incremental_lines，
+        未变化的框直接复用文字。哈希取自原始帧（框先换算回原图坐标），
+        不受整帧均值决定的对比度 LUT 影响。进程池模式或引擎不可用时退回完整识别。
+        """
+        if not PADDLEOCR_AVAILABLE:
+            print("错误: PaddleOCR未安装，无法执行OCR")
             return ""
+        if not self._ready.is_set():
+            self.wait_until_ready()
+        if self.worker_pool is not None or self.ocr_engine is None:
+            return self.perform_ocr(image)
+
+        try:
+            with self._lock:
+                geometry = {}
+                source = self._as_ocr_array(image)
+                image_array = self.optimize_image_for_ocr(source, geometry=geometry)
+                apply_cls = self._decide_cls(image_array, geometry)
+
+                boxes = self._detect_boxes(image_array)
+                source_boxes = self._boxes_to_source(boxes, geometry) if boxes else []
+
+                previous = self._incremental_lines
+                current = {}
+                recognized = [None] * len(boxes)
+                pending = []  # (box_index, key, crop)
+                for i, box in enumerate(boxes):
+                    crop = self._crop_box(image_array, box)
+                    raw = self._box_region(source, source_boxes[i])
+                    if crop is None or raw is None:
+                        continue
+                    digest = hashlib.blake2b(digest_size=16)
+                    digest.update(str(raw.shape).encode('ascii'))
+                    digest.update(raw.data)
+                    key = digest.hexdigest()
+                    hit = current.get(key) or previous.get(key)
+                    if hit is not None:
+                        recognized[i] = hit
+                        current[key] = hit
+                    else:
+                        pending.append((i, key, crop))
+
+                # 只把变化的文本框送入识别器（一次批量）
+                if pending:
+                    rec_lines = self._recognize_crops([crop for _, _, crop in pending], apply_cls)
+                    for (i, key, _), entry in zip(pending, rec_lines):
+                        recognized[i] = entry
+                        current[key] = entry
+                self._incremental_lines = current
+                if self.debug:
+                    print(f"增量OCR: 文本框{len(boxes)}个，复用{len(boxes) - len(pending)}个，重新识别{len(pending)}个")
+
+                result = [[[box, recognized[i]] for i, box in enumerate(boxes) if recognized[i] is not None]]
+                return self._build_result(result, geometry).text
+        except Exception as e:
+            self.ocr_errors += 1
+            if self.debug:
+                print(f"增量OCR错误: {e}")
+            import traceback
+            traceback.print_exc()
+            return ""
+
+    @staticmethod
+    def _use_tiled(image):
+        """大区域（超过 OCR_MAX_INPUT_SIDE）且开启 ocr_tiled_mode 时按原分辨率分块识别
+
+        只有启用OCR进程池（ocr_worker_processes > 0）时各块才并行；本进程内的引擎不能并发使用，
+        各块依次检测，只换来更高的识别分辨率，因此默认关闭。
+        """
+        if not config.get('PADDLEOCR', 'OCR_TILED_MODE', False):
+            return False
+        if isinstance(image, Image.Image):
+            width, height = image.size
+        else:
+            height, width = image.shape[:2]
+        return max(width, height) > int(config.get('PADDLEOCR', 'OCR_MAX_INPUT_SIDE', 1600))
+
+    @staticmethod
+    def _tile_starts(length, tile, step):
+        """覆盖 [0, length) 的分块起点；最后一块贴齐末端，保证每块都是完整尺寸"""
+        if length <= tile:
+            return [0]
+        starts = list(range(0, length - tile, step))
+        starts.append(length - tile)
+        return starts
+
+    @staticmethod
+    def _merge_tile_boxes(rects):
+        """合并相邻分块重叠区里的重复/被截断文本框。
+
+        同一行（垂直重叠 >= 较矮框高度的一半）且水平方向相交的框合并为外接矩形，
+        重复到不再有可合并的框为止。
+        """
+        rects = [list(r) for r in rects]
+        merged = True
+        while merged:
+            merged = False
+            result = []
+            for r in rects:
+                for m in result:
+                    overlap_y = min(r[3], m[3]) - max(r[1], m[1])
+                    min_h = max(1, min(r[3] - r[1], m[3] - m[1]))
+                    overlap_x = min(r[2], m[2]) - max(r[0], m[0])
+                    if overlap_y >= 0.5 * min_h and overlap_x > 0:
+                        m[0], m[1] = min(m[0], r[0]), min(m[1], r[1])
+                        m[2], m[3] = max(m[2], r[2]), max(m[3], r[3])
+                        merged = True
+                        break
+                else:
+                    result.append(r)
+            rects = result
+        return rects
+
+    def _recognize_tiled(self, image):
+        """按原分辨率分块识别大区域，避免缩小后小字无法识别
+
+        1. 按水平条带并行预处理（不缩放、不纠偏，几何保持不变）；对比度 LUT 以整图均值为中心，
+           锐化时每条带多带一行上下邻域，条带接缝处与整图一次处理的结果一致
+        2. 在重叠分块（[PADDLEOCR] ocr_tile_size / ocr_tile_overlap）上检测
+        3. 把各块的框映射回整图并合并重叠区的重复框
+        4. 从整图裁剪文本行，按 OCR_REC_BATCH_NUM 批量识别
+        启用OCR进程池时，预处理结果写入一份共享内存，第2步各块与第4步各组文本框分发到不同工作进程
+        并行执行；本进程内只有一个引擎，各块在锁内依次检测。峰值内存约为原图+预处理图各一份，分块只是视图。
+        """
+        try:
+            array = self._as_ocr_array(image)
+            if self.worker_pool is not None:
+                return self._recognize_tiled_pool(array)
+            prepared = self._prepare_tiled(array)
+            height, width = prepared.shape[:2]
+            with self._lock:
+                apply_cls = self._decide_cls(prepared)
+                rects = []
+                for rect in self._tile_rects(height, width):
+                    rects.extend(self._detect_tile(prepared, rect))
+                boxes = self._merged_tile_boxes(rects)
+                if self.debug:
+                    print(f"分块OCR: {width}x{height}, 检测框{len(rects)}个，合并后{len(boxes)}个")
+                entries = self._recognize_boxes(prepared, boxes, apply_cls)
+                return self._build_result([entries])
+        except Exception as e:
+            self.ocr_errors += 1
+            if self.debug:
+                print(f"分块OCR错误: {e}")
+            import traceback
+            traceback.print_exc()
+            return OCRResult()
+
+    def _recognize_tiled_pool(self, array):
+        """分块识别的进程池版本：各块检测、各组文本框识别分别并行分发，共用一个超时期限"""
+        pool = self.worker_pool
+        pool.wait_ready()
+        height, width = array.shape[:2]
+        shm, prepared = pool.share(array.shape)
+        try:
+            self._prepare_tiled(array, out=prepared)
+            apply_cls = self._decide_cls(prepared)
+            deadline = time.monotonic() + float(self.ocr_timeout)
+
+            futures = [pool.submit_shared(shm, prepared, ('detect', rect)) for rect in self._tile_rects(height, width)]
+            rects = [rect for part in self._gather_pool(futures, deadline) for rect in (part or [])]
+            boxes = self._merged_tile_boxes(rects)
+            if self.debug:
+                print(f"分块OCR（进程池）: {width}x{height}, {len(futures)}块, 检测框{len(rects)}个，合并后{len(boxes)}个")
+
+            # 文本框按工作进程数分组，每组在进程内再按 OCR_REC_BATCH_NUM 分批识别
+            batch_size = max(1, int(config.get('PADDLEOCR', 'OCR_REC_BATCH_NUM', 6)))
+            group = max(batch_size, -(-len(boxes) // pool.processes))
+            futures = [pool.submit_shared(shm, prepared, ('recognize', boxes[i:i + group], apply_cls))
+                       for i in range(0, len(boxes), group)]
+            entries = [entry for part in self._gather_pool(futures, deadline) for entry in (part or [])]
+            return self._build_result([entries])
+        finally:
+            del prepared
+            pool.unshare(shm)
+
+    def _gather_pool(self, futures, deadline):
+        """按共同期限收集进程池子任务结果；超时的任务被放弃，对应结果为 None"""
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except FutureTimeoutError:
+                logger.error(f"OCR工作进程分块任务超时（{self.ocr_timeout}s），该部分结果为空")
+                self.worker_pool.discard(future)
+                results.append(None)
+        return results
+
+    def run_tile_op(self, image, op):
+        """执行进程池分配的分块子任务（在工作进程内调用），op 见 OCRWorkerPool.submit_shared"""
+        with self._lock:
+            if op[0] == 'detect':
+                return self._detect_tile(image, op[1])
+            if op[0] == 'recognize':
+                return self._recognize_boxes(image, op[1], op[2])
+        raise ValueError(f"未知的分块任务: {op[0]!r}")
+
+    def _prepare_tiled(self, array, out=None):
+        """分块识别的预处理：按水平条带并行增强，写入 out（默认新建），未开启预处理时原样返回或复制"""
+        height = array.shape[0]
+        tile = self._tile_size()[0]
+        if not config.get('IMAGE_PROCESSING', 'ENABLE_PREPROCESSING', True):
+            if out is None:
+                return array
+            out[...] = array
+            return out
+        workers = int(config.get('PADDLEOCR', 'OCR_TILE_WORKERS', 0)) or max(1, min(4, os.cpu_count() or 1))
+        contrast_alpha = float(config.get('IMAGE_PROCESSING', 'CONTRAST_ALPHA', 1.3))
+        mean = self._gray_mean(array)
+        prepared = np.empty_like(array) if out is None else out
+
+        def enhance_strip(span):
+            y0, y1 = span
+            top, bottom = max(0, y0 - 1), min(height, y1 + 1)
+            strip = self._enhance_array(array[top:bottom], contrast=contrast_alpha, brightness=1.2,
+                                        sharpness=1.5, mean=mean)
+            prepared[y0:y1] = strip[y0 - top:y0 - top + (y1 - y0)]
+
+        strips = [(y, min(height, y + tile)) for y in range(0, height, tile)]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ocr-tile') as pool:
+            list(pool.map(enhance_strip, strips))
+        return prepared
+
+    @staticmethod
+    def _tile_size():
+        """(块边长, 重叠像素)，来自 [PADDLEOCR] ocr_tile_size / ocr_tile_overlap"""
+        tile = max(256, int(config.get('PADDLEOCR', 'OCR_TILE_SIZE', 960)))
+        overlap = min(tile // 2, max(0, int(config.get('PADDLEOCR', 'OCR_TILE_OVERLAP', 96))))
+        return tile, overlap
+
+    def _tile_rects(self, height, width):
+        """覆盖整图的重叠分块 (x0, y0, x1, y1)"""
+        tile, overlap = self._tile_size()
+        step = tile - overlap
+        return [(tx, ty, min(width, tx + tile), min(height, ty + tile))
+                for ty in self._tile_starts(height, tile, step)
+                for tx in self._tile_starts(width, tile, step)]
+
+    def _detect_tile(self, image_array, rect):
+        """检测一块，返回映射回整图坐标的外接矩形列表（调用方持有 self._lock）"""
+        tx, ty, x1, y1 = rect
+        rects = []
+        for box in self._detect_boxes(image_array[ty:y1, tx:x1]):
+            pts = np.asarray(box, dtype=np.float32)
+            rects.append((
+                tx + float(pts[:, 0].min()), ty + float(pts[:, 1].min()),
+                tx + float(pts[:, 0].max()), ty + float(pts[:, 1].max())
+            ))
+        return rects
+
+    def _merged_tile_boxes(self, rects):
+        """合并各块重叠区的重复框，返回四点框"""
+        return [[[x0, y0], [x1, y0], [x1, y1], [x0, y1]] for x0, y0, x1, y1 in self._merge_tile_boxes(rects)]
+
+    def _recognize_boxes(self, image_array, boxes, apply_cls):
+        """从整图裁剪并批量识别文本框，返回 PaddleOCR 结果格式的 [框, (文本, 置信度)]（调用方持有 self._lock）"""
+        crops, kept = [], []
+        for box in boxes:
+            crop = self._crop_box(image_array, box)
+            if crop is not None:
+                crops.append(crop)
+                kept.append(box)
+        recognized = self._recognize_crops(crops, apply_cls) if crops else []
+        return [[box, entry] for box, entry in zip(kept, recognized)]
+
+    def _detect_boxes(self, image_array):
+        """只运行文本检测，返回四点框列表"""
+        detected = self.ocr_engine.ocr(image_array, det=True, rec=False, cls=False)
+        return detected[0] if detected and detected[0] else []
+
+    @staticmethod
+    def _box_region(image_array, box):
+        """四点框外接矩形内的原图像素（连续内存），只用于计算增量OCR的指纹，空区域返回None"""
+        h, w = image_array.shape[:2]
+        pts = np.asarray(box, dtype=np.float32)
+        x0, x1 = max(0, int(pts[:, 0].min())), min(w, int(np.ceil(pts[:, 0].max())))
+        y0, y1 = max(0, int(pts[:, 1].min())), min(h, int(np.ceil(pts[:, 1].max())))
+        region = np.ascontiguousarray(image_array[y0:y1, x0:x1])
+        return region if region.size else None
+
+    @staticmethod
+    def _crop_box(image_array, box):
+        """按四点框透视裁剪并拉正文本行（同 PaddleOCR 的 get_rotate_crop_image），空区域返回None
+
+        倾斜的行不会带入相邻行的像素；竖长的行旋转90°；灰度图转为三通道，识别器只接受三通道输入。
+        """
+        import cv2
+        h, w = image_array.shape[:2]
+        points = np.asarray(box, dtype=np.float32).reshape(4, 2)
+        if (points[:, 0].max() <= 0 or points[:, 1].max() <= 0
+                or points[:, 0].min() >= w or points[:, 1].min() >= h):
+            return None
+        crop_w = int(max(np.linalg.norm(points[0] - points[1]), np.linalg.norm(points[2] - points[3])))
+        crop_h = int(max(np.linalg.norm(points[0] - points[3]), np.linalg.norm(points[1] - points[2])))
+        if crop_w < 1 or crop_h < 1:
+            return None
+        target = np.float32([[0, 0], [crop_w, 0], [crop_w, crop_h], [0, crop_h]])
+        matrix = cv2.getPerspectiveTransform(points, target)
+        crop = cv2.warpPerspective(image_array, matrix, (crop_w, crop_h),
+                                   borderMode=cv2.BORDER_REPLICATE, flags=cv2.INTER_CUBIC)
+        if crop_h >= 1.5 * crop_w:
+            crop = np.rot90(crop)
+        if crop.ndim == 2:
+            crop = cv2.cvtColor(crop, cv2.COLOR_GRAY2BGR)
+        return np.ascontiguousarray(crop)
+
+    def _recognize_crops(self, crops, apply_cls):
+        """识别文本行裁剪图，按 OCR_REC_BATCH_NUM 分批，返回 [(文本, 置信度)]"""
+        batch_size = max(1, int(config.get('PADDLEOCR', 'OCR_REC_BATCH_NUM', 6)))
+        results = []
+        for start in range(0, len(crops), batch_size):
+            chunk = crops[start:start + batch_size]
+            # 外层列表被 PaddleOCR 当作"多张图片"逐张处理（且受 page_num 截断），
+            # 把整批裁剪图包成一张"图片"才会一次送入识别器，结果在 rec[0] 中一一对应
+            rec = self.ocr_engine.ocr([chunk], det=False, rec=True, cls=apply_cls)
+            rec_lines = rec[0] if rec and rec[0] else []
+            # 识别失败的行以空文本占位，保持与输入一一对应
+            rec_lines = list(rec_lines) + [("", 0.0)] * (len(chunk) - len(rec_lines))
+            results.extend((res[0], float(res[1])) for res in rec_lines)
+        return results
+
+    def perform_ocr_batch(self, regions):
+        """一次识别多个区域
+
+        先逐区域查OCR缓存，只识别未命中的区域。每个区域单独做预处理与文本检测，
+        所有区域的文本行裁剪图汇总后按 OCR_REC_BATCH_NUM 组成共享的识别批次。
+        返回与 regions 一一对应的 OCRResult 列表，框坐标位于各自区域的原图中。
+        进程池模式下各区域并行提交，共用一个 OCR_TIMEOUT 期限，超时的区域返回空结果。
+        """
+        if not regions:
+            return []
+        if not PADDLEOCR_AVAILABLE:
+            print("错误: PaddleOCR未安装，无法执行OCR")
+            return [OCRResult() for _ in regions]
+
+        results, tokens = [], []
+        for region in regions:
+            cached, token = self._cache_lookup(region)
+            results.append(cached)
+            tokens.append(token)
+        misses = [i for i, result in enumerate(results) if result is None]
+        if self.debug and len(misses) < len(regions):
+            print(f"批量OCR: {len(regions) - len(misses)}个区域命中缓存")
+        if misses:
+            if not self._ready.is_set():
+                self.wait_until_ready()
+            recognized = self._recognize_batch([regions[i] for i in misses])
+            for i, result in zip(misses, recognized):
+                results[i] = result
+                self._cache_store(tokens[i], result)
+        return results
+
+    def _recognize_batch(self, regions):
+        """perform_ocr_batch 中未命中缓存的区域：进程池并行提交，或在本进程内共享识别批次"""
+        if self.worker_pool is not None:
+            self.worker_pool.wait_ready()
+            futures = [self.worker_pool.submit(region) for region in regions]
+            deadline = time.monotonic() + float(self.ocr_timeout)
+            results = []
+            for future in futures:
+                try:
+                    results.append(future.result(timeout=max(0.0, deadline - time.monotonic())) or OCRResult())
+                except FutureTimeoutError:
+                    logger.error(f"OCR工作进程识别超时（{self.ocr_timeout}s），该区域返回空结果")
+                    self.worker_pool.discard(future)
+                    results.append(OCRResult())
+            return results
+        if self.ocr_engine is None:
+            print("错误: OCR引擎初始化失败，无法执行OCR")
+            return [OCRResult() for _ in regions]
+
+        try:
+            with self._lock:
+                # 1. 逐区域检测，收集文本行；按是否需要角度分类分成两个池
+                region_boxes = []
+                geometries = []
+                pools = {True: [], False: []}  # apply_cls -> [(region_index, box, crop)]
+                for r, region in enumerate(regions):
+                    geometry = {}
+                    image_array = self.optimize_image_for_ocr(region, geometry=geometry)
+                    geometries.append(geometry)
+                    apply_cls = bool(self._decide_cls(image_array, geometry))
+                    boxes = self._detect_boxes(image_array)
+                    region_boxes.append(len(boxes))
+                    for box in boxes:
+                        crop = self._crop_box(image_array, box)
+                        if crop is not None:
+                            pools[apply_cls].append((r, box, crop))
+
+                # 2. 所有区域的文本行共享识别批次
+                per_region = [[] for _ in regions]
+                for apply_cls, items in pools.items():
+                    if not items:
+                        continue
+                    recognized = self._recognize_crops([crop for _, _, crop in items], apply_cls)
+                    for (r, box, _), (text, score) in zip(items, recognized):
+                        per_region[r].append([box, (text, score)])
+                if self.debug:
+                    print(f"批量OCR: {len(regions)}个区域，文本框{sum(region_boxes)}个")
+
+                # 3. 逐区域分段
+                return [self._build_result([items], geometry) for items, geometry in zip(per_region, geometries)]
+        except Exception as e:
+            self.ocr_errors += 1
+            if self.debug:
+                print(f"批量OCR错误: {e}")
+            import traceback
+            traceback.print_exc()
+            return [OCRResult() for _ in regions]
+
+    def _collect_text_lines(self, result):
+        """把PaddleOCR结果整理为 (y_center, text, coordinates, score) 行列表"""
+        drop_score = float(config.get('PADDLEOCR', 'OCR_DROP_SCORE', 0.5))
+        en_split = bool(config.get('PADDLEOCR', 'OCR_ENABLE_EN_SPLIT', True))
+        # 保存识别到的各行文本及其位置信息
+        text_lines = []
+        
+        # 根据PaddleOCR 2.6以上版本API调整结果解析方式
+        for line_result in result:
+            if not line_result:
+                continue
+                
+            for item in line_result:
+                if isinstance(item, list) and len(item) >= 2:
+                    coordinates = item[0]  # 坐标信息
+                    line_text = item[1][0]  # 文本内容在[1][0]
+                    confidence = item[1][1]  # 置信度在[1][1]
+                    if confidence > drop_score:  # 只保留置信度超过阈值的结果
+                        # 应用英文分词处理（可配置）
+                        if en_split:
+                            processed_text = self._split_english_text(line_text)
+                        else:
+                            processed_text = line_text
+                        # 记录文本位置信息和内容
+                        y_center = (coordinates[0][1] + coordinates[2][1]) / 2
+                        text_lines.append((y_center, processed_text, coordinates, confidence))
+        
+        return text_lines
+
+    @staticmethod
+    def _boxes_to_source(boxes, geometry):
+        """把预处理后图像中的框 (N, 4, 2) 换算回原图坐标（先逆纠偏旋转，再逆缩放）"""
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4, 2)
+        if not geometry:
+            return boxes
+        rotation = geometry.get('rotation')
+        if rotation is not None:
+            import cv2
+            inverse = cv2.invertAffineTransform(rotation).astype(np.float32)
+            boxes = boxes @ inverse[:, :2].T + inverse[:, 2]
+        scale = geometry.get('scale')
+        if scale is not None:
+            boxes = boxes / np.asarray(scale, dtype=np.float32)
+        return boxes
+
+    def _build_result(self, result, geometry=None):
+        """PaddleOCR结果 -> OCRResult：筛选行、按阅读顺序分段、框坐标换算回原图"""
+        text_lines = self._collect_text_lines(result) if result else []
+        if self.debug:
+            print("原始识别行:")
+            for i, (y, text, _, _) in enumerate(text_lines):
+                print(f"行{i+1}: y={y:.2f}, 文本: {text}")
+        if not text_lines:
+            return OCRResult()
+
+        boxes = self._boxes_to_source([coords for _, _, coords, _ in text_lines], geometry)
+        lines = [OCRLine(text, score, box) for (_, text, _, score), box in zip(text_lines, boxes)]
+        paragraphs = []
+        for indices in LayoutEngine(debug=self.debug).paragraphs(text_lines):
+            text = self.clean_text(" ".join(text_lines[i][1] for i in indices))
+            if not text:
+                continue
+            para_boxes = boxes[indices]
+            bbox = (float(para_boxes[:, :, 0].min()), float(para_boxes[:, :, 1].min()),
+                    float(para_boxes[:, :, 0].max()), float(para_boxes[:, :, 1].max()))
+            paragraphs.append(OCRParagraph(text, [int(i) for i in indices], bbox))
+
+        if self.debug:
+            print(f"分段得到{len(paragraphs)}个段落:")
+            for i, p in enumerate(paragraphs):
+                print(f"段落{i+1}: {p.text}")
+
+        # 段落文本已逐段清理，直接以空行连接
+        return OCRResult("\n\n".join(p.text for p in paragraphs), lines, paragraphs)
 
     @staticmethod
     def clean_text(text):
@@ -745,8 +1128,13 @@ class OCRHandler:
 
     def reload_settings(self):
         """Reload OCR settings from config"""
+        # 后台初始化未完成时先等待，避免与其并发创建引擎
+        self.wait_until_ready()
         with self._lock:
             self.max_retries = config.get('OCR_TRANSLATION', 'MAX_RETRIES', 3)
             self.ocr_timeout = config.get('PADDLEOCR', 'OCR_TIMEOUT', 30)
-            if PADDLEOCR_AVAILABLE:
+            self._setup_ocr_cache()
+            if self.worker_pool is not None:
+                self.worker_pool.restart()
+            elif PADDLEOCR_AVAILABLE:
                 self._initialize_ocr() 
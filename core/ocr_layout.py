@@ -0,0 +1,231 @@
+import re
+
+import numpy as np
+
+# 段落判断用到的正则在模块加载时编译一次
+_COLON_ITEM_RE = re.compile(r'^[A-Za-z][A-Za-z\s]*(AI|API)?(\s+\([^)]+\))?\s*[:：]')  # "Open AI:" 等格式
+_SIMPLE_COLON_RE = re.compile(r'^[A-Za-z\s]+[:：]')
+_NUMBERED_RE = re.compile(r'^[\d]+\.\s+')  # "1. "
+_LETTERED_RE = re.compile(r'^[A-Za-z]\.\s+')  # "A. "
+_EXPAND_HINT_RE = re.compile(r'\([^\)]*(?:click|expand)[^\)]*\)')
+_ABBREVIATION_RE = re.compile(r'^[a-z]+\.$')
+_TECH_TAIL_RE = re.compile(r'(artificial|security|intelligence|testing|analysis)$')
+_TECH_HEAD_RE = re.compile(r'^(intelligence|technologies|framework|system|engine|tool)')
+_TITLE_RE = re.compile(r'^[A-Z][a-z]+(\s+[A-Z][a-z]+)*$')
+
+_LIST_MARKERS = (':', '：', ' -', '...', '…', '♦', '•', '⦿', '◉', '◈', '▶')
+_SENTENCE_END = frozenset('.!?。！？')
+_CLAUSE_END = frozenset('.!?。！？;；:：')
+_CONTINUATION_END = frozenset('-,，')
+_CONNECTING_WORDS = frozenset([
+    'a', 'an', 'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to',
+    'with', 'for', 'by', 'as', 'from', 'of', 'that', 'which', 'who'
+])
+_COMMON_PHRASES = (
+    "artificial intelligence", "security testing", "information security",
+    "cutting edge", "edge technologies", "security professionals",
+    "who need", "need a", "a powerful", "flexible solution"
+)
+
+
+def split_gap_threshold(diffs):
+    """由相邻行距估计段落分隔阈值（一维两类划分，无需 sklearn）
+
+    对排序后的行距用前缀和一次算出所有切分点的类间平方和，取最优切分
+    （即一维 2-means 的精确解），再按原有规则校验聚类是否有效。
+    """
+    diffs = np.asarray(diffs, dtype=np.float64)
+    if diffs.size == 0:
+        return 50.0
+    if diffs.size == 1:
+        return float(diffs[0] * 2)
+
+    ordered = np.sort(diffs)
+    n = ordered.size
+    prefix = np.cumsum(ordered)
+    left_n = np.arange(1, n)
+    right_n = n - left_n
+    left_sum = prefix[:-1]
+    right_sum = prefix[-1] - left_sum
+    between = left_sum ** 2 / left_n + right_sum ** 2 / right_n
+    k = int(np.argmax(between)) + 1
+    small_center = float(left_sum[k - 1] / left_n[k - 1])
+    large_center = float(right_sum[k - 1] / right_n[k - 1])
+
+    if large_center > small_center * 1.3:
+        # 聚类有效，使用两组的中点作为阈值
+        return (small_center + large_center) / 2
+    avg_diff = float(diffs.mean())
+    if diffs.std() < avg_diff * 0.2:
+        # 行距分布均匀，后续优先使用语义分析判断段落
+        return avg_diff * 2
+    return avg_diff * 1.3
+
+
+def detect_columns(x0, x1, heights):
+    """按文本行的水平投影检测分栏，返回各栏的 [(left, right)]，不分栏时返回单个区间
+
+    只用窄于版面 60% 的行建立投影（跨栏标题不参与），相邻区间之间的空白
+    超过行高中位数的 1.5 倍、且每栏至少两行时才视为分栏。
+    """
+    left, right = float(x0.min()), float(x1.max())
+    width = max(1.0, right - left)
+    narrow = (x1 - x0) < width * 0.6
+    if narrow.sum() < 4:
+        return [(left, right)]
+    gutter = max(1.0, float(np.median(heights)) * 1.5)
+
+    order = np.argsort(x0[narrow])
+    starts, ends = x0[narrow][order], x1[narrow][order]
+    # 区间扫描合并：当前区间右端的累计最大值与下一行左端之间的空隙即栏间距
+    reach = np.maximum.accumulate(ends)
+    breaks = np.nonzero(starts[1:] - reach[:-1] > gutter)[0] + 1
+    bounds = np.split(np.arange(starts.size), breaks)
+    columns = [(float(starts[b[0]]), float(reach[b[-1]])) for b in bounds]
+    if len(columns) < 2 or min(len(b) for b in bounds) < 2:
+        return [(left, right)]
+    return columns
+
+
+def _starts_new_paragraph(prev_text, line_text, y_diff, threshold):
+    """返回 (是否新段落, 原因)；规则与顺序沿用原逐行启发式"""
+    if y_diff > threshold:
+        return True, f"Y差异{y_diff:.2f}大于阈值{threshold:.2f}"
+
+    words = line_text.split()
+    prev_words = prev_text.split()
+    stripped = line_text.strip()
+
+    # 冒号格式的列表项或选项列表
+    if _COLON_ITEM_RE.match(line_text) or _SIMPLE_COLON_RE.match(line_text) or (words and ":" in words[0]):
+        return True, "冒号格式列表项"
+    if prev_text and (":" in prev_text or "：" in prev_text):
+        return True, "前一行含有冒号"
+    # 列表符号、编号、上一句结束后大写开头
+    if (line_text.rstrip().endswith(_LIST_MARKERS)
+            or prev_text.rstrip().endswith(_LIST_MARKERS)
+            or _NUMBERED_RE.match(stripped)
+            or _LETTERED_RE.match(stripped)
+            or (prev_text.strip() and stripped and line_text[0].isupper() and prev_text[-1] in _SENTENCE_END)):
+        return True, "内容特征（列表/编号/新句）"
+    if _EXPAND_HINT_RE.search(line_text.lower()):
+        return True, "包含展开提示"
+
+    # 上下文连贯性
+    if prev_words and words:
+        last_word = prev_words[-1].lower().rstrip(',.;:')
+        prev_end = prev_text.rstrip()[-1]
+        prev_stripped = prev_text.strip()
+        if last_word in _CONNECTING_WORDS:
+            return False, "连接词结尾"
+        if prev_end not in _CLAUSE_END:
+            return False, "不完整句子"
+        if words[0][0].islower() and not _ABBREVIATION_RE.match(words[0]):
+            return False, "小写开头"
+        if _TECH_TAIL_RE.search(prev_text.lower()) and _TECH_HEAD_RE.search(line_text.lower()):
+            return False, "技术内容连贯"
+        if prev_end in _CONTINUATION_END:
+            return False, "标点连贯"
+        if (len(prev_stripped) < 40 and not _TITLE_RE.match(prev_stripped)
+                and not all(w[0].isupper() for w in prev_words if w and w[0].isalpha())):
+            return False, "前一行较短"
+        last_two = " ".join(prev_words[-2:])
+        first_two = " ".join(words[:2])
+        combined = f"{last_two} {first_two}".lower()
+        if any(phrase in combined for phrase in _COMMON_PHRASES):
+            return False, "常见短语连贯"
+
+    if y_diff < threshold * 0.7:
+        return False, f"Y差异小({y_diff:.2f})"
+    return True, "未检测到明显连贯性"
+
+
+class LayoutEngine:
+    """把识别行 (y_center, text, coordinates, ...) 组织为段落。
+
+    1. 行框几何转为 numpy 数组，检测分栏；跨栏的行把页面切成上下几段
+    2. 每段内按栏从左到右、栏内按 Y 排序，得到阅读顺序
+    3. 栏内相邻行距统一估计段落阈值（split_gap_threshold）
+    4. 逐行套用内容启发式（正则均已预编译）决定是否分段；栏/段边界总是新段落
+    """
+
+    def __init__(self, debug=False):
+        self.debug = debug
+
+    @staticmethod
+    def _geometry(text_lines):
+        boxes = np.array([np.asarray(line[2], dtype=np.float64).reshape(-1, 2) for line in text_lines])
+        x0, x1 = boxes[:, :, 0].min(axis=1), boxes[:, :, 0].max(axis=1)
+        y0, y1 = boxes[:, :, 1].min(axis=1), boxes[:, :, 1].max(axis=1)
+        yc = np.array([line[0] for line in text_lines], dtype=np.float64)
+        return x0, x1, y0, y1, yc
+
+    def reading_segments(self, text_lines):
+        """返回阅读顺序的行索引分组（每组为同一栏内连续的一段）"""
+        if not text_lines:
+            return []
+        x0, x1, y0, y1, yc = self._geometry(text_lines)
+        columns = detect_columns(x0, x1, y1 - y0)
+        if len(columns) == 1:
+            return [list(np.lexsort((x0, yc)))]
+
+        # 行中心落在哪一栏；与多个栏相交的行视为跨栏行
+        centers = (x0 + x1) / 2
+        col_left = np.array([c[0] for c in columns])
+        col_right = np.array([c[1] for c in columns])
+        overlaps = (np.minimum(x1[:, None], col_right[None, :]) - np.maximum(x0[:, None], col_left[None, :])) > 0
+        spanning = overlaps.sum(axis=1) > 1
+        column_of = np.clip(np.searchsorted(col_left, centers, side='right') - 1, 0, len(columns) - 1)
+        if self.debug:
+            print(f"检测到{len(columns)}栏: {[(round(l), round(r)) for l, r in columns]}，跨栏行{int(spanning.sum())}个")
+
+        segments = []
+        pending = []  # 当前上下段中非跨栏行
+        for idx in np.lexsort((x0, yc)):
+            if spanning[idx]:
+                segments.extend(self._column_groups(pending, column_of, x0, yc))
+                pending = []
+                segments.append([idx])
+            else:
+                pending.append(idx)
+        segments.extend(self._column_groups(pending, column_of, x0, yc))
+        return segments
+
+    @staticmethod
+    def _column_groups(indices, column_of, x0, yc):
+        if not indices:
+            return []
+        indices = np.asarray(indices)
+        groups = []
+        for col in np.unique(column_of[indices]):
+            members = indices[column_of[indices] == col]
+            groups.append(list(members[np.lexsort((x0[members], yc[members]))]))
+        return groups
+
+    def paragraphs(self, text_lines):
+        """返回段落列表，每个段落为 text_lines 中的行索引列表（阅读顺序）"""
+        segments = self.reading_segments(text_lines)
+        if not segments:
+            return []
+        yc = np.array([line[0] for line in text_lines], dtype=np.float64)
+        diffs = np.concatenate([np.diff(yc[seg]) for seg in segments]) if segments else np.empty(0)
+        threshold = split_gap_threshold(diffs)
+        if self.debug:
+            print(f"相邻行Y坐标差异: {', '.join(f'{d:.2f}' for d in diffs)}")
+            print(f"段落阈值: {threshold:.2f}")
+
+        paragraphs = []
+        for seg in segments:
+            current = [seg[0]]
+            for prev, idx in zip(seg, seg[1:]):
+                is_new, reason = _starts_new_paragraph(
+                    text_lines[prev][1], text_lines[idx][1], yc[idx] - yc[prev], threshold
+                )
+                if self.debug:
+                    print(f"行 '{text_lines[idx][1]}': {'新段落' if is_new else '同一段落'}（{reason}）")
+                if is_new:
+                    paragraphs.append(current)
+                    current = []
+                current.append(idx)
+            paragraphs.append(current)
+        return paragraphs
@@ -0,0 +1,74 @@
+import numpy as np
+
+
+class OCRLine:
+    """一个识别出的文本行：文字、置信度、四点框（源图像坐标，float32 形状 (4, 2)）"""
+    __slots__ = ('text', 'score', 'box')
+
+    def __init__(self, text, score, box):
+        self.text = text
+        self.score = float(score)
+        self.box = box
+
+    @property
+    def bbox(self):
+        """外接矩形 (x0, y0, x1, y1)"""
+        return (float(self.box[:, 0].min()), float(self.box[:, 1].min()),
+                float(self.box[:, 0].max()), float(self.box[:, 1].max()))
+
+    def __repr__(self):
+        return f"OCRLine({self.text!r}, score={self.score:.2f})"
+
+
+class OCRParagraph:
+    """一个段落：清理后的文字、所含行在 OCRResult.lines 中的下标、外接矩形"""
+    __slots__ = ('text', 'line_indices', 'bbox')
+
+    def __init__(self, text, line_indices, bbox):
+        self.text = text
+        self.line_indices = tuple(line_indices)
+        self.bbox = bbox
+
+    def __repr__(self):
+        return f"OCRParagraph({self.text!r}, lines={list(self.line_indices)})"
+
+
+class OCRResult:
+    """结构化OCR结果：行（框/置信度/文字）、段落（行→段落映射）以及分段后的全文。
+
+    框坐标均位于传入 perform_ocr 的原始图像中（已扣除预处理的缩放与纠偏），
+    翻译与覆盖可以按段落逐块处理，无需重新推算文字位置。
+    只有文字、没有几何信息的结果（如持久化缓存命中）lines/paragraphs 为空。
+    """
+    __slots__ = ('text', 'lines', 'paragraphs')
+
+    def __init__(self, text="", lines=(), paragraphs=()):
+        self.text = text
+        self.lines = tuple(lines)
+        self.paragraphs = tuple(paragraphs)
+
+    @classmethod
+    def from_text(cls, text):
+        return cls(text or "")
+
+    @property
+    def has_geometry(self):
+        return bool(self.paragraphs)
+
+    def paragraph_lines(self, paragraph):
+        return [self.lines[i] for i in paragraph.line_indices]
+
+    def boxes(self):
+        """全部行框，形状 (N, 4, 2)"""
+        if not self.lines:
+            return np.empty((0, 4, 2), dtype=np.float32)
+        return np.stack([line.box for line in self.lines])
+
+    def __str__(self):
+        return self.text
+
+    def __bool__(self):
+        return bool(self.text)
+
+    def __repr__(self):
+        return f"OCRResult(lines={len(self.lines)}, paragraphs={len(self.paragraphs)}, text={self.text[:30]!r})"
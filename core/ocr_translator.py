@@ -14,10 +14,13 @@ from PyQt5.QtCore import Qt
 import threading
 
 from .signals import TranslationSignals, WINDOW_NORMAL, EVENT_MOUSEMOVE, EVENT_LBUTTONDOWN, EVENT_LBUTTONUP
-from .image_processor import ImageProcessor
+from .image_processor import ImageProcessor, ScreenCapture
+from .region_watcher import RegionWatcher
 from .ocr_handler import OCRHandler
 from .translator import Translator
 from .history_manager import HistoryManager
+from .font_registry import font_registry
+from .inpaint import pyramid_inpaint
 from ui.image_display_window import ImageDisplayWindow
 from ui.translation_window import TranslationWindow
 from ui.game_overlay import GameOverlay
@@ -35,7 +38,8 @@ class OCRTranslator:
     def __init__(self):
         # Initialize components
         self.image_processor = ImageProcessor()
-        self.ocr_handler = OCRHandler()
+        # OCR引擎较重，延迟到托盘出现后在后台加载（见 start_background_init）
+        self.ocr_handler = OCRHandler(lazy=True)
         self.translator = Translator()
         
         # 根据运行环境确定基础路径
@@ -68,6 +72,15 @@ class OCRTranslator:
         self.window_name = "Screenshot Translator"
         self.translation_window_name = "Translation Result"
         self.last_selection_coords = None
+        # 上一次选区的结构化OCR结果（行框/段落，坐标相对选区左上角），供逐段覆盖使用
+        self.last_ocr_result = None
+        # 选区绘制：预分配的干净底图/后台缓冲区 + 上一帧绘制过的脏矩形
+        self.display_img = None
+        self._back_buffer = None
+        self._dirty_rects = []
+        self._frame_interval = 1.0 / 60
+        self._last_present = 0.0
+        self._frame_pending = False
         
         # UI settings from config
         self.overlay_opacity = config.get('UI', 'overlay_opacity')
@@ -117,6 +130,12 @@ class OCRTranslator:
         self.overlay_auto_text_color = config.get('OVERLAY', 'overlay_auto_text_color', True)
         self.overlay_inpaint_radius = config.get('OVERLAY', 'overlay_inpaint_radius', 3)
         self.overlay_inpaint_dilate = config.get('OVERLAY', 'overlay_inpaint_dilate', 1)
+        self.overlay_inpaint_tier = config.get('OVERLAY', 'overlay_inpaint_tier', 'balanced')  # fast / balanced / quality
+        self.overlay_inpaint_budget_ms = config.get('OVERLAY', 'overlay_inpaint_budget_ms', 300)
+        self.overlay_per_block = config.get('OVERLAY', 'overlay_per_block', True)
+        self.overlay_workers = config.get('OVERLAY', 'overlay_workers', 0)
+        self.overlay_prerender = config.get('OVERLAY', 'overlay_prerender', True)
+        self.overlay_prerender_wait_ms = config.get('OVERLAY', 'overlay_prerender_wait_ms', 500)
         
         # Text effects settings
         self.text_stroke_width = config.get('TEXT_EFFECTS', 'text_stroke_width')
@@ -139,6 +158,9 @@ class OCRTranslator:
         # 创建信号对象
         self.signals = TranslationSignals()
         self.signals.show_translation.connect(self._show_translation_window)
+        self.signals.translation_chunk.connect(self._on_translation_chunk)
+        self.signals.translation_done.connect(self._on_translation_done)
+        self.signals.watch_update.connect(self._on_watch_update)
         self.signals.overlay_text.connect(self.overlay_text_to_image)
         self.signals.update_history.connect(self.history_manager.save_history)
         self.signals.show_error.connect(self.show_error_message)
@@ -152,6 +174,17 @@ class OCRTranslator:
         # 单例 游戏 窗口引用
         self.game_dialog = None
         self.game_dialog2 = None  # for cloze/shadow chaining
+        # 流式翻译编号：只把最新一次截图的token推送到翻译窗口
+        self._stream_id = 0
+        # 覆盖图后台预渲染：只保留最近一次截图的任务 {key, future, cancel, window}
+        self._overlay_job = None
+        self._overlay_executor = None
+        # 监视区域（字幕）模式
+        self.region_watcher = None
+        self._watch_coords = None
+        self._watch_last_text = None
+        # 每次开启/停止监视递增，丢弃已停止的监视线程迟到的更新
+        self._watch_id = 0
     
     def register_hotkey(self):
         """Register the hotkey to start the translation process"""
@@ -167,6 +200,10 @@ class OCRTranslator:
         """Start the translation process by taking a screenshot"""
         try:
             print("Taking screenshot...")
+            # 新截图会替换截图与OCR结果，上一次的覆盖图预渲染不再有用
+            self._cancel_overlay_prerender()
+            # 新截图的译文窗口不能再被旧选区的监视字幕覆盖
+            self.stop_watch_region()
             self.screenshot, self.original_screenshot = self.image_processor.take_screenshot()
             self.select_region()
         except Exception as e:
@@ -210,14 +247,9 @@ class OCRTranslator:
             
             cv2.setMouseCallback(self.window_name, self.mouse_callback)
             
-            # Create a semi-transparent overlay
-            overlay = self.screenshot.copy()
-            alpha = 0.3
-            cv2.rectangle(overlay, (0, 0), (overlay.shape[1], overlay.shape[0]), (0, 0, 0), -1)
-            cv2.addWeighted(overlay, alpha, self.screenshot, 1 - alpha, 0, self.screenshot)
-            
-            self.display_img = self.screenshot.copy()
-            cv2.imshow(self.window_name, self.display_img)
+            # 半透明暗化底图（等价于叠加30%黑色），写入预分配缓冲区，不修改原始截图
+            self._prepare_selection_buffers()
+            cv2.imshow(self.window_name, self._back_buffer)
             
             while True:
                 if win32gui.FindWindow(None, self.window_name) == 0:
@@ -225,6 +257,9 @@ class OCRTranslator:
                     return
                 
                 key = cv2.waitKey(10)
+                # 补发因限帧而推迟的一帧
+                if self._frame_pending:
+                    self._present()
                 
                 if key == 27:  # ESC
                     if win32gui.FindWindow(None, self.window_name) != 0:
@@ -237,29 +272,98 @@ class OCRTranslator:
             print(f"选择区域时出现错误: {e}")
             cv2.destroyAllWindows()
     
+    def _prepare_selection_buffers(self):
+        """Build the dimmed base image and the back buffer, reusing allocations across captures."""
+        if self.display_img is None or self.display_img.shape != self.screenshot.shape:
+            self.display_img = np.empty_like(self.screenshot)
+            self._back_buffer = np.empty_like(self.screenshot)
+        cv2.convertScaleAbs(self.screenshot, self.display_img, alpha=0.7)
+        np.copyto(self._back_buffer, self.display_img)
+        self._dirty_rects = []
+        self._frame_pending = False
+        # 限帧：默认跟随显示器刷新率（[UI] selection_max_fps > 0 时使用该值）
+        max_fps = config.get('UI', 'selection_max_fps', 0)
+        try:
+            max_fps = float(max_fps)
+        except (TypeError, ValueError):
+            max_fps = 0
+        if max_fps <= 0:
+            max_fps = self._display_refresh_rate()
+        self._frame_interval = 1.0 / max(1.0, max_fps)
+
+    @staticmethod
+    def _display_refresh_rate():
+        try:
+            settings = win32api.EnumDisplaySettings(None, win32con.ENUM_CURRENT_SETTINGS)
+            hz = int(settings.DisplayFrequency)
+            if hz > 1:
+                return hz
+        except Exception:
+            pass
+        return 60
+
+    def _restore_dirty(self):
+        """Copy the regions drawn in the previous frame back from the clean base image."""
+        for x0, y0, x1, y1 in self._dirty_rects:
+            self._back_buffer[y0:y1, x0:x1] = self.display_img[y0:y1, x0:x1]
+        self._dirty_rects = []
+
+    def _mark_dirty(self, x0, y0, x1, y1, pad=0):
+        h, w = self._back_buffer.shape[:2]
+        left, top = max(0, min(x0, x1) - pad), max(0, min(y0, y1) - pad)
+        right, bottom = min(w, max(x0, x1) + pad + 1), min(h, max(y0, y1) + pad + 1)
+        if right > left and bottom > top:
+            self._dirty_rects.append((left, top, right, bottom))
+
+    def _mark_dirty_outline(self, x0, y0, x1, y1, pad):
+        """Only the four edges of a rectangle outline are dirty, not its interior."""
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        self._mark_dirty(x0, y0, x1, y0, pad)
+        self._mark_dirty(x0, y1, x1, y1, pad)
+        self._mark_dirty(x0, y0, x0, y1, pad)
+        self._mark_dirty(x1, y0, x1, y1, pad)
+
+    def _present(self, force=False):
+        """Show the back buffer, at most once per frame interval unless forced."""
+        now = time.perf_counter()
+        if not force and now - self._last_present < self._frame_interval:
+            self._frame_pending = True
+            return
+        cv2.imshow(self.window_name, self._back_buffer)
+        self._last_present = now
+        self._frame_pending = False
+
     def mouse_callback(self, event, x, y, flags, param):
         """Mouse callback for region selection"""
-        temp_img = self.display_img.copy()
+        if self._back_buffer is None:
+            return
+        buf = self._back_buffer
         
         if event == EVENT_LBUTTONDOWN:
+            self._restore_dirty()
             self.selection_start = (x, y)
             self.is_selecting = True
             
-            cv2.line(temp_img, 
-                    (max(0, x - self.crosshair_size), y), 
-                    (min(temp_img.shape[1], x + self.crosshair_size), y), 
-                    self.crosshair_color, self.crosshair_thickness)
-            cv2.line(temp_img, 
-                    (x, max(0, y - self.crosshair_size)), 
-                    (x, min(temp_img.shape[0], y + self.crosshair_size)), 
-                    self.crosshair_color, self.crosshair_thickness)
-            
-            cv2.circle(temp_img, self.selection_start, 3, self.selection_color, -1)
-            cv2.imshow(self.window_name, temp_img)
+            size, thickness = self.crosshair_size, self.crosshair_thickness
+            cv2.line(buf, 
+                    (max(0, x - size), y), 
+                    (min(buf.shape[1], x + size), y), 
+                    self.crosshair_color, thickness)
+            cv2.line(buf, 
+                    (x, max(0, y - size)), 
+                    (x, min(buf.shape[0], y + size)), 
+                    self.crosshair_color, thickness)
+            
+            cv2.circle(buf, self.selection_start, 3, self.selection_color, -1)
+            self._mark_dirty(x - size, y - size, x + size, y + size, pad=max(thickness, 3) + 1)
+            self._present(force=True)
         
         elif event == EVENT_MOUSEMOVE and self.is_selecting:
-            cv2.rectangle(temp_img, self.selection_start, (x, y), self.selection_color, 2)
-            cv2.imshow(self.window_name, temp_img)
+            self._restore_dirty()
+            cv2.rectangle(buf, self.selection_start, (x, y), self.selection_color, 2)
+            self._mark_dirty_outline(self.selection_start[0], self.selection_start[1], x, y, pad=2)
+            self._present()
         
         elif event == EVENT_LBUTTONUP:
             self.selection_end = (x, y)
@@ -270,27 +374,22 @@ class OCRTranslator:
             x2 = max(self.selection_start[0], self.selection_end[0])
             y2 = max(self.selection_start[1], self.selection_end[1])
             
+            # 只在选区范围内做高亮，不再分配整屏大小的遮罩/高亮数组
+            self._restore_dirty()
             highlight_color = (0, 200, 255)
-            cv2.rectangle(self.screenshot, (x1-2, y1-2), (x2+2, y2+2), highlight_color, 2)
-            cv2.rectangle(self.screenshot, (x1, y1), (x2, y2), self.selection_color, 2)
-            
-            mask = np.zeros((self.screenshot.shape[0], self.screenshot.shape[1]), dtype=np.uint8)
-            cv2.rectangle(mask, (x1, y1), (x2, y2), 255, -1)
+            cv2.rectangle(buf, (x1-2, y1-2), (x2+2, y2+2), highlight_color, 2)
+            cv2.rectangle(buf, (x1, y1), (x2, y2), self.selection_color, 2)
+            self._mark_dirty(x1, y1, x2, y2, pad=4)
             
-            highlight = np.zeros_like(self.screenshot)
-            highlight[mask > 0] = [255, 255, 0]
+            roi = buf[max(0, y1):max(0, y2), max(0, x1):max(0, x2)]
+            if roi.size:
+                # 等价于叠加 alpha=0.2 的 (255, 255, 0) 高亮
+                roi[...] = cv2.add(roi, (51, 51, 0, 0))
             
-            pulse_img = self.screenshot.copy()
-            alpha = 0.2
-            cv2.addWeighted(pulse_img, 1, highlight, alpha, 0, pulse_img)
-            
-            cv2.imshow(self.window_name, pulse_img)
+            self._present(force=True)
             cv2.waitKey(1)
             
             self.process_selected_region()
-        
-        elif not self.is_selecting:
-            cv2.imshow(self.window_name, temp_img)
     
     def process_selected_region(self):
         """Process the selected region for OCR and translation in background"""
@@ -308,35 +407,53 @@ class OCRTranslator:
                 y1 = min(self.selection_start[1], self.selection_end[1])
                 x2 = max(self.selection_start[0], self.selection_end[0])
                 y2 = max(self.selection_start[1], self.selection_end[1])
+                # 选区在（可能缩小的）预览上完成，换算回截屏坐标
+                if isinstance(self.original_screenshot, ScreenCapture):
+                    x1, y1 = self.original_screenshot.to_capture_coords(x1, y1)
+                    x2, y2 = self.original_screenshot.to_capture_coords(x2, y2)
                 
                 # 保存最后一次选择的坐标
                 self.last_selection_coords = (x1, y1, x2, y2)
                 
                 # 在后台线程中执行OCR和翻译，避免阻塞UI
                 def worker():
-                    source_text, result = self.ocr_and_translate(x1, y1, x2, y2)
+                    # 流式模式：OCR完成后立即打开翻译窗口，再逐步追加译文token
+                    stream_id = None
+                    on_ocr_done = None
+                    on_token = None
+                    if self.translator.streaming_enabled():
+                        self._stream_id += 1
+                        stream_id = self._stream_id
+                        on_ocr_done = lambda src: self._open_streaming_window(src, x1, y1, x2, y2)
+                        on_token = lambda token: self.signals.translation_chunk.emit(stream_id, token)
+                    source_text, result = self.ocr_and_translate(x1, y1, x2, y2, on_ocr_done=on_ocr_done, on_token=on_token)
                     if source_text is None:
                         self.signals.show_error.emit("OCR识别失败", result)
                         return
                     if isinstance(result, str):
                         self.signals.show_error.emit("翻译失败", result)
                         # 显示原文
-                        self.display_translation(source_text, source_text, "unknown", "unknown", x1, y1, x2, y2)
+                        self.display_translation(source_text, source_text, "unknown", "unknown", x1, y1, x2, y2, stream_id=stream_id)
                     else:
                         self.display_translation(
                             result['translated_text'], 
                             source_text, 
                             result['source_lang'], 
                             result['target_lang'], 
-                            x1, y1, x2, y2
+                            x1, y1, x2, y2,
+                            stream_id=stream_id
                         )
                 threading.Thread(target=worker, daemon=True).start()
         except Exception as e:
             print(f"处理选中区域时出错: {e}")
             cv2.destroyAllWindows()
     
-    def ocr_and_translate(self, x1, y1, x2, y2):
-        """Perform OCR and translation on the selected region"""
+    def ocr_and_translate(self, x1, y1, x2, y2, on_ocr_done=None, on_token=None):
+        """Perform OCR and translation on the selected region
+
+        on_ocr_done(source_text) is called once OCR succeeds, before translating;
+        on_token receives the translation incrementally (streaming mode).
+        """
         try:
             # 确保坐标为整数
             x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
@@ -344,7 +461,10 @@ class OCRTranslator:
             # 从原始截图（numpy数组）中裁剪区域
             # 确保original_screenshot是numpy数组格式
             if hasattr(self, 'original_screenshot'):
-                if isinstance(self.original_screenshot, Image.Image):
+                if isinstance(self.original_screenshot, ScreenCapture):
+                    # 只转换所选区域的全分辨率像素
+                    region = self.original_screenshot.region(x1, y1, x2, y2)
+                elif isinstance(self.original_screenshot, Image.Image):
                     # 如果是PIL Image，转为numpy数组
                     img_array = np.array(self.original_screenshot)
                     region = img_array[y1:y2, x1:x2]
@@ -355,15 +475,20 @@ class OCRTranslator:
                 print("错误: 没有找到原始截图")
                 return None, "截图过程出错，请重试"
             
-            # 调用OCR处理器识别文本
-            source_text = self.ocr_handler.perform_ocr(region)
+            # 调用OCR处理器识别文本（保留行框与段落，覆盖译文时按块使用）
+            ocr_result = self.ocr_handler.perform_ocr_detailed(region)
+            self.last_ocr_result = ocr_result
+            source_text = ocr_result.text
             
             if not source_text:
                 # OCR失败时返回错误消息
                 return None, "OCR识别失败，未能识别出文本。请尝试选择更清晰的文本区域。"
             
+            if on_ocr_done:
+                on_ocr_done(source_text)
+            
             # 调用翻译器进行翻译
-            translate_result = self.translator.translate(source_text)
+            translate_result = self.translator.translate(source_text, on_token=on_token)
             
             if translate_result is None:
                 # 翻译失败时返回原文本和错误消息
@@ -385,6 +510,83 @@ class OCRTranslator:
             traceback.print_exc()  # 打印详细错误信息
             return None, f"处理失败: {str(e)}"
     
+    def toggle_watch_region(self):
+        """开启/关闭对上一次选区的持续监视（内容变化时自动识别并翻译）"""
+        if self._watch_active():
+            self.stop_watch_region()
+            return False
+        if not self.last_selection_coords:
+            self.signals.show_error.emit("监视区域", "请先截图选择一个区域，再开启监视模式。")
+            self.signals.watch_state.emit(False)
+            return False
+        x1, y1, x2, y2 = self.last_selection_coords
+        left = getattr(self.original_screenshot, 'left', 0)
+        top = getattr(self.original_screenshot, 'top', 0)
+        # 监视期间窗口内容会更新，而截图与OCR结果不会，之前的预渲染图已过期
+        self._cancel_overlay_prerender()
+        self._watch_coords = (x1, y1, x2, y2)
+        self._watch_last_text = None
+        self._watch_id += 1
+        watch_id = self._watch_id
+        self.ocr_handler.reset_incremental()
+        self.region_watcher = RegionWatcher(
+            self.image_processor, (left + x1, top + y1, x2 - x1, y2 - y1),
+            lambda frame: self._on_watch_frame(watch_id, frame)
+        )
+        self.region_watcher.start()
+        self.signals.watch_state.emit(True)
+        return True
+
+    def stop_watch_region(self):
+        """停止监视（未开启时无操作）；之后到达的旧监视更新会被丢弃"""
+        if self.region_watcher is None:
+            return
+        self.region_watcher.stop()
+        self.region_watcher = None
+        self._watch_id += 1
+        self.signals.watch_state.emit(False)
+
+    def _watch_active(self):
+        return self.region_watcher is not None and self.region_watcher.is_running()
+
+    def _on_watch_frame(self, watch_id, frame):
+        """监视线程回调：区域内容变化后识别并翻译，原文未变则不重复翻译"""
+        if watch_id != self._watch_id:
+            return
+        # 增量OCR：只重新识别像素有变化的文本行
+        source_text = self.ocr_handler.perform_ocr_incremental(frame)
+        if not source_text or source_text == self._watch_last_text:
+            return
+        self._watch_last_text = source_text
+        result = self.translator.translate(source_text)
+        if result is None:
+            return
+        self.history_manager.add_translation(
+            source_text,
+            result['translated_text'],
+            result['source_lang'],
+            result['target_lang']
+        )
+        self.signals.watch_update.emit(
+            watch_id, result['translated_text'], source_text, result['source_lang'], result['target_lang']
+        )
+
+    def _on_watch_update(self, watch_id, translated_text, source_text, source_lang, target_lang):
+        """主线程槽：原地更新翻译窗口；窗口不存在或已隐藏时重新打开"""
+        if watch_id != self._watch_id:
+            return  # 监视已停止或已换了选区
+        if self.translation_window and self.translation_window.isVisible():
+            self.translation_window.set_source_text(source_text)
+            self.translation_window.finish_translation(translated_text, source_lang, target_lang)
+            return
+        if not self._watch_coords:
+            return
+        pos_x, pos_y, width, height, original_coords = self._translation_window_geometry(*self._watch_coords)
+        self._show_translation_window(
+            translated_text, source_text, source_lang, target_lang,
+            pos_x, pos_y, width, height, original_coords
+        )
+
     def show_error_message(self, title, message):
         """Display error message to user"""
         msg = QMessageBox()
@@ -394,8 +596,51 @@ class OCRTranslator:
         msg.setStandardButtons(QMessageBox.Ok)
         msg.exec_()
     
-    def display_translation(self, translated_text, source_text, source_lang, target_lang, x1, y1, x2, y2):
-        """Display the translation result in the UI"""
+    def _translation_window_geometry(self, x1, y1, x2, y2):
+        """计算翻译窗口位置与尺寸，返回 (x, y, width, height, original_coords)"""
+        # 计算显示位置 - 窗口应该显示在选定区域下方
+        screen_width = win32api.GetSystemMetrics(0)
+        screen_height = win32api.GetSystemMetrics(1)
+        
+        # 计算原始选择区域的宽度和高度
+        sel_width = x2 - x1
+        sel_height = y2 - y1
+        
+        # 保存原始坐标，用于后续覆盖操作
+        original_coords = (x1, y1, sel_width, sel_height)
+        
+        window_width = min(max(sel_width, 400), screen_width - 100)  # 最小宽度400，不超过屏幕
+        window_pos_x = max(0, x1)  # 窗口左上角x坐标
+        window_pos_y = min(y2 + 10, screen_height - 100)  # 窗口左上角y坐标，如果太靠下则调整
+        window_height = min(screen_height - window_pos_y - 50, 600)
+        return window_pos_x, window_pos_y, window_width, window_height, original_coords
+    
+    def _open_streaming_window(self, source_text, x1, y1, x2, y2):
+        """OCR完成后立即显示翻译窗口（译文稍后以流式token追加）"""
+        pos_x, pos_y, width, height, original_coords = self._translation_window_geometry(x1, y1, x2, y2)
+        self.signals.show_translation.emit(
+            "", source_text,
+            str(self.translator.source_lang), str(self.translator.target_lang),
+            pos_x, pos_y, width, height, original_coords
+        )
+    
+    def _on_translation_chunk(self, stream_id, token):
+        """主线程槽：把流式token追加到当前翻译窗口"""
+        if stream_id == self._stream_id and self.translation_window:
+            self.translation_window.append_translation_chunk(token)
+    
+    def _on_translation_done(self, stream_id, translated_text, source_lang, target_lang):
+        """主线程槽：流式翻译结束，用完整译文替换窗口内容"""
+        if stream_id == self._stream_id and self.translation_window:
+            self.translation_window.finish_translation(translated_text, source_lang, target_lang)
+            self._schedule_overlay_prerender(self.translation_window)
+    
+    def display_translation(self, translated_text, source_text, source_lang, target_lang, x1, y1, x2, y2, stream_id=None):
+        """Display the translation result in the UI
+
+        stream_id: set when the window was already opened in streaming mode;
+        the final text is then delivered via translation_done instead.
+        """
         try:
             # 打印日志
             print("===== OCR结果 =====")
@@ -403,33 +648,26 @@ class OCRTranslator:
             print("===== 翻译结果 =====")
             print(translated_text)
             
-            # 计算显示位置 - 窗口应该显示在选定区域下方
-            screen_width = win32api.GetSystemMetrics(0)
-            screen_height = win32api.GetSystemMetrics(1)
-            
-            # 计算原始选择区域的宽度和高度
-            sel_width = x2 - x1
-            sel_height = y2 - y1
-            
-            # 保存原始坐标，用于后续覆盖操作
-            original_coords = (x1, y1, sel_width, sel_height)
+            window_pos_x, window_pos_y, window_width, window_height, original_coords = \
+                self._translation_window_geometry(x1, y1, x2, y2)
+            sel_width, sel_height = original_coords[2], original_coords[3]
             
-            window_width = min(max(sel_width, 400), screen_width - 100)  # 最小宽度400，不超过屏幕
-            window_pos_x = max(0, x1)  # 窗口左上角x坐标
-            window_pos_y = min(y2 + 10, screen_height - 100)  # 窗口左上角y坐标，如果太靠下则调整
-            
-            # 发送信号更新界面
-            self.signals.show_translation.emit(
-                translated_text,  # 翻译结果
-                source_text,      # 原文
-                source_lang,      # 源语言
-                target_lang,      # 目标语言
-                window_pos_x,     # 窗口x坐标
-                window_pos_y,     # 窗口y坐标
-                window_width,     # 窗口宽度
-                min(screen_height - window_pos_y - 50, 600),  # 窗口高度
-                original_coords   # 原始选择区域坐标
-            )
+            if stream_id is not None:
+                # 流式模式：窗口已打开，只需推送最终译文
+                self.signals.translation_done.emit(stream_id, translated_text, source_lang, target_lang)
+            else:
+                # 发送信号更新界面
+                self.signals.show_translation.emit(
+                    translated_text,  # 翻译结果
+                    source_text,      # 原文
+                    source_lang,      # 源语言
+                    target_lang,      # 目标语言
+                    window_pos_x,     # 窗口x坐标
+                    window_pos_y,     # 窗口y坐标
+                    window_width,     # 窗口宽度
+                    window_height,    # 窗口高度
+                    original_coords   # 原始选择区域坐标
+                )
             # 学习模块：后台提取候选并入库，可选自动弹出一局
             try:
                 if self.learning_manager:
@@ -494,7 +732,11 @@ class OCRTranslator:
                 pos_x, pos_y, width, height, original_coords
             )
             self.translation_window.parent = lambda: self
+            self.translation_window.closed.connect(
+                lambda window=self.translation_window: self._cancel_overlay_prerender(window)
+            )
             self.translation_window.show()
+            self._schedule_overlay_prerender(self.translation_window)
             
             # 如果设置对话框存在且有效，连接其信号到翻译窗口
             if hasattr(self, 'settings_dialog') and self.settings_dialog and not self.settings_dialog.isHidden():
@@ -524,117 +766,19 @@ class OCRTranslator:
         try:
             if not self._validate_overlay_params(text, x, y, width, height):
                 return False
-            
-            # 确保original_screenshot是PIL Image对象
-            if isinstance(self.original_screenshot, np.ndarray):
-                # 如果是numpy数组，转换为PIL Image
-                pil_img = Image.fromarray(cv2.cvtColor(self.original_screenshot, cv2.COLOR_BGR2RGB))
-            elif isinstance(self.original_screenshot, Image.Image):
-                # 已经是PIL Image
-                pil_img = self.original_screenshot.copy()
-            else:
-                print(f"错误: 不支持的图像类型 {type(self.original_screenshot)}")
-                return False
-            
-            draw = ImageDraw.Draw(pil_img)
-            
-            # 获取屏幕尺寸，用于限制覆盖区域的大小
-            screen_width = win32api.GetSystemMetrics(0)
-            screen_height = win32api.GetSystemMetrics(1)
-            
-            # 计算覆盖区域
-            x1, y1 = x, y
-            
-            # 不再自动调整宽度，使用原始选定的宽度
-            # 只进行必要的屏幕边界检查
-            if x + width > screen_width:
-                width = screen_width - x - 10  # 保留10像素边距
-            
-            x2, y2 = x + width, y + height
-            
-            # 加载并设置字体
-            fonts = self._get_font()
-            if not fonts:
+            # 监视模式只原地更新窗口文字，original_screenshot 与 last_ocr_result 仍是开启监视前的，
+            # 覆盖会把新译文贴到旧截图和旧段落框上
+            if self._watch_active():
+                self.signals.show_error.emit("覆盖原文", "监视模式下无法覆盖原文，请先关闭监视模式。")
                 return False
             
-            # 打印调试信息
-            print(f"覆盖文本区域: x1={x1}, y1={y1}, x2={x2}, y2={y2}")
-            print(f"覆盖文本内容: {text}")
-            
-            # 计算文本布局
-            lines, total_height = self._calculate_text_layout(text, fonts['chinese'], width - 2 * self.overlay_padding)
-            
-            if not lines:
+            # 译文到达时已在后台预渲染过的，直接显示
+            display_img = self._take_overlay_prerender(text, x, y, width, height)
+            if display_img is None:
+                display_img = self._compose_overlay(text, x, y, width, height)
+            if display_img is None:
                 return False
             
-            # 打印详细的调试信息
-            print(f"原始边框区域: x1={x1}, y1={y1}, x2={x2}, y2={y2}, 尺寸={width}x{height}")
-            print(f"内边距: {self.overlay_padding}px")
-            print(f"文本渲染区域: x1={x1 + self.overlay_padding}, y1={y1 + self.overlay_padding}, "
-                  f"宽度={width - 2 * self.overlay_padding}, 高度={height - 2 * self.overlay_padding}")
-            
-            # 如果需要自动扩展高度并且用户明确开启了此功能
-            if self.overlay_auto_expand:
-                # 计算需要的高度，并调整y2
-                required_height = total_height + 2 * self.overlay_padding
-                if required_height > height:
-                    print(f"自动扩展高度: {height} -> {required_height}")
-                    new_y2 = y1 + required_height
-                    # 确保不超出屏幕底部
-                    if new_y2 > screen_height:
-                        new_y2 = screen_height - 10  # 保留10像素边距
-                    y2 = new_y2
-                    height = y2 - y1
-            
-            # 根据覆盖模式处理背景
-            if str(self.overlay_mode).lower() == 'inpaint':
-                try:
-                    pil_img = self._smart_cover_background(pil_img, x1, y1, x2, y2)
-                    draw = ImageDraw.Draw(pil_img)
-                    print("已使用智能覆盖模式(inpaint)清理原文背景")
-                except Exception as _e:
-                    print(f"智能覆盖失败，回退到box模式: {_e}")
-                    self._draw_background_and_border(draw, x1, y1, x2, y2)
-            else:
-                # 传统盒子模式
-                self._draw_background_and_border(draw, x1, y1, x2, y2)
-            
-            # 计算带内边距的起始位置
-            render_x1 = x1 + self.overlay_padding
-            render_y1 = y1 + self.overlay_padding
-            
-            # 如果不允许自动扩展，则尝试自适应缩小字体以适配高度
-            if not self.overlay_auto_expand:
-                target_height = max(0, height - 2 * self.overlay_padding)
-                fit_size = self._fit_font_to_box(text, width - 2 * self.overlay_padding, target_height, fonts)
-                if fit_size and fit_size != self.overlay_font_size:
-                    print(f"自适应缩放字体: {self.overlay_font_size} -> {fit_size}")
-                    fonts = self._get_font_with_size(fit_size)
-                    lines, total_height = self._calculate_text_layout(text, fonts['chinese'], width - 2 * self.overlay_padding)
-
-            # 自动选择文本颜色以保持对比度（仅在智能覆盖模式下默认启用）
-            prev_color = None
-            if str(self.overlay_mode).lower() == 'inpaint' and self.overlay_auto_text_color:
-                try:
-                    # 取清理后的ROI估算背景亮度
-                    roi = np.array(pil_img)[y1:y2, x1:x2]
-                    auto_color = self._pick_auto_text_color(roi)
-                    prev_color = self.overlay_text_color
-                    self.overlay_text_color = auto_color
-                    print(f"自动选择文本颜色: {prev_color} -> {auto_color}")
-                except Exception as _:
-                    prev_color = None
-
-            # 渲染文本
-            self._render_text(draw, lines, fonts, render_x1, render_y1, width - 2 * self.overlay_padding, height - 2 * self.overlay_padding)
-
-            # 恢复原始文本颜色，避免影响后续操作
-            if prev_color is not None:
-                self.overlay_text_color = prev_color
-            
-            # 如果需要转回OpenCV格式，可以在这里转换
-            display_img = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
-            
             # 显示结果
             self._show_result_window(display_img)
             
@@ -646,6 +790,350 @@ class OCRTranslator:
             traceback.print_exc()
             return False
     
+    def _overlay_snapshot(self):
+        """覆盖所需的截图状态快照（截图、OCR结果、选区坐标）
+
+        后台预渲染只读快照，不读会被新截图替换的实例属性；任务持有快照对象的引用，
+        取结果时用 is 比较，对象不会被回收，也就不会因 id 复用而误匹配。
+        """
+        return {
+            'screenshot': self.original_screenshot,
+            'ocr_result': self.last_ocr_result,
+            'selection': self.last_selection_coords,
+        }
+
+    def _snapshot_is_current(self, snapshot):
+        return (snapshot['screenshot'] is self.original_screenshot
+                and snapshot['ocr_result'] is self.last_ocr_result
+                and snapshot['selection'] == self.last_selection_coords)
+
+    @staticmethod
+    def _lower_thread_priority():
+        """预渲染线程的初始化函数：降低线程优先级，避免与界面和OCR抢占CPU"""
+        try:
+            import win32process
+            win32process.SetThreadPriority(win32api.GetCurrentThread(), win32process.THREAD_PRIORITY_BELOW_NORMAL)
+        except Exception as e:
+            print(f"降低预渲染线程优先级失败: {e}")
+
+    def _schedule_overlay_prerender(self, window):
+        """译文到达后在低优先级后台线程预先生成覆盖图，按R时直接显示（[OVERLAY] overlay_prerender）
+
+        参数与按R时翻译窗口发出的 overlay_text 信号一致；新任务会取消上一次截图的任务。
+        """
+        if not self.overlay_prerender or window is None or self._watch_active():
+            return
+        text = str(window.translated_text or "")
+        coords = window.original_coords
+        if not text.strip() or not coords or len(coords) != 4:
+            return
+        if not self._validate_overlay_params(text, *coords):
+            return
+        key = (text,) + tuple(int(v) for v in coords)
+        job = self._overlay_job
+        if (job is not None and job['key'] == key and not job['cancel'].is_set()
+                and self._snapshot_is_current(job['snapshot'])):
+            return
+        self._cancel_overlay_prerender()
+        if self._overlay_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._overlay_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix='overlay-prerender', initializer=self._lower_thread_priority
+            )
+        cancel = threading.Event()
+        snapshot = self._overlay_snapshot()
+        future = self._overlay_executor.submit(self._prerender_overlay, text, coords, snapshot, cancel)
+        self._overlay_job = {'key': key, 'snapshot': snapshot, 'future': future, 'cancel': cancel, 'window': window}
+
+    def _prerender_overlay(self, text, coords, snapshot, cancel):
+        if cancel.is_set():
+            return None
+        start = time.time()
+        img = self._compose_overlay(text, *coords, snapshot=snapshot, workers=1, cancelled=cancel.is_set)
+        if img is None or cancel.is_set():
+            return None
+        print(f"覆盖图预渲染完成，用时{time.time() - start:.2f}秒")
+        return img
+
+    def _cancel_overlay_prerender(self, window=None):
+        """取消预渲染任务；指定 window 时只取消属于该翻译窗口的任务"""
+        job = self._overlay_job
+        if job is None or (window is not None and job['window'] is not window):
+            return
+        job['cancel'].set()
+        job['future'].cancel()
+        self._overlay_job = None
+
+    def _take_overlay_prerender(self, text, x, y, width, height):
+        """取出与本次覆盖请求匹配的预渲染结果，不匹配或失败时返回None
+
+        仍在计算时最多等待 [OVERLAY] overlay_prerender_wait_ms（在界面线程上调用，不能无限等待），
+        超时则取消后台任务，由调用方同步生成。
+        """
+        job = self._overlay_job
+        key = (text, int(x), int(y), int(width), int(height))
+        if job is None or job['cancel'].is_set() or job['key'] != key or not self._snapshot_is_current(job['snapshot']):
+            return None
+        self._overlay_job = None
+        from concurrent.futures import CancelledError, TimeoutError as FutureTimeoutError
+        wait = max(0.0, float(self.overlay_prerender_wait_ms or 0)) / 1000.0
+        try:
+            img = job['future'].result(timeout=wait)
+        except FutureTimeoutError:
+            job['cancel'].set()
+            print(f"预渲染覆盖图{wait:.1f}秒内未完成，改为直接生成")
+            return None
+        except (Exception, CancelledError) as e:
+            print(f"预渲染覆盖图失败，重新生成: {e}")
+            return None
+        if img is not None:
+            print("使用后台预渲染的覆盖图")
+        return img
+
+    def _compose_overlay(self, text, x, y, width, height, snapshot=None, workers=None, cancelled=None):
+        """生成覆盖译文后的整屏BGR图像（不显示），失败或被取消时返回None
+
+        截图、OCR结果与选区只从 snapshot（默认取当前状态，见 _overlay_snapshot）读取，
+        不修改实例状态，可在后台线程调用；cancelled 为可选的无参回调，返回True时尽早放弃。
+        """
+        if snapshot is None:
+            snapshot = self._overlay_snapshot()
+        screenshot = snapshot['screenshot']
+        # 智能覆盖且有本次选区的OCR段落框时，按段落逐块修复背景并排版
+        block_img = self._overlay_per_block(text, x, y, snapshot, workers=workers, cancelled=cancelled)
+        if block_img is not None:
+            return block_img
+        if cancelled is not None and cancelled():
+            return None
+        
+        # 确保original_screenshot是PIL Image对象
+        if isinstance(screenshot, ScreenCapture):
+            pil_img = Image.fromarray(cv2.cvtColor(screenshot.full_bgr(), cv2.COLOR_BGR2RGB))
+        elif isinstance(screenshot, np.ndarray):
+            # 如果是numpy数组，转换为PIL Image
+            pil_img = Image.fromarray(cv2.cvtColor(screenshot, cv2.COLOR_BGR2RGB))
+        elif isinstance(screenshot, Image.Image):
+            # 已经是PIL Image
+            pil_img = screenshot.copy()
+        else:
+            print(f"错误: 不支持的图像类型 {type(screenshot)}")
+            return None
+
+        draw = ImageDraw.Draw(pil_img)
+
+        # 获取屏幕尺寸，用于限制覆盖区域的大小
+        screen_width = win32api.GetSystemMetrics(0)
+        screen_height = win32api.GetSystemMetrics(1)
+
+        # 计算覆盖区域
+        x1, y1 = x, y
+
+        # 不再自动调整宽度，使用原始选定的宽度
+        # 只进行必要的屏幕边界检查
+        if x + width > screen_width:
+            width = screen_width - x - 10  # 保留10像素边距
+
+        x2, y2 = x + width, y + height
+
+        # 加载并设置字体
+        fonts = self._get_font()
+        if not fonts:
+            return None
+
+        # 打印调试信息
+        print(f"覆盖文本区域: x1={x1}, y1={y1}, x2={x2}, y2={y2}")
+        print(f"覆盖文本内容: {text}")
+
+        # 计算文本布局
+        lines, total_height = self._calculate_text_layout(
+            text, fonts.get('chinese') or fonts.get('default'), width - 2 * self.overlay_padding
+        )
+
+        if not lines:
+            return None
+
+        # 打印详细的调试信息
+        print(f"原始边框区域: x1={x1}, y1={y1}, x2={x2}, y2={y2}, 尺寸={width}x{height}")
+        print(f"内边距: {self.overlay_padding}px")
+        print(f"文本渲染区域: x1={x1 + self.overlay_padding}, y1={y1 + self.overlay_padding}, "
+              f"宽度={width - 2 * self.overlay_padding}, 高度={height - 2 * self.overlay_padding}")
+
+        # 如果需要自动扩展高度并且用户明确开启了此功能
+        if self.overlay_auto_expand:
+            # 计算需要的高度，并调整y2
+            required_height = total_height + 2 * self.overlay_padding
+            if required_height > height:
+                print(f"自动扩展高度: {height} -> {required_height}")
+                new_y2 = y1 + required_height
+                # 确保不超出屏幕底部
+                if new_y2 > screen_height:
+                    new_y2 = screen_height - 10  # 保留10像素边距
+                y2 = new_y2
+                height = y2 - y1
+
+        if cancelled is not None and cancelled():
+            return None
+
+        # 根据覆盖模式处理背景
+        if str(self.overlay_mode).lower() == 'inpaint':
+            try:
+                pil_img = self._smart_cover_background(
+                    pil_img, x1, y1, x2, y2, self._selection_polygons(x1, y1, snapshot)
+                )
+                draw = ImageDraw.Draw(pil_img)
+                print("已使用智能覆盖模式(inpaint)清理原文背景")
+            except Exception as _e:
+                print(f"智能覆盖失败，回退到box模式: {_e}")
+                self._draw_background_and_border(draw, x1, y1, x2, y2)
+        else:
+            # 传统盒子模式
+            self._draw_background_and_border(draw, x1, y1, x2, y2)
+
+        # 计算带内边距的起始位置
+        render_x1 = x1 + self.overlay_padding
+        render_y1 = y1 + self.overlay_padding
+
+        # 如果不允许自动扩展，则尝试自适应缩小字体以适配高度
+        if not self.overlay_auto_expand:
+            target_height = max(0, height - 2 * self.overlay_padding)
+            # 直接使用拟合时得到的排版结果，无需按选定字号再排版一次
+            fit_size, fonts, lines, total_height = self._fit_text_layout(
+                text, width - 2 * self.overlay_padding, target_height
+            )
+            if not lines:
+                return None
+            if fit_size != self.overlay_font_size:
+                print(f"自适应缩放字体: {self.overlay_font_size} -> {fit_size}")
+
+        # 自动选择文本颜色以保持对比度（仅在智能覆盖模式下默认启用）
+        # 颜色只作为参数传给 _render_text，不改写 overlay_text_color，后台渲染时也不影响其他调用
+        text_color = None
+        if str(self.overlay_mode).lower() == 'inpaint' and self.overlay_auto_text_color:
+            try:
+                # 取清理后的ROI估算背景亮度
+                roi = np.array(pil_img)[y1:y2, x1:x2]
+                text_color = self._pick_auto_text_color(roi)
+                print(f"自动选择文本颜色: {self.overlay_text_color} -> {text_color}")
+            except Exception as _:
+                text_color = None
+
+        if cancelled is not None and cancelled():
+            return None
+
+        # 渲染文本
+        self._render_text(draw, lines, fonts, render_x1, render_y1, width - 2 * self.overlay_padding,
+                          height - 2 * self.overlay_padding, fill_color=text_color)
+
+        # 转回OpenCV格式
+        return cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
+
+
+    @staticmethod
+    def _overlay_base_bgr(screenshot):
+        """截图的BGR数组（只读，调用方需自行复制后修改）"""
+        if isinstance(screenshot, ScreenCapture):
+            return screenshot.full_bgr()
+        if isinstance(screenshot, np.ndarray):
+            return screenshot
+        if isinstance(screenshot, Image.Image):
+            return cv2.cvtColor(np.asarray(screenshot.convert('RGB')), cv2.COLOR_RGB2BGR)
+        return None
+
+    def _translate_blocks(self, result):
+        """译文段落数与OCR段落对不上时按段查翻译缓存，任一段未命中返回None
+
+        只查缓存不发请求：覆盖在界面线程和预渲染线程上执行，不能等网络
+        """
+        translated = [self.translator.cached_translation(p.text, context=result.text) for p in result.paragraphs]
+        if not all(translated):
+            return None
+        return [t.strip() for t in translated]
+
+    def _overlay_per_block(self, text, x, y, snapshot, workers=None, cancelled=None):
+        """逐段覆盖：每个OCR段落在自己的框内修复背景并排版译文，返回BGR结果图或None（回退整块模式）
+
+        - 修复掩码直接由该段OCR行多边形栅格化得到，inpaint 工作量随文字面积而不是选区面积增长
+        - 字号拟合与排版在当前线程依次完成；背景修复与文字绘制按段落并行（[OVERLAY] overlay_workers，
+          workers 参数优先；为1时在当前线程依次完成）
+        - cancelled() 返回True时在段落之间放弃，返回None
+        """
+        result = snapshot['ocr_result']
+        selection = snapshot['selection']
+        if not self.overlay_per_block or str(self.overlay_mode).lower() != 'inpaint':
+            return None
+        if result is None or not result.has_geometry or not selection:
+            return None
+        if tuple(selection[:2]) != (x, y):
+            return None  # 译文窗口不属于快照中的选区
+        base = self._overlay_base_bgr(snapshot['screenshot'])
+        if base is None:
+            return None
+
+        paragraphs = result.paragraphs
+        translated = [t.strip() for t in text.split("\n\n")]
+        if len(translated) != len(paragraphs) or not all(translated):
+            translated = self._translate_blocks(result)
+            if translated is None:
+                print("逐段覆盖: 段落译文不完整，回退到整块覆盖")
+                return None
+
+        height, width = base.shape[:2]
+        pad = 3
+        min_size = max(8, int(self.overlay_min_font_size))
+        blocks = []
+        for paragraph, block_text in zip(paragraphs, translated):
+            px1, py1, px2, py2 = paragraph.bbox
+            bx1, by1 = max(0, int(x + px1) - pad), max(0, int(y + py1) - pad)
+            bx2, by2 = min(width, int(np.ceil(x + px2)) + pad), min(height, int(np.ceil(y + py2)) + pad)
+            if bx2 - bx1 < 4 or by2 - by1 < 4:
+                continue
+            para_lines = result.paragraph_lines(paragraph)
+            # 行多边形平移到段落框坐标系，作为修复掩码的来源
+            polygons = [line.box + np.float32([x - bx1, y - by1]) for line in para_lines]
+            line_heights = [line.bbox[3] - line.bbox[1] for line in para_lines]
+            # 起始字号取原文行高，译文再按框高逐步缩小
+            start_size = max(min_size, int(float(np.median(line_heights)) * 0.9))
+            box_w, box_h = bx2 - bx1, by2 - by1
+            try:
+                _, fonts, lines, _ = self._fit_text_layout(block_text, box_w, box_h, start_size=start_size, min_width=1)
+            except (KeyError, TypeError):
+                return None  # 字体加载失败（无可用的中文字体对象）
+            if not lines:
+                continue
+            blocks.append(((bx1, by1, bx2, by2), polygons, lines, fonts))
+        if not blocks:
+            return None
+
+        def render(block):
+            if cancelled is not None and cancelled():
+                return None
+            return self._render_overlay_block(base, *block)
+
+        from concurrent.futures import ThreadPoolExecutor
+        workers = int(workers or self.overlay_workers or 0) or max(1, min(4, os.cpu_count() or 1))
+        canvas = base.copy()
+        if workers == 1 or len(blocks) == 1:
+            patches = [render(block) for block in blocks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(workers, len(blocks)), thread_name_prefix='overlay-block') as pool:
+                patches = list(pool.map(render, blocks))
+        if cancelled is not None and cancelled():
+            return None
+        for ((bx1, by1, bx2, by2), _, _, _), patch in zip(blocks, patches):
+            canvas[by1:by2, bx1:bx2] = patch
+        print(f"逐段覆盖完成: {len(blocks)}个段落")
+        return canvas
+
+    def _render_overlay_block(self, base, rect, polygons, lines, fonts):
+        """在一个段落框内：按OCR行多边形掩码修复背景、选择文字颜色并绘制译文，返回BGR图块"""
+        bx1, by1, bx2, by2 = rect
+        roi = base[by1:by2, bx1:bx2].copy()
+        patch = self._inpaint_roi(roi, self._polygon_text_mask(roi, polygons), polygons)
+        color = self._pick_auto_text_color(patch) if self.overlay_auto_text_color else self.overlay_text_color
+        block_img = Image.fromarray(cv2.cvtColor(patch, cv2.COLOR_BGR2RGB))
+        self._render_text(ImageDraw.Draw(block_img), lines, fonts, 0, 0, bx2 - bx1, by2 - by1, fill_color=color)
+        return cv2.cvtColor(np.asarray(block_img), cv2.COLOR_RGB2BGR)
+
     def _validate_overlay_params(self, text, x, y, width, height):
         """验证覆盖参数的有效性"""
         if self.original_screenshot is None:
@@ -662,269 +1150,120 @@ class OCRTranslator:
             
         return True
     
-    def _get_font(self):
+    def _get_font(self, size=None):
         """获取字体对象，使用字体回退机制支持中文和彩色表情符号
 
-        兼容可选的size参数: 如果self._temp_font_size存在则优先使用
+        字体由进程级 font_registry 按 (路径, 字号) 缓存，不再每次从磁盘加载。
         """
         try:
-            # 根据运行环境确定基础路径
-            if getattr(sys, 'frozen', False):
-                # 如果是EXE，使用EXE所在目录
-                base_path = os.path.dirname(sys.executable)
-            else:
-                # 如果是开发环境，使用当前文件所在目录的上级目录
-                base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            
-            # 获取fonts目录的绝对路径
-            fonts_dir = os.path.join(base_path, "fonts")
-            
-            if not os.path.exists(fonts_dir):
-                os.makedirs(fonts_dir)
-                print(f"创建字体目录: {fonts_dir}")
-            
-            # 加载中文字体
-            chinese_font_paths = [
-                os.path.join(fonts_dir, "msyh.ttc"),  # 微软雅黑
-                os.path.join(fonts_dir, "simhei.ttf"),  # 黑体
-                os.path.join(fonts_dir, "simsun.ttc"),  # 宋体
-            ]
-            
-            chinese_font = None
-            for path in chinese_font_paths:
-                try:
-                    if os.path.exists(path):
-                        size = getattr(self, '_temp_font_size', self.overlay_font_size)
-                        chinese_font = ImageFont.truetype(path, size)
-                        print(f"成功加载中文字体: {path}")
-                        break
-                except Exception:
-                    continue
-            
-            if chinese_font is None:
-                print("警告：无法加载中文字体，将使用默认字体")
-                chinese_font = ImageFont.load_default()
-            
-            # 加载彩色表情符号字体
-            emoji_font_paths = [
-                os.path.join(fonts_dir, "seguiemj.ttf"),  # Segoe UI Emoji
-                os.path.join(fonts_dir, "seguisym.ttf"),  # Segoe UI Symbol
-                os.path.join(fonts_dir, "segoeui.ttf"),   # Segoe UI
-            ]
-            
-            emoji_font = None
-            for path in emoji_font_paths:
-                try:
-                    if os.path.exists(path):
-                        size = getattr(self, '_temp_font_size', self.overlay_font_size)
-                        emoji_font = ImageFont.truetype(path, size)
-                        print(f"成功加载emoji字体: {path}")
-                        break
-                except Exception:
-                    continue
-            
-            if emoji_font is None:
-                print("警告：无法加载emoji字体，将使用中文字体作为后备")
-                emoji_font = chinese_font
-            
-            return {
-                'chinese': chinese_font,
-                'emoji': emoji_font
-            }
-            
+            return font_registry.fonts(size or self.overlay_font_size)
         except Exception as e:
             print(f"加载字体失败: {e}，尝试使用默认字体")
             try:
-                return {'default': ImageFont.load_default()}
+                # 同时以 chinese/emoji 键提供，排版与逐字渲染无需区分是否回退
+                default = ImageFont.load_default()
+                return {'default': default, 'chinese': default, 'emoji': default}
             except Exception as e:
                 print(f"加载默认字体也失败: {e}")
                 return None
 
     def _get_font_with_size(self, size: int):
         """按指定字号加载字体，返回{'chinese','emoji'}"""
-        self._temp_font_size = size
-        try:
-            fonts = self._get_font()
-        finally:
-            if hasattr(self, '_temp_font_size'):
-                delattr(self, '_temp_font_size')
-        return fonts
+        return self._get_font(size)
     
-    def _calculate_text_layout(self, text, font, width):
-        """计算文本布局"""
+    def _calculate_text_layout(self, text, font, width, min_width=200):
+        """计算文本布局，返回 ([(行文本, 是否段落末行)], 总高度)
+
+        行宽由逐字前进宽度累加得到（font_registry 按字体缓存），换行判断不再对每个前缀调用 getbbox。
+        min_width: 可用宽度下限，逐块覆盖时按段落框实际宽度排版。
+        """
         try:
             max_width = width  # 不需要减去内边距，因为调用时已经传入了有效宽度
             lines = []
             total_height = 0  # 初始高度设为0，不预留顶部空间
             
-            # 设置行间距，长行被强制换行时，使用段落间距
-            paragraph_spacing = 0.8  # 段落间距
-            inline_spacing = 0.4  # 段落内行间距
-            
-            print(f"计算文本布局 - 可用宽度: {max_width}px, 段落间距: {paragraph_spacing}, 段落内行间距: {inline_spacing}")
+            # 长行被强制换行时也使用段落间距，防止行重叠
+            paragraph_spacing = 0.8
             
             # 如果max_width太小，设置一个最小值
-            if max_width < 200:
-                max_width = 200
+            if max_width < min_width:
+                max_width = min_width
                 print(f"警告: 宽度太小，已调整为最小宽度: {max_width}px")
-            
-            # 检查文本是否包含多个段落
-            if "\n\n" in text:
-                # 分割段落处理
-                paragraphs = text.split("\n\n")
-                all_lines = []
-                
-                # 计算每个段落的行
-                for i, paragraph in enumerate(paragraphs):
-                    # 检测是否为中文文本
-                    is_chinese = any('\u4e00' <= char <= '\u9fff' for char in paragraph)
-                    paragraph_lines = []
-                    current_line = ""
-                    
-                    if is_chinese:
-                        # 中文文本按字符换行
-                        for char in paragraph:
-                            test_line = current_line + char
-                            bbox = font.getbbox(test_line)
-                            if bbox[2] <= max_width:
-                                current_line = test_line
-                            else:
-                                if current_line:
-                                    # 对于长行强制换行的情况，使用段落间距而不是行内间距
-                                    paragraph_lines.append((current_line, False))
-                                    # 使用段落间距，防止行重叠
-                                    total_height += bbox[3] * paragraph_spacing
-                                current_line = char
-                    else:
-                        # 英文文本按单词换行
-                        words = paragraph.split()
-                        for word in words:
-                            # 如果当前行为空，但单词本身就超出最大宽度，则需要强制切分单词
-                            if (not current_line and font.getbbox(word)[2] > max_width) or len(word) > 30:
-                                # 逐字符添加，直到达到最大宽度
-                                temp_word = ""
-                                for char in word:
-                                    test_word = temp_word + char
-                                    if font.getbbox(test_word)[2] <= max_width:
-                                        temp_word = test_word
-                                    else:
-                                        if temp_word:
-                                            # 对于长单词强制拆分的情况，使用段落间距
-                                            paragraph_lines.append((temp_word, False))
-                                            bbox = font.getbbox(temp_word)
-                                            # 使用段落间距，防止行重叠
-                                            total_height += bbox[3] * paragraph_spacing
-                                        temp_word = char
-                                
-                                # 处理剩余部分
-                                if temp_word:
-                                    current_line = temp_word
-                                continue
-                                
-                            # 常规单词处理
-                            test_line = current_line + (" " if current_line else "") + word
-                            bbox = font.getbbox(test_line)
-                            if bbox[2] <= max_width:
-                                current_line = test_line
-                            else:
-                                if current_line:
-                                    # 正常换行情况，使用段落间距
-                                    paragraph_lines.append((current_line, False))
-                                    # 使用段落间距，防止行重叠
-                                    total_height += bbox[3] * paragraph_spacing
-                                current_line = word
-                    
-                    # 添加最后一行
-                    if current_line:
-                        # 添加一个标记(True)表示这是段落的结束行
-                        paragraph_lines.append((current_line, True))
-                        bbox = font.getbbox(current_line)
-                        # 使用较大的段落间距
-                        total_height += bbox[3] * paragraph_spacing
-                    
-                    # 将当前段落的行添加到所有行
-                    if paragraph_lines:
-                        all_lines.extend(paragraph_lines)
-                        # 如果不是最后一个段落，添加空行作为段落分隔
-                        if i < len(paragraphs) - 1:
-                            all_lines.append(("", True))
-                            total_height += font.getbbox("A")[3] * paragraph_spacing
-                
-                # 设置结果
-                lines = all_lines
-            else:
+
+            def advance(char):
+                return font_registry.char_advance(font, char)
+
+            def line_bottom(line):
+                return max((font_registry.char_bbox(font, char)[3] for char in line), default=0)
+
+            space_width = advance(" ")
+            paragraphs = text.split("\n\n")
+            for i, paragraph in enumerate(paragraphs):
+                paragraph_lines = []
+                current_line, current_width = "", 0.0
                 # 检测是否为中文文本
-                is_chinese = any('\u4e00' <= char <= '\u9fff' for char in text)
-                
-                current_line = ""  # 添加缺失的变量
-                
-                if is_chinese:
+                if any('\u4e00' <= char <= '\u9fff' for char in paragraph):
                     # 中文文本按字符换行
-                    for char in text:
-                        test_line = current_line + char
-                        bbox = font.getbbox(test_line)
-                        if bbox[2] <= max_width:
-                            current_line = test_line
+                    for char in paragraph:
+                        char_width = advance(char)
+                        if current_width + char_width <= max_width:
+                            current_line += char
+                            current_width += char_width
                         else:
                             if current_line:
-                                # 对于长行强制换行的情况，使用段落间距
-                                lines.append((current_line, False))
-                                # 使用段落间距，防止行重叠
-                                total_height += bbox[3] * paragraph_spacing
-                            current_line = char
+                                paragraph_lines.append((current_line, False))
+                                total_height += line_bottom(current_line + char) * paragraph_spacing
+                            current_line, current_width = char, char_width
                 else:
-                    # 英文文本按单词换行，特殊处理超长单词
-                    words = text.split()
-                    for word in words:
-                        # 特殊处理：如果当前行为空但词语本身就超长，或者单词太长
-                        if (not current_line and font.getbbox(word)[2] > max_width) or len(word) > 30:
-                            # 逐字符添加，直到达到最大宽度
-                            temp_word = ""
+                    # 英文文本按单词换行
+                    for word in paragraph.split():
+                        word_width = font_registry.text_width(font, word)
+                        # 单词本身超出最大宽度或过长时，逐字符强制切分
+                        if (not current_line and word_width > max_width) or len(word) > 30:
+                            if current_line:
+                                paragraph_lines.append((current_line, False))
+                                total_height += line_bottom(current_line) * paragraph_spacing
+                            piece, piece_width = "", 0.0
                             for char in word:
-                                test_word = temp_word + char
-                                if font.getbbox(test_word)[2] <= max_width:
-                                    temp_word = test_word
+                                char_width = advance(char)
+                                if piece_width + char_width <= max_width:
+                                    piece += char
+                                    piece_width += char_width
                                 else:
-                                    if temp_word:
-                                        # 对于长单词强制拆分的情况，使用段落间距
-                                        lines.append((temp_word, False))
-                                        bbox = font.getbbox(temp_word)
-                                        # 使用段落间距，防止行重叠
-                                        total_height += bbox[3] * paragraph_spacing
-                                    temp_word = char
-                            
-                            # 处理剩余部分
-                            if temp_word:
-                                current_line = temp_word
+                                    if piece:
+                                        paragraph_lines.append((piece, False))
+                                        total_height += line_bottom(piece) * paragraph_spacing
+                                    piece, piece_width = char, char_width
+                            current_line, current_width = piece, piece_width
                             continue
-                            
+
                         # 常规单词处理
-                        test_line = current_line + (" " if current_line else "") + word
-                        bbox = font.getbbox(test_line)
-                        if bbox[2] <= max_width:
-                            current_line = test_line
+                        test_width = current_width + (space_width if current_line else 0) + word_width
+                        if test_width <= max_width:
+                            current_line = f"{current_line} {word}" if current_line else word
+                            current_width = test_width
                         else:
                             if current_line:
-                                # 正常换行，使用段落间距
-                                lines.append((current_line, False))
-                                # 使用段落间距，防止行重叠
-                                total_height += bbox[3] * paragraph_spacing
-                            current_line = word
-                
-                # 添加最后一行
+                                paragraph_lines.append((current_line, False))
+                                total_height += line_bottom(f"{current_line} {word}") * paragraph_spacing
+                            current_line, current_width = word, word_width
+
+                # 添加最后一行，标记(True)表示这是段落的结束行
                 if current_line:
-                    # 最后一行是段落结束
-                    lines.append((current_line, True))
-                    bbox = font.getbbox(current_line)
-                    total_height += bbox[3] * paragraph_spacing
+                    paragraph_lines.append((current_line, True))
+                    total_height += line_bottom(current_line) * paragraph_spacing
+
+                if paragraph_lines:
+                    lines.extend(paragraph_lines)
+                    # 如果不是最后一个段落，添加空行作为段落分隔
+                    if i < len(paragraphs) - 1:
+                        lines.append(("", True))
+                        total_height += font_registry.char_bbox(font, "A")[3] * paragraph_spacing
             
             # 增加额外空间确保行间不重叠
             extra_space = total_height * 0.1  # 增加10%的总高度作为缓冲
             total_height += extra_space
             
-            # 在方法结束前打印行数和总高度信息
-            print(f"文本布局计算完成 - 共{len(lines)}行, 总高度: {total_height}px")
-            
             return lines, total_height
             
         except Exception as e:
@@ -932,13 +1271,48 @@ class OCRTranslator:
             import traceback
             traceback.print_exc()
             return None, 0
-    
-    def _adjust_overlay_height(self, y1, total_height):
-        """调整覆盖区域高度"""
-        new_height = total_height + 2 * self.overlay_padding
-        y2 = y1 + new_height
-        print(f"自动扩展覆盖区域高度至: {new_height}")
-        return y2, new_height
+
+    def _fit_text_layout(self, text, box_w, box_h, start_size=None, min_width=200):
+        """二分查找排版高度不超过 box_h 的最大字号（不大于起始字号），都放不下时取最小字号。
+
+        各候选字号的排版结果在本次查找内复用，返回 (字号, 字体, 行列表, 总高度)，
+        调用方可直接渲染而无需按选定字号再排版一次。排版失败（行列表为None）的字号视为放不下，
+        此时返回的行列表可能为None，调用方需检查。
+        """
+        size = int(start_size or self.overlay_font_size)
+        min_size = max(8, int(self.overlay_min_font_size))
+        layouts = {}
+
+        def layout(candidate):
+            if candidate not in layouts:
+                fonts = self._get_font_with_size(candidate)
+                font = (fonts.get('chinese') or fonts.get('default')) if fonts else None
+                if font is None:
+                    layouts[candidate] = (candidate, fonts, None, 0)
+                else:
+                    lines, total_h = self._calculate_text_layout(text, font, box_w, min_width=min_width)
+                    layouts[candidate] = (candidate, fonts, lines, total_h)
+            return layouts[candidate]
+
+        def fits(candidate):
+            _, _, lines, total_h = layout(candidate)
+            return lines is not None and total_h <= box_h
+
+        if size <= min_size:
+            return layout(min_size)
+        if fits(size):
+            return layout(size)
+        # 排版高度随字号单调增长
+        best, lo, hi = min_size, min_size, size - 1
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            if fits(mid):
+                best, lo = mid, mid + 1
+            else:
+                hi = mid - 1
+        fitted = layout(best)
+        print(f"字号拟合: {size} -> {best}（尝试{len(layouts)}个字号）")
+        return fitted
     
     def _draw_background_and_border(self, draw, x1, y1, x2, y2):
         """绘制背景和边框，支持渐变和模糊效果"""
@@ -1020,8 +1394,8 @@ class OCRTranslator:
         except Exception as e:
             print(f"绘制渐变背景时出错: {e}")
     
-    def _render_text(self, draw, lines, fonts, x1, y1, width, height):
-        """渲染文本，支持渐变、描边和阴影效果"""
+    def _render_text(self, draw, lines, fonts, x1, y1, width, height, fill_color=None):
+        """渲染文本，支持渐变、描边和阴影效果（fill_color 覆盖默认文字颜色，供并行逐块渲染使用）"""
         try:
             # 顶部边距设为0，直接从顶部开始
             alignment = config.get('OVERLAY', 'OVERLAY_TEXT_ALIGNMENT', 'left')
@@ -1073,13 +1447,13 @@ class OCRTranslator:
                 
                 # 如果是空行，使用基本字体高度
                 if not line:
-                    line_heights.append(fonts['chinese'].getbbox("A")[3])
+                    line_heights.append(font_registry.char_bbox(fonts['chinese'], "A")[3])
                     continue
                     
                 # 计算行高度
-                char_heights = [fonts['emoji' if self._is_emoji(char) else 'chinese'].getbbox(char)[3] 
+                char_heights = [font_registry.char_bbox(fonts['emoji' if self._is_emoji(char) else 'chinese'], char)[3]
                                for char in line]
-                line_heights.append(max(char_heights) if char_heights else fonts['chinese'].getbbox("A")[3])
+                line_heights.append(max(char_heights) if char_heights else font_registry.char_bbox(fonts['chinese'], "A")[3])
             
             # 渲染每一行
             for i, (line_info, line_height) in enumerate(zip(lines, line_heights)):
@@ -1098,7 +1472,7 @@ class OCRTranslator:
                     continue
                 
                 # 计算行宽度用于对齐
-                total_width = sum(fonts['emoji' if self._is_emoji(char) else 'chinese'].getbbox(char)[2] 
+                total_width = sum(font_registry.char_bbox(fonts['emoji' if self._is_emoji(char) else 'chinese'], char)[2]
                                 for char in line)
                 # 考虑字间距调整
                 total_width += char_spacing * (len(line) - 1)
@@ -1117,7 +1491,7 @@ class OCRTranslator:
                 for j, char in enumerate(line):
                     is_emoji = self._is_emoji(char)
                     font = fonts['emoji' if is_emoji else 'chinese']
-                    bbox = font.getbbox(char)
+                    bbox = font_registry.char_bbox(font, char)
                     char_width = bbox[2]
                     
                     # 渲染文本阴影
@@ -1166,7 +1540,7 @@ class OCRTranslator:
                             a = int(gradient_colors[0][3] + (gradient_colors[1][3] - gradient_colors[0][3]) * ratio)
                             text_color = (r,g,b,a)
                         else:
-                            text_color = self.overlay_text_color
+                            text_color = fill_color if fill_color is not None else self.overlay_text_color
                         
                         draw.text(
                             (x_offset, current_y),
@@ -1224,40 +1598,95 @@ class OCRTranslator:
             print(f"构建文本掩码失败: {e}")
             return np.zeros(roi_bgr.shape[:2], dtype=np.uint8)
 
-    def _smart_cover_background(self, pil_img: Image.Image, x1: int, y1: int, x2: int, y2: int) -> Image.Image:
-        """对选区进行inpaint，尽量抹除原文，仅保留背景"""
+    def _selection_polygons(self, x, y, snapshot):
+        """快照中OCR结果的行多边形（选区坐标），覆盖区域不属于该选区或无几何信息时返回None"""
+        result = snapshot['ocr_result']
+        selection = snapshot['selection']
+        if result is None or not result.lines or not selection:
+            return None
+        if tuple(selection[:2]) != (x, y):
+            return None
+        return [line.box for line in result.lines]
+
+    def _polygon_text_mask(self, roi_bgr: np.ndarray, polygons, fill_degenerate=True) -> np.ndarray:
+        """由OCR行多边形栅格化得到文本掩码，并在每个多边形内做轻量笔画细化
+
+        多边形内与中位亮度相差明显的像素视为笔画（Otsu 自适应阈值，下限 18）；
+        笔画占比异常（过少或过多，多为低对比度或反色块）时整块多边形都进入掩码；
+        fill_degenerate=False 用于修复后的残留检查，此时只统计笔画。
+        没有多边形时回退到 _build_text_mask。
+        """
+        if not polygons:
+            return self._build_text_mask(roi_bgr)
+        h, w = roi_bgr.shape[:2]
+        gray = cv2.cvtColor(roi_bgr, cv2.COLOR_BGR2GRAY) if roi_bgr.ndim == 3 else roi_bgr
+        mask = np.zeros((h, w), dtype=np.uint8)
+        k = max(1, int(self.overlay_inpaint_dilate))
+        for polygon in polygons:
+            pts = np.round(np.asarray(polygon, dtype=np.float32).reshape(-1, 2)).astype(np.int32)
+            px1, py1 = np.maximum(pts.min(axis=0) - k, 0)
+            px2, py2 = np.minimum(pts.max(axis=0) + k + 1, (w, h))
+            if px2 <= px1 or py2 <= py1:
+                continue
+            region = np.zeros((py2 - py1, px2 - px1), dtype=np.uint8)
+            cv2.fillPoly(region, [pts - (px1, py1)], 255)
+            inside = region > 0
+            if not inside.any():
+                continue
+            patch = gray[py1:py2, px1:px2]
+            diff = cv2.absdiff(patch, np.full_like(patch, int(np.median(patch[inside]))))
+            level, _ = cv2.threshold(diff[inside].reshape(-1, 1), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            strokes = inside & (diff > max(18.0, level))
+            ratio = strokes.sum() / float(inside.sum())
+            if not fill_degenerate or 0.02 <= ratio <= 0.7:
+                region = strokes.astype(np.uint8) * 255
+            target = mask[py1:py2, px1:px2]
+            np.maximum(target, region, out=target)
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (2 * k + 1, 2 * k + 1))
+        return cv2.dilate(mask, kernel)
+
+    def _smart_cover_background(self, pil_img: Image.Image, x1: int, y1: int, x2: int, y2: int, polygons=None) -> Image.Image:
+        """对选区进行inpaint，尽量抹除原文，仅保留背景；有OCR行多边形时直接用其作掩码"""
         img_bgr = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
         roi = img_bgr[y1:y2, x1:x2].copy()
         if roi.size == 0:
             return pil_img
+        img_bgr[y1:y2, x1:x2] = self._inpaint_roi(roi, self._polygon_text_mask(roi, polygons), polygons)
+        return Image.fromarray(cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB))
+
+    def _inpaint_roi(self, roi: np.ndarray, mask: np.ndarray, polygons=None) -> np.ndarray:
+        """按掩码修复ROI（BGR），残留较多时回退到强力模糊融合；返回新数组
+
+        修复走金字塔降采样（[OVERLAY] overlay_inpaint_tier / overlay_inpaint_budget_ms），
+        残留检查只在预算还有剩余、且不是 fast 档时进行。
+        """
         # 1) 首次inpaint：按文本掩码进行
-        mask = self._build_text_mask(roi)
         radius = int(self.overlay_inpaint_radius) if self.overlay_inpaint_radius else 3
-        try:
-            inpainted = cv2.inpaint(roi, mask, radius, cv2.INPAINT_TELEA)
-        except Exception:
-            inpainted = cv2.inpaint(roi, mask, radius, cv2.INPAINT_NS)
+        tier = str(self.overlay_inpaint_tier).lower()
+        budget_ms = float(self.overlay_inpaint_budget_ms or 0)
+        inpainted, elapsed = pyramid_inpaint(roi, mask, radius, tier, budget_ms)
+        if tier == 'fast' or (budget_ms > 0 and elapsed * 1000 > budget_ms * 0.5):
+            return inpainted
 
         # 2) 评估残留：若仍有明显笔画，使用更激进的清理方案
-        remain = self._build_text_mask(inpainted)
+        remain = self._polygon_text_mask(inpainted, polygons, fill_degenerate=False)
         orig_count = max(1, int(cv2.countNonZero(mask)))
-        remain_count = int(cv2.countNonZero(remain))
+        remain_count = int(cv2.countNonZero(cv2.bitwise_and(remain, mask)))
         area = max(1, roi.shape[0] * roi.shape[1])
         # 若残留占原掩码30%以上或占ROI面积超过1.5%，认定清理不充分
         if remain_count / orig_count > 0.3 or remain_count / area > 0.015:
             try:
-                # 方案A：对ROI做较强中值模糊，彻底抹除细节
+                # 方案A：对ROI做较强中值模糊，只融合进（略微扩大的）掩码区域，掩码外背景保持不变
                 k = 21 if min(roi.shape[0], roi.shape[1]) > 80 else 11
                 blurred = cv2.medianBlur(roi, k)
-                # 为避免边界突兀，与边界做轻微融合
                 alpha = 0.85
-                inpainted = cv2.addWeighted(inpainted, 1 - alpha, blurred, alpha, 0)
+                blended = cv2.addWeighted(inpainted, 1 - alpha, blurred, alpha, 0)
+                region = cv2.dilate(mask, np.ones((5, 5), np.uint8)) > 0
+                inpainted[region] = blended[region]
                 print("首次修复残留较多，已使用强力模糊回退方案清理背景")
             except Exception as _:
                 pass
-
-        img_bgr[y1:y2, x1:x2] = inpainted
-        return Image.fromarray(cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB))
+        return inpainted
 
     def _pick_auto_text_color(self, roi_bgr: np.ndarray):
         """根据背景亮度自动选择黑/白文字，提高可读性"""
@@ -1272,20 +1701,6 @@ class OCRTranslator:
         else:
             return (0, 0, 0, 255)        # 背景偏亮，用黑字
 
-    def _fit_font_to_box(self, text: str, box_w: int, box_h: int, fonts_current) -> int:
-        """尝试减小字体直至排版高度不超过box_h，返回合适字号或原字号"""
-        try:
-            size = getattr(self, '_temp_font_size', None) or self.overlay_font_size
-            min_size = max(8, int(self.overlay_min_font_size))
-            while size >= min_size:
-                f = self._get_font_with_size(size)
-                lines, total_h = self._calculate_text_layout(text, f['chinese'], box_w)
-                if total_h <= box_h:
-                    return size
-                size -= 1
-            return min_size
-        except Exception as _:
-            return self.overlay_font_size
     def _is_emoji(self, char):
         """判断字符是否为emoji"""
         try:
@@ -1666,6 +2081,12 @@ class OCRTranslator:
         self.overlay_auto_text_color = config.get('OVERLAY', 'overlay_auto_text_color', self.overlay_auto_text_color)
         self.overlay_inpaint_radius = config.get('OVERLAY', 'overlay_inpaint_radius', self.overlay_inpaint_radius)
         self.overlay_inpaint_dilate = config.get('OVERLAY', 'overlay_inpaint_dilate', self.overlay_inpaint_dilate)
+        self.overlay_inpaint_tier = config.get('OVERLAY', 'overlay_inpaint_tier', self.overlay_inpaint_tier)
+        self.overlay_inpaint_budget_ms = config.get('OVERLAY', 'overlay_inpaint_budget_ms', self.overlay_inpaint_budget_ms)
+        self.overlay_per_block = config.get('OVERLAY', 'overlay_per_block', self.overlay_per_block)
+        self.overlay_workers = config.get('OVERLAY', 'overlay_workers', self.overlay_workers)
+        self.overlay_prerender = config.get('OVERLAY', 'overlay_prerender', self.overlay_prerender)
+        self.overlay_prerender_wait_ms = config.get('OVERLAY', 'overlay_prerender_wait_ms', self.overlay_prerender_wait_ms)
         
         # Text effects settings
         self.text_stroke_width = config.get('TEXT_EFFECTS', 'text_stroke_width')
@@ -1694,6 +2115,10 @@ class OCRTranslator:
             })
         if self.image_display_window:
             self.image_display_window.reload_settings()
+        # 覆盖相关设置可能已变化，丢弃旧的预渲染结果并按新设置重新生成
+        self._cancel_overlay_prerender()
+        if self.translation_window and self.translation_window.isVisible():
+            self._schedule_overlay_prerender(self.translation_window)
 
     def show_settings(self):
         """显示设置对话框"""
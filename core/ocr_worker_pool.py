@@ -0,0 +1,269 @@
+import os
+import time
+import atexit
+import itertools
+import threading
+import multiprocessing as mp
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+from config_manager import config
+from utils.logger import get_logger
+from .ocr_result import OCRResult
+
+logger = get_logger(__name__)
+
+
+def _attach_shared_memory(name):
+    """Attach to an existing segment without handing it to this process's resource tracker."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+
+def _worker_main(task_queue, result_queue):
+    """OCR工作进程入口：常驻并保持PaddleOCR模型预热"""
+    from core.ocr_handler import OCRHandler
+
+    # 缓存由GUI进程中的OCRHandler负责，工作进程内不重复缓存
+    handler = OCRHandler(use_worker_pool=False, use_cache=False)
+    result_queue.put(('ready', os.getpid(), None))
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        job_id, shm_name, shape, dtype, op = task
+        result = None
+        shm = None
+        try:
+            shm = _attach_shared_memory(shm_name)
+            # 直接在共享内存上构造数组，不经过pickle复制
+            image = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            if op is None:
+                result = handler.perform_ocr_detailed(image)
+            else:
+                # 分块识别的子任务：检测一块或识别一组文本框
+                result = handler.run_tile_op(image, op)
+            del image
+        except Exception as e:
+            logger.error(f"OCR工作进程处理任务{job_id}失败: {e}")
+        finally:
+            if shm is not None:
+                try:
+                    shm.close()
+                except BufferError:
+                    # 仍有视图引用该段（如PIL共享了缓冲区），待其回收后映射自动释放
+                    pass
+        # OCRResult 使用 __slots__，可直接 pickle 回传（含行框与段落）
+        result_queue.put(('result', job_id, result))
+
+
+class OCRWorkerPool:
+    """常驻的OCR进程池（可选）。
+
+    每个工作进程持有一个预热好的 PaddleOCR 实例；截图区域通过
+    multiprocessing.shared_memory 传递（只传段名/形状），多个截图排队时
+    由不同进程并行识别，GUI进程不再承担 Paddle 的计算。
+
+    配置位于 [PADDLEOCR]：
+    - ocr_worker_processes: 工作进程数，0 表示在GUI进程内识别（默认）
+    - ocr_worker_ready_timeout: 等待全部工作进程加载完模型的最长秒数
+    """
+
+    def __init__(self, processes: int):
+        self.processes = max(1, int(processes))
+        self._ctx = mp.get_context('spawn')  # 避免在带Qt线程的进程中fork
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._job_ids = itertools.count(1)
+        self._ready = 0
+        self._all_ready = threading.Event()
+        self._workers = []
+        self._task_queue = None
+        self._result_queue = None
+        self._reader = None
+        self._start()
+        atexit.register(self.close)
+
+    def _start(self) -> None:
+        self._task_queue = self._ctx.Queue()
+        self._result_queue = self._ctx.Queue()
+        self._ready = 0
+        self._all_ready = threading.Event()
+        self._workers = []
+        for i in range(self.processes):
+            proc = self._ctx.Process(
+                target=_worker_main,
+                args=(self._task_queue, self._result_queue),
+                name=f'ocr-worker-{i}',
+                daemon=True
+            )
+            proc.start()
+            self._workers.append(proc)
+        self._reader = threading.Thread(
+            target=self._read_results, args=(self._result_queue,), name='ocr-results', daemon=True
+        )
+        self._reader.start()
+        logger.info(f"OCR工作进程池已启动: {self.processes} 个进程")
+
+    def _read_results(self, result_queue) -> None:
+        while True:
+            try:
+                message = result_queue.get()
+            except (EOFError, OSError):
+                break
+            if message is None:
+                break
+            kind, key, payload = message
+            if kind == 'ready':
+                with self._lock:
+                    self._ready += 1
+                    if self._ready >= self.processes:
+                        self._all_ready.set()
+                logger.info(f"OCR工作进程就绪: pid={key}")
+                continue
+            with self._lock:
+                entry = self._pending.pop(key, None)
+            if entry is None:
+                continue
+            future, shm = entry
+            if shm is not None:
+                self._release(shm)
+            if not future.done():
+                future.set_result(payload)
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """等待全部工作进程发回就绪消息（模型已加载）；超时或有进程退出时返回False"""
+        if timeout is None:
+            timeout = float(config.get('PADDLEOCR', 'OCR_WORKER_READY_TIMEOUT', 120))
+        deadline = time.monotonic() + timeout
+        all_ready = self._all_ready
+        while not all_ready.wait(0.2):
+            with self._lock:
+                workers, ready = list(self._workers), self._ready
+            if not workers:
+                return False
+            if any(not proc.is_alive() for proc in workers):
+                logger.error(f"OCR工作进程在初始化时退出（就绪 {ready}/{self.processes}）")
+                return False
+            if time.monotonic() >= deadline:
+                logger.error(f"等待OCR工作进程就绪超时（{timeout}s，就绪 {ready}/{self.processes}）")
+                return False
+        return True
+
+    @staticmethod
+    def _release(shm) -> None:
+        try:
+            shm.close()
+        except Exception:
+            pass  # 仍有数组视图引用该段时无法关闭，视图回收后映射自动释放
+        try:
+            shm.unlink()
+        except Exception:
+            pass
+
+    def submit(self, image) -> Future:
+        """把图像写入共享内存并排队识别，返回Future（结果为 OCRResult，失败时为 None）"""
+        if isinstance(image, Image.Image):
+            image = np.asarray(image)
+        array = np.ascontiguousarray(image, dtype=np.uint8)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+        return self._enqueue(shm, array.shape, array.dtype.str, None, owned=True)
+
+    def share(self, shape, dtype=np.uint8):
+        """创建共享内存段并返回 (段, 映射在其上的数组)，供多个子任务共用同一份图像；用完调用 unshare()"""
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+        return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    def submit_shared(self, shm, array, op) -> Future:
+        """对 share() 得到的图像排队执行分块子任务 op，返回Future（失败时结果为 None）
+
+        op 为 ('detect', 块矩形) 或 ('recognize', 文本框列表, 是否角度分类)，见 OCRHandler.run_tile_op。
+        共享段由调用方 unshare()，任务完成或超时都不会释放它。
+        """
+        return self._enqueue(shm, array.shape, array.dtype.str, op, owned=False)
+
+    def unshare(self, shm) -> None:
+        """释放 share() 创建的共享内存段（调用前应先删除映射在其上的数组）"""
+        self._release(shm)
+
+    def _enqueue(self, shm, shape, dtype, op, owned):
+        future = Future()
+        job_id = next(self._job_ids)
+        with self._lock:
+            # owned: 任务独占该段，结果到达或超时放弃时由池释放
+            self._pending[job_id] = (future, shm if owned else None)
+            task_queue = self._task_queue
+        task_queue.put((job_id, shm.name, shape, dtype, op))
+        return future
+
+    def perform_ocr(self, image, timeout: Optional[float] = None) -> str:
+        """同步识别；超时或出错时返回空字符串"""
+        return self.perform_ocr_detailed(image, timeout).text
+
+    def discard(self, future: Future) -> None:
+        """放弃超时的任务：释放并删除其共享内存段，之后到达的结果被忽略"""
+        with self._lock:
+            job_id = next((key for key, entry in self._pending.items() if entry[0] is future), None)
+            entry = self._pending.pop(job_id, None) if job_id is not None else None
+        if entry is None:
+            return
+        # 工作进程若仍映射着该段，删除名字后映射保持有效，其关闭时才真正释放
+        if entry[1] is not None:
+            self._release(entry[1])
+        if not future.done():
+            future.set_result(None)
+
+    def perform_ocr_detailed(self, image, timeout: Optional[float] = None) -> OCRResult:
+        """同步识别并返回 OCRResult；超时或出错时返回空结果
+
+        重启后工作进程仍在加载模型时，先等待就绪，识别超时从就绪后开始计算。
+        """
+        if timeout is None:
+            timeout = float(config.get('PADDLEOCR', 'OCR_TIMEOUT', 30))
+        self.wait_ready()
+        future = self.submit(image)
+        try:
+            return future.result(timeout=timeout) or OCRResult()
+        except FutureTimeoutError:
+            logger.error(f"OCR工作进程识别超时（{timeout}s）")
+            self.discard(future)
+            return OCRResult()
+
+    def restart(self) -> None:
+        """重启全部工作进程，使其按最新配置重新初始化模型"""
+        self.close()
+        self._start()
+
+    def close(self) -> None:
+        with self._lock:
+            workers, self._workers = self._workers, []
+            task_queue, result_queue = self._task_queue, self._result_queue
+            pending, self._pending = self._pending, {}
+        if not workers:
+            return
+        for _ in workers:
+            try:
+                task_queue.put(None)
+            except Exception:
+                pass
+        for proc in workers:
+            proc.join(timeout=2)
+            if proc.is_alive():
+                proc.terminate()
+        try:
+            result_queue.put(None)
+        except Exception:
+            pass
+        for future, shm in pending.values():
+            if shm is not None:
+                self._release(shm)
+            if not future.done():
+                future.set_result(None)
@@ -0,0 +1,95 @@
+import threading
+
+import cv2
+import numpy as np
+
+from config_manager import config
+from utils.logger import get_logger
+from .image_processor import MSS_AVAILABLE
+
+if MSS_AVAILABLE:
+    import mss
+
+logger = get_logger(__name__)
+
+
+class RegionWatcher:
+    """监视固定屏幕区域，内容变化且稳定后回调（字幕/游戏对话模式）。
+
+    - 按 [WATCH] watch_fps 轮询，两次轮询之间线程休眠
+    - 变化检测使用缩小的灰度图（长边 watch_signature_side 像素）的平均绝对差
+    - 画面需连续 watch_stable_frames 次不变才触发，避免处理淡入中的字幕
+    - 回调在监视线程中同步执行；回调进行时跳过轮询，不会积压任务
+    """
+
+    def __init__(self, image_processor, rect, on_change):
+        self.image_processor = image_processor
+        self.rect = tuple(int(v) for v in rect)  # (left, top, width, height)，虚拟屏幕绝对坐标
+        self.on_change = on_change
+        self.fps = max(0.1, float(config.get('WATCH', 'watch_fps', 2)))
+        self.threshold = float(config.get('WATCH', 'watch_diff_threshold', 3.0))
+        self.stable_frames = max(0, int(config.get('WATCH', 'watch_stable_frames', 1)))
+        self.signature_side = max(8, int(config.get('WATCH', 'watch_signature_side', 64)))
+        self._stop = threading.Event()
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='region-watcher', daemon=True)
+        self._thread.start()
+        logger.info(f"开始监视区域 {self.rect}，{self.fps:g} FPS")
+
+    def stop(self):
+        self._stop.set()
+        logger.info("已停止区域监视")
+
+    def _signature(self, frame):
+        """缩小的灰度签名：比较成本与区域大小无关"""
+        h, w = frame.shape[:2]
+        scale = min(1.0, float(self.signature_side) / max(h, w, 1))
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small.astype(np.int16)
+
+    @staticmethod
+    def _difference(a, b):
+        if a is None or b is None or a.shape != b.shape:
+            return float('inf')
+        return float(np.mean(np.abs(a - b)))
+
+    def _run(self):
+        interval = 1.0 / self.fps
+        sct = mss.mss() if MSS_AVAILABLE else None
+        previous = None
+        processed = None
+        stable = 0
+        try:
+            while not self._stop.wait(interval):
+                frame = self.image_processor.grab_region(self.rect, sct=sct)
+                if frame is None:
+                    continue
+                signature = self._signature(frame)
+                if self._difference(signature, previous) <= self.threshold:
+                    stable += 1
+                else:
+                    stable = 0
+                previous = signature
+                if stable < self.stable_frames:
+                    continue
+                if self._difference(signature, processed) <= self.threshold:
+                    continue
+                processed = signature
+                try:
+                    self.on_change(frame)
+                except Exception as e:
+                    logger.error(f"区域监视回调出错: {e}")
+        finally:
+            if sct is not None:
+                sct.close()
@@ -3,6 +3,13 @@ import cv2
 
 class TranslationSignals(QObject):
     show_translation = pyqtSignal(str, str, str, str, int, int, int, int, tuple)
+    # Streaming translation: (stream_id, token) and (stream_id, translated_text, source_lang, target_lang)
+    translation_chunk = pyqtSignal(int, str)
+    translation_done = pyqtSignal(int, str, str, str)
+    # Watch-region mode: (watch_id, translated_text, source_text, source_lang, target_lang), updates the window in place
+    watch_update = pyqtSignal(int, str, str, str, str)
+    # Watch-region mode switched on/off (hotkey, tray or a new capture)
+    watch_state = pyqtSignal(bool)
     overlay_text = pyqtSignal(str, int, int, int, int)
     update_history = pyqtSignal()
     show_error = pyqtSignal(str, str)
@@ -0,0 +1,136 @@
+import os
+import json
+import sqlite3
+import threading
+from typing import Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TranslationCache:
+    """SQLite(WAL)持久化的LRU翻译缓存。
+
+    - 写入为单行 UPSERT，不再整体重写文件
+    - 查找按需访问数据库，启动时不加载全部条目
+    - LRU 顺序由索引列 `last_used` 维护，超出上限时按索引淘汰最旧条目
+    """
+
+    def __init__(self, db_path: str, max_size: int = 1000, legacy_json_path: Optional[str] = None):
+        self.db_path = db_path
+        self.max_size = max(1, int(max_size))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        try:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.DatabaseError as e:
+            logger.warning(f"设置翻译缓存WAL模式失败: {e}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries(last_used)")
+        row = self._conn.execute("SELECT COUNT(*), COALESCE(MAX(last_used), 0) FROM entries").fetchone()
+        self._count = int(row[0])
+        self._tick = int(row[1])
+        if legacy_json_path:
+            self._migrate_legacy_json(legacy_json_path)
+        self._evict()
+
+    def _next_tick(self) -> int:
+        self._tick += 1
+        return self._tick
+
+    def _migrate_legacy_json(self, json_path: str) -> None:
+        """一次性导入旧版 translation_cache.json，导入后重命名原文件"""
+        if not os.path.exists(json_path):
+            return
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict) and data:
+                with self._lock:
+                    # 旧文件按 LRU 顺序保存（最旧在前），按顺序分配递增的 last_used
+                    rows = [(str(k), str(v), self._next_tick()) for k, v in data.items()]
+                    self._conn.execute("BEGIN")
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO entries(key, value, last_used) VALUES (?, ?, ?)", rows
+                    )
+                    self._conn.execute("COMMIT")
+                    self._count = int(self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0])
+                logger.info(f"已迁移旧版翻译缓存 {len(data)} 条")
+            os.replace(json_path, json_path + '.migrated')
+        except Exception as e:
+            logger.warning(f"迁移旧版翻译缓存失败: {e}")
+
+    def get(self, key: str) -> Optional[str]:
+        """查找缓存，命中时刷新其LRU位置"""
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                self._conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (self._next_tick(), key))
+                return row[0]
+        except sqlite3.Error as e:
+            logger.warning(f"读取翻译缓存失败: {e}")
+            return None
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            with self._lock:
+                return self._conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone() is not None
+        except sqlite3.Error:
+            return False
+
+    def __len__(self) -> int:
+        return self._count
+
+    def put(self, key: str, value: str) -> None:
+        """写入/更新一条缓存并按需淘汰最旧条目"""
+        try:
+            with self._lock:
+                cur = self._conn.execute(
+                    "UPDATE entries SET value = ?, last_used = ? WHERE key = ?",
+                    (value, self._next_tick(), key)
+                )
+                if cur.rowcount == 0:
+                    self._conn.execute(
+                        "INSERT INTO entries(key, value, last_used) VALUES (?, ?, ?)",
+                        (key, value, self._tick)
+                    )
+                    self._count += 1
+                if self._count > self.max_size:
+                    self._evict_locked()
+        except sqlite3.Error as e:
+            logger.warning(f"保存翻译缓存失败: {e}")
+
+    def set_max_size(self, max_size: int) -> None:
+        self.max_size = max(1, int(max_size))
+        self._evict()
+
+    def _evict(self) -> None:
+        try:
+            with self._lock:
+                self._evict_locked()
+        except sqlite3.Error as e:
+            logger.warning(f"淘汰翻译缓存失败: {e}")
+
+    def _evict_locked(self) -> None:
+        overflow = self._count - self.max_size
+        if overflow <= 0:
+            return
+        cur = self._conn.execute(
+            "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY last_used LIMIT ?)",
+            (overflow,)
+        )
+        self._count -= max(0, cur.rowcount)
+
+    def close(self) -> None:
+        try:
+            with self._lock:
+                self._conn.close()
+        except Exception:
+            pass
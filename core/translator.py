@@ -1,13 +1,157 @@
 import os
+import re
 import json
-from collections import OrderedDict
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
 import translators as ts
 from config_manager import config
 from utils.logger import get_logger
+from .translation_cache import TranslationCache
+from .http_pool import HttpPool, set_shared_pool
 
 logger = get_logger(__name__)
 
+
+class _OrderedTokenStream:
+    """Merge per-paragraph token streams into one callback in paragraph order.
+
+    Tokens of the paragraph at the head are forwarded live; later paragraphs
+    are buffered and flushed (joined by blank lines) once the head finishes.
+    """
+
+    def __init__(self, count, on_token):
+        self._on_token = on_token
+        self._buffers = [[] for _ in range(count)]
+        self._finals = [None] * count
+        self._head = 0
+        self._lock = threading.Lock()
+
+    def feed(self, index, token):
+        with self._lock:
+            self._buffers[index].append(token)
+            if index == self._head:
+                self._on_token(token)
+
+    def finish(self, index, final_text):
+        with self._lock:
+            self._finals[index] = final_text
+            while self._head < len(self._finals) and self._finals[self._head] is not None:
+                # 未产生流式token的段落（缓存命中/失败回退）整段输出
+                if not self._buffers[self._head] and self._finals[self._head]:
+                    self._on_token(self._finals[self._head])
+                self._head += 1
+                if self._head < len(self._finals):
+                    self._on_token("\n\n")
+                    if self._buffers[self._head]:
+                        self._on_token("".join(self._buffers[self._head]))
+
+
+class _BatchStreamSplitter:
+    """Route a streamed batch-prompt reply to per-segment token callbacks.
+
+    Text after the marker line "[[k]]" belongs to segment k-1. A line that
+    could still turn into a marker is held back until it is decided; text
+    before the first marker and blank lines at segment edges are dropped,
+    matching what _unpack_batch keeps.
+    """
+
+    _MARKER_RE = re.compile(r'^[ \t]*\[\[(\d+)\]\][ \t]*$')
+    _PREFIX_RE = re.compile(r'^[ \t]*(\[(\[(\d+(\](\][ \t]*)?)?)?)?)?$')
+
+    def __init__(self, count, on_token):
+        self._count = count
+        self._on_token = on_token  # (segment_index, token)
+        self._segment = None
+        self._fresh = False      # no text emitted yet for the current segment
+        self._newlines = 0       # line breaks held until more text follows
+        self._partial = ""       # start of a line that may still be a marker
+        self._decided = False    # current line is known not to be a marker
+
+    def feed(self, token):
+        while token:
+            cut = token.find("\n")
+            piece, token = (token, "") if cut < 0 else (token[:cut], token[cut + 1:])
+            if self._decided:
+                self._text(piece)
+            else:
+                self._partial += piece
+                if cut < 0 and not self._PREFIX_RE.match(self._partial):
+                    self._decided = True
+                    self._text(self._partial)
+                    self._partial = ""
+            if cut < 0:
+                continue
+            match = None if self._decided else self._MARKER_RE.match(self._partial)
+            if match and 1 <= int(match.group(1)) <= self._count:
+                self._segment = int(match.group(1)) - 1
+                self._fresh, self._newlines = True, 0
+            else:
+                self._text(self._partial)
+                self._newlines += 1
+            self._partial, self._decided = "", False
+
+    def finish(self):
+        """Flush a trailing line that turned out not to be a marker."""
+        if self._partial and not self._MARKER_RE.match(self._partial):
+            self._text(self._partial)
+        self._partial = ""
+
+    def _text(self, text):
+        if self._segment is None or not text:
+            return
+        if self._fresh:
+            text = text.lstrip()
+            if not text:
+                return
+            self._fresh, self._newlines = False, 0
+        if self._newlines:
+            self._on_token(self._segment, "\n" * self._newlines)
+            self._newlines = 0
+        self._on_token(self._segment, text)
+
+
+class _EngineLatencyStats:
+    """Per-engine latency EWMA used to order engines in race mode.
+
+    Failures are recorded at a penalty latency so flaky engines sink in the
+    ranking; engines without samples rank first so they get measured.
+    """
+
+    def __init__(self, alpha=0.3):
+        self._alpha = alpha
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, engine, latency, ok, penalty=None):
+        if not ok and penalty is not None:
+            latency = max(latency, penalty)
+        with self._lock:
+            entry = self._stats.setdefault(engine, {'ewma': latency, 'samples': 0, 'wins': 0, 'failures': 0})
+            if entry['samples']:
+                entry['ewma'] += self._alpha * (latency - entry['ewma'])
+            else:
+                entry['ewma'] = latency
+            entry['samples'] += 1
+            if not ok:
+                entry['failures'] += 1
+
+    def record_win(self, engine):
+        with self._lock:
+            if engine in self._stats:
+                self._stats[engine]['wins'] += 1
+
+    def rank(self, engines):
+        """Order engines fastest first (configured order breaks ties)."""
+        with self._lock:
+            def key(item):
+                index, engine = item
+                entry = self._stats.get(engine)
+                return (entry['ewma'] if entry else 0.0, index)
+            return [engine for _, engine in sorted(enumerate(engines), key=key)]
+
+
 class Translator:
     def __init__(self):
         self.source_lang = config.SOURCE_LANGUAGE
@@ -21,10 +165,13 @@ class Translator:
         project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self._cache_dir = os.path.join(project_root, 'cache')
         os.makedirs(self._cache_dir, exist_ok=True)
-        self._cache_file = os.path.join(self._cache_dir, 'translation_cache.json')
-        # Ordered cache for simple LRU behavior
-        self.translation_cache = OrderedDict()
-        self._load_cache()
+        self._cache_file = os.path.join(self._cache_dir, 'translation_cache.db')
+        # SQLite-backed LRU cache (legacy JSON cache is imported once)
+        self.translation_cache = TranslationCache(
+            self._cache_file,
+            self.max_cache_size,
+            legacy_json_path=os.path.join(self._cache_dir, 'translation_cache.json')
+        )
         self.translation_engine = config.get('OCR_TRANSLATION', 'TRANSLATION_ENGINE', 'default')
         self.translation_prompt = config.get('OCR_TRANSLATION', 'TRANSLATION_PROMPT', '')
         self.translation_model = config.get('OCR_TRANSLATION', 'TRANSLATION_MODEL', 'llama2')
@@ -32,66 +179,162 @@ class Translator:
         # Prefer config, fallback to environment
         self.openai_api_key = config.get('OCR_TRANSLATION', 'OPENAI_API_KEY', '') or os.getenv('OPENAI_API_KEY', '')
         self.openai_model = config.get('OCR_TRANSLATION', 'OPENAI_MODEL', 'gpt-3.5-turbo')
+        # Shared keep-alive connection pool for all engines (also used by other network clients)
+        self.http = HttpPool()
+        set_shared_pool(self.http)
+        # Bounded worker pool for concurrent paragraph translation
+        self._executor = None
+        self._executor_workers = 0
+        self._executor_lock = threading.Lock()
+        # Race mode: hedged requests across several engines
+        self._race_executor = None
+        self._race_lock = threading.Lock()
+        self._race_local = threading.local()
+        self.engine_stats = _EngineLatencyStats()
 
-    def _cache_key(self, text: str) -> str:
+    def _cache_key(self, text: str, source_lang=None) -> str:
         """Build a stable cache key for a translation input."""
         engine = str(self.translation_engine or '').lower()
         model = str(self.translation_model or '')
-        return f"{engine}|{model}|{self.source_lang}|{self.target_lang}|{text}"
+        return f"{engine}|{model}|{self._source(source_lang)}|{self.target_lang}|{text}"
 
-    def _load_cache(self) -> None:
-        try:
-            if os.path.exists(self._cache_file):
-                with open(self._cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if isinstance(data, dict):
-                        # Preserve order when loading
-                        self.translation_cache = OrderedDict(data)
-                        # Trim if oversized
-                        while len(self.translation_cache) > self.max_cache_size:
-                            self.translation_cache.popitem(last=False)
-        except Exception as e:
-            logger.warning(f"加载翻译缓存失败: {e}")
+    def _source(self, source_lang=None):
+        """本次请求的源语言：显式传入的优先，否则用配置值（并发请求不共享可变状态）"""
+        return self.source_lang if source_lang is None else source_lang
 
-    def _save_cache(self) -> None:
+    @staticmethod
+    def _clean_text(text: str) -> str:
+        """Escape characters that break engine payloads (shared by cache lookups)."""
+        return text.replace('\\', '\\\\')
+
+    def _lookup_cache(self, text: str, source_lang=None):
+        """Return the cached translation for raw paragraph text, or None."""
+        return self.translation_cache.get(self._cache_key(self._clean_text(text), source_lang))
+
+    def _effective_source(self, text):
+        """Configured source language, or the detected one when set to auto."""
+        if str(self.source_lang).lower() in {"auto", "detect", ""}:
+            return self._detect_language(text)
+        return self.source_lang
+
+    def cached_translation(self, text, context=None):
+        """Cache-only lookup of a paragraph translated earlier; never hits the network.
+
+        context: the full text that was passed to translate(), used for
+        auto-detecting the source language the same way translate() did.
+        Returns None on a miss.
+        """
+        return self._lookup_cache(text, self._effective_source(context or text))
+
+    def _engine_concurrency(self) -> int:
+        """Max concurrent requests for the active engine.
+
+        `[OCR_TRANSLATION] engine_concurrency` maps engine name -> limit,
+        `default_concurrency` applies to engines not listed.
+        """
+        limits = config.get('OCR_TRANSLATION', 'ENGINE_CONCURRENCY', {})
+        default = config.get('OCR_TRANSLATION', 'DEFAULT_CONCURRENCY', 4)
+        engine = str(self.translation_engine or '')
+        limit = default
+        if isinstance(limits, dict):
+            limit = limits.get(engine, limits.get(engine.lower(), default))
         try:
-            with open(self._cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.translation_cache, f, ensure_ascii=False)
-        except Exception as e:
-            logger.warning(f"保存翻译缓存失败: {e}")
+            return max(1, int(limit))
+        except (TypeError, ValueError):
+            return 1
+
+    def _submit(self, fn, *args):
+        """Submit to the shared paragraph worker pool, resizing it when the engine limit changes.
+
+        Swapping the pool and submitting happen under one lock, so no thread can
+        submit to a pool that another thread has just shut down. The old pool
+        still finishes the work already queued on it.
+        """
+        workers = self._engine_concurrency()
+        with self._executor_lock:
+            if self._executor is None or self._executor_workers != workers:
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='translate')
+                self._executor_workers = workers
+            return self._executor.submit(fn, *args)
 
-    def translate_text(self, text):
-        """Send the text to the translation API"""
+    def streaming_enabled(self) -> bool:
+        """Whether the active engine streams tokens (`[OCR_TRANSLATION] stream_translation`)."""
+        engine = str(self.translation_engine or '').lower()
+        return (engine in ("ollama", "openai")
+                and bool(config.get('OCR_TRANSLATION', 'STREAM_TRANSLATION', True))
+                and not self._race_enabled())
+
+    def _race_engines(self):
+        """Engines raced against each other (`[OCR_TRANSLATION] race_engines`)."""
+        engines = config.get('OCR_TRANSLATION', 'RACE_ENGINES', [])
+        if not isinstance(engines, (list, tuple)):
+            return []
+        return [str(e) for e in engines if str(e).strip()]
+
+    def _race_enabled(self) -> bool:
+        """Race mode needs `race_mode = True` and at least two race engines."""
+        return bool(config.get('OCR_TRANSLATION', 'RACE_MODE', False)) and len(self._race_engines()) > 1
+
+    def translate_text(self, text, on_token=None, source_lang=None):
+        """Send the text to the translation API
+
+        on_token: optional callback that receives the translation incrementally
+        (live tokens for streaming engines, otherwise the whole result at once).
+        source_lang: source language for this call; defaults to the configured one.
+        """
         try:
             # Clean the text to remove or escape problematic characters
-            cleaned_text = text.replace('\\', '\\\\')  # Escape backslashes
+            cleaned_text = self._clean_text(text)  # Escape backslashes
             
             # Check translation cache (persistent LRU)
-            cache_key = self._cache_key(cleaned_text)
-            if cache_key in self.translation_cache:
-                # Move to MRU position
-                self.translation_cache.move_to_end(cache_key, last=True)
+            cache_key = self._cache_key(cleaned_text, source_lang)
+            cached = self.translation_cache.get(cache_key)
+            if cached is not None:
                 logger.info("Using cached translation")
-                return self.translation_cache[cache_key]
+                if on_token:
+                    on_token(cached)
+                return cached
             
-            if self.translation_engine.lower() == "ollama":
-                return self._translate_with_ollama(cleaned_text)
-            elif self.translation_engine.lower() == "openai":
-                return self._translate_with_openai(cleaned_text)
-            elif self.translation_engine == "谷歌翻译":
-                return self._translate_with_google(cleaned_text)
-            elif self.translation_engine == "测试服务器1":
-                return self._translate_with_test_server(cleaned_text)
-            elif self.translation_engine == "微软翻译":
-                return self._translate_with_microsoft(cleaned_text)
-            elif self.translation_engine == "可腾翻译":
-                return self._translate_with_kerten(cleaned_text)
+            stream_cb = on_token if on_token and self.streaming_enabled() else None
+            translated_text = self._translate_uncached(cleaned_text, cache_key, stream_cb, source_lang)
+            if on_token and stream_cb is None and translated_text:
+                on_token(translated_text)
+            return translated_text
+        
+        except Exception as e:
+            self.translation_errors += 1
+            print(f"Error during translation API call: {e}")
+            return None
+
+    def _translate_uncached(self, cleaned_text, cache_key, on_token=None, source_lang=None):
+        """Dispatch a cache miss to the configured engine (or race several)."""
+        if self._race_enabled():
+            return self._translate_race(cleaned_text, cache_key, source_lang)
+        return self._dispatch_engine(self.translation_engine, cleaned_text, cache_key, on_token, source_lang)
+
+    def _dispatch_engine(self, engine, cleaned_text, cache_key, on_token=None, source_lang=None):
+        """Translate with one named engine."""
+        try:
+            if engine.lower() == "ollama":
+                return self._translate_with_ollama(cleaned_text, on_token=on_token, source_lang=source_lang)
+            elif engine.lower() == "openai":
+                return self._translate_with_openai(cleaned_text, on_token=on_token, source_lang=source_lang)
+            elif engine == "谷歌翻译":
+                return self._translate_with_google(cleaned_text, source_lang)
+            elif engine == "测试服务器1":
+                return self._translate_with_test_server(cleaned_text, source_lang)
+            elif engine == "微软翻译":
+                return self._translate_with_microsoft(cleaned_text, source_lang)
+            elif engine == "可腾翻译":
+                return self._translate_with_kerten(cleaned_text, source_lang)
             else:
                 try:
                     translated_text = ts.translate_text(
                         query_text=cleaned_text,
-                        translator=self.translation_engine.lower(),
-                        from_language=self.source_lang,
+                        translator=engine.lower(),
+                        from_language=self._source(source_lang),
                         to_language=self.target_lang
                     )
                     if translated_text:
@@ -107,6 +350,89 @@ class Translator:
             print(f"Error during translation API call: {e}")
             return None
 
+    def _get_race_executor(self) -> ThreadPoolExecutor:
+        """Dedicated pool for race attempts (separate from the paragraph pool to avoid nested waits)."""
+        with self._race_lock:
+            if self._race_executor is None:
+                workers = max(4, len(self._race_engines()) * self._engine_concurrency())
+                self._race_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='race')
+            return self._race_executor
+
+    def _translate_race(self, cleaned_text, cache_key, source_lang=None):
+        """Send the text to several engines and keep the first valid answer.
+
+        Engines are ordered by their latency EWMA. With `race_hedge_ms > 0`
+        each backup is only started if no answer arrived within the hedge
+        interval (or the running attempts already failed); `0` fires all at
+        once. Attempts not yet started are cancelled once a winner is known;
+        in-flight losers are discarded and never written to the cache.
+        """
+        engines = self.engine_stats.rank(self._race_engines())
+        fanout = config.get('OCR_TRANSLATION', 'RACE_FANOUT', 0)
+        try:
+            fanout = int(fanout)
+        except (TypeError, ValueError):
+            fanout = 0
+        if fanout > 0:
+            engines = engines[:max(1, fanout)]
+        hedge = max(0.0, float(config.get('OCR_TRANSLATION', 'RACE_HEDGE_MS', 300))) / 1000.0
+        penalty = self.http.connect_timeout + self.http.read_timeout
+
+        cond = threading.Condition()
+        state = {'winner': None, 'text': None, 'finished': 0, 'launched': 0}
+
+        def attempt(engine):
+            with cond:
+                if state['winner'] is not None:
+                    return
+            start = time.perf_counter()
+            self._race_local.suppress_cache = True
+            try:
+                text = self._dispatch_engine(engine, cleaned_text, cache_key, source_lang=source_lang)
+            except Exception as e:
+                print(f"竞速引擎 {engine} 出错: {e}")
+                text = None
+            finally:
+                self._race_local.suppress_cache = False
+            ok = bool(text and text.strip())
+            self.engine_stats.record(engine, time.perf_counter() - start, ok, penalty=penalty)
+            with cond:
+                state['finished'] += 1
+                if ok and state['winner'] is None:
+                    state['winner'], state['text'] = engine, text
+                cond.notify_all()
+
+        executor = self._get_race_executor()
+        futures = []
+        for engine in engines:
+            with cond:
+                if state['winner'] is not None:
+                    break
+                if futures and hedge > 0:
+                    # 等待对冲间隔；若已有结果或已启动的请求全部失败则立即继续
+                    cond.wait_for(
+                        lambda: state['winner'] is not None or state['finished'] >= state['launched'],
+                        timeout=hedge
+                    )
+                    if state['winner'] is not None:
+                        break
+                state['launched'] += 1
+            futures.append(executor.submit(attempt, engine))
+
+        with cond:
+            cond.wait_for(lambda: state['winner'] is not None or state['finished'] >= state['launched'])
+            winner, text = state['winner'], state['text']
+        for future in futures:
+            future.cancel()
+
+        if winner is None:
+            print(f"竞速模式: 所有引擎均失败 ({', '.join(engines)})")
+            return None
+        self.engine_stats.record_win(winner)
+        logger.info(f"竞速模式胜出引擎: {winner}（已启动 {len(futures)}/{len(engines)}）")
+        self._update_cache(cache_key, text)
+        return text
+
     def reload_settings(self):
         """Reload translation settings from config"""
         self.source_lang = config.SOURCE_LANGUAGE
@@ -120,67 +446,117 @@ class Translator:
         self.openai_api_key = config.get('OCR_TRANSLATION', 'OPENAI_API_KEY', '')
         self.openai_model = config.get('OCR_TRANSLATION', 'OPENAI_MODEL', 'gpt-3.5-turbo')
         # Trim cache if size reduced
-        while len(self.translation_cache) > self.max_cache_size:
-            try:
-                self.translation_cache.popitem(last=False)
-            except Exception:
-                break
+        self.translation_cache.set_max_size(self.max_cache_size)
+        # Rebuild the connection pool with the new pool sizes/timeouts
+        self.http.rebuild()
+        # Race pool is sized from race_engines; recreate on next use
+        with self._race_lock:
+            if self._race_executor is not None:
+                self._race_executor.shutdown(wait=False)
+                self._race_executor = None
+
+    def _ollama_generate(self, prompt):
+        """POST a prompt to Ollama /api/generate and return the response text (or None)."""
+        payload = {
+            "model": self.translation_model,
+            "prompt": prompt,
+            "stream": False
+        }
+        
+        headers = {
+            "Content-Type": "application/json"
+        }
+        
+        print("\n发送Ollama API请求...")
+        print(f"请求URL: {self.api_url}/api/generate")
+        print(f"请求payload: {payload}")
+
+        # Append "/api/generate" to the API URL for Ollama
+        ollama_api_url = f"{self.api_url}/api/generate"
 
-    def _translate_with_ollama(self, text):
-        """Translate text using Ollama API"""
         try:
-            # Format the prompt according to the template
-            prompt = self.translation_prompt.format(
-                source_lang=self.source_lang,
-                target_lang=self.target_lang,
-                text=text
-            )
-            
-            payload = {
-                "model": self.translation_model,
-                "prompt": prompt,
-                "stream": False
-            }
-            
-            headers = {
-                "Content-Type": "application/json"
-            }
-            
-            print("\n发送Ollama API请求...")
-            print(f"请求URL: {self.api_url}/api/generate")
-            print(f"请求payload: {payload}")
+            response = self.http.post(ollama_api_url, json=payload, headers=headers)
+            print(f"API响应状态码: {response.status_code}")
 
-            # Append "/api/generate" to the API URL for Ollama
-            ollama_api_url = f"{self.api_url}/api/generate"
+            if response.status_code != 200:
+                print(f"HTTP错误: {response.status_code}")
+                print(f"响应内容: {response.text}")
+                return None
 
-            try:
-                response = requests.post(ollama_api_url, json=payload, headers=headers, timeout=30)
-                print(f"API响应状态码: {response.status_code}")
+            result = response.json()
+            print(f"API响应内容: {result}")
 
+            if "response" in result:
+                return result["response"]
+            print("Ollama translation failed or returned empty result.")
+            return None
+
+        except requests.exceptions.RequestException as req_e:
+            print(f"网络请求错误: {req_e}")
+            return None
+        except ValueError as json_e:
+            print(f"JSON解析错误: {json_e}")
+            print(f"原始响应: {response.text if 'response' in locals() else 'No response'}")
+            return None
+
+    def _ollama_generate_stream(self, prompt, on_token):
+        """Stream /api/generate (`stream: true`), forwarding each token; returns the full text."""
+        payload = {
+            "model": self.translation_model,
+            "prompt": prompt,
+            "stream": True
+        }
+        
+        print("\n发送Ollama流式API请求...")
+        ollama_api_url = f"{self.api_url}/api/generate"
+        parts = []
+        try:
+            with self.http.post(ollama_api_url, json=payload, headers={"Content-Type": "application/json"}, stream=True) as response:
+                print(f"API响应状态码: {response.status_code}")
                 if response.status_code != 200:
                     print(f"HTTP错误: {response.status_code}")
                     print(f"响应内容: {response.text}")
                     return None
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        print(f"Ollama流式响应错误: {chunk['error']}")
+                        return None
+                    token = chunk.get("response", "")
+                    if token:
+                        parts.append(token)
+                        on_token(token)
+                    if chunk.get("done"):
+                        break
+        except requests.exceptions.RequestException as req_e:
+            print(f"网络请求错误: {req_e}")
+            return None
+        except ValueError as json_e:
+            print(f"JSON解析错误: {json_e}")
+            return None
+        return "".join(parts) if parts else None
 
-                result = response.json()
-                print(f"API响应内容: {result}")
-
-                if "response" in result:
-                    translated_text = result["response"]
-                    cache_key = self._cache_key(text)
-                    self._update_cache(cache_key, translated_text)
-                    return translated_text
-                else:
-                    print("Ollama translation failed or returned empty result.")
-                    return None
-
-            except requests.exceptions.RequestException as req_e:
-                print(f"网络请求错误: {req_e}")
-                return None
-            except ValueError as json_e:
-                print(f"JSON解析错误: {json_e}")
-                print(f"原始响应: {response.text if 'response' in locals() else 'No response'}")
+    def _translate_with_ollama(self, text, on_token=None, source_lang=None):
+        """Translate text using Ollama API"""
+        try:
+            # Format the prompt according to the template
+            prompt = self.translation_prompt.format(
+                source_lang=self._source(source_lang),
+                target_lang=self.target_lang,
+                text=text
+            )
+            
+            if on_token:
+                translated_text = self._ollama_generate_stream(prompt, on_token)
+            else:
+                translated_text = self._ollama_generate(prompt)
+            if translated_text is None:
                 return None
+            cache_key = self._cache_key(text, source_lang)
+            self._update_cache(cache_key, translated_text)
+            return translated_text
 
         except Exception as e:
             print(f"Error during Ollama translation: {e}")
@@ -188,64 +564,204 @@ class Translator:
             traceback.print_exc()
             return None
 
-    def _translate_with_openai(self, text):
-        """Translate text using OpenAI API"""
-        try:
-            if not self.openai_api_key:
-                print("OpenAI API key not configured")
+    def _openai_system_prompt(self, source_lang=None):
+        """Format the translation prompt as the OpenAI system message."""
+        return self.translation_prompt.format(
+            source_lang=self._source(source_lang),
+            target_lang=self.target_lang,
+        )
+
+    def _openai_chat(self, system_prompt, user_text):
+        """POST a chat completion and return the stripped reply (or None)."""
+        if not self.openai_api_key:
+            print("OpenAI API key not configured")
+            return None
+
+        headers = {
+            "Authorization": f"Bearer {self.openai_api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        payload = {
+            "model": self.openai_model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_text}
+            ],
+            "temperature": config.get('OCR_TRANSLATION', 'temperature', 0.3)  # Use temperature from config
+        }
+        
+        response = self.http.post(
+            f"{self.api_url}/v1/chat/completions",
+            headers=headers,
+            json=payload
+        )
+        
+        result = response.json()
+        
+        if "choices" in result and len(result["choices"]) > 0:
+            return result["choices"][0]["message"]["content"].strip()
+        print("OpenAI translation failed or returned empty result.")
+        return None
+
+    def _openai_chat_stream(self, system_prompt, user_text, on_token):
+        """Stream a chat completion over SSE, forwarding each delta; returns the stripped full reply."""
+        if not self.openai_api_key:
+            print("OpenAI API key not configured")
+            return None
+
+        headers = {
+            "Authorization": f"Bearer {self.openai_api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        payload = {
+            "model": self.openai_model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_text}
+            ],
+            "temperature": config.get('OCR_TRANSLATION', 'temperature', 0.3),
+            "stream": True
+        }
+        
+        parts = []
+        with self.http.post(f"{self.api_url}/v1/chat/completions", headers=headers, json=payload, stream=True) as response:
+            if response.status_code != 200:
+                print(f"HTTP错误: {response.status_code}")
+                print(f"响应内容: {response.text}")
                 return None
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                choices = chunk.get("choices") or []
+                if not choices:
+                    continue
+                token = (choices[0].get("delta") or {}).get("content") or ""
+                if token:
+                    # 首个token去掉前导空白，与非流式的 strip() 保持一致
+                    if not parts:
+                        token = token.lstrip()
+                        if not token:
+                            continue
+                    parts.append(token)
+                    on_token(token)
+        text = "".join(parts).strip()
+        if not text:
+            print("OpenAI translation failed or returned empty result.")
+            return None
+        return text
 
-            headers = {
-                "Authorization": f"Bearer {self.openai_api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            # Format the system message for translation
-            system_message = ""
-            
+    def _translate_with_openai(self, text, on_token=None, source_lang=None):
+        """Translate text using OpenAI API"""
+        try:
             # Format the prompt according to the template
-            prompt = self.translation_prompt.format(
-                source_lang=self.source_lang,
-                target_lang=self.target_lang,
-            )
+            prompt = self._openai_system_prompt(source_lang)
             
             print(f"\nPrompt template: {prompt}")
             
-            payload = {
-                "model": self.openai_model,
-                "messages": [
-                    {"role": "system", "content": prompt},
-                    {"role": "user", "content": text}
-                ],
-                "temperature": config.get('OCR_TRANSLATION', 'temperature', 0.3)  # Use temperature from config
-            }
-            
-            response = requests.post(
-                f"{self.api_url}/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-            
-            result = response.json()
-            
-            if "choices" in result and len(result["choices"]) > 0:
-                translated_text = result["choices"][0]["message"]["content"].strip()
-                cache_key = self._cache_key(text)
-                self._update_cache(cache_key, translated_text)
-                return translated_text
+            if on_token:
+                translated_text = self._openai_chat_stream(prompt, text, on_token)
             else:
-                print("OpenAI translation failed or returned empty result.")
+                translated_text = self._openai_chat(prompt, text)
+            if translated_text is None:
                 return None
+            cache_key = self._cache_key(text, source_lang)
+            self._update_cache(cache_key, translated_text)
+            return translated_text
                 
         except Exception as e:
             print(f"Error during OpenAI translation: {e}")
             return None
 
-    def _translate_with_default_api(self, text):
+    # Numbered segment marker used by batch-prompt mode, e.g. "[[3]]"
+    _BATCH_MARKER_RE = re.compile(r'^[ \t]*\[\[(\d+)\]\][ \t]*$', re.MULTILINE)
+
+    def _batch_mode_enabled(self) -> bool:
+        engine = str(self.translation_engine or '').lower()
+        return (engine in ("ollama", "openai")
+                and bool(config.get('OCR_TRANSLATION', 'LLM_BATCH_MODE', True))
+                and not self._race_enabled())
+
+    @staticmethod
+    def _pack_batch(texts):
+        """Join segments with numbered markers and the instruction to keep them."""
+        instruction = (
+            f"以下文本共 {len(texts)} 段，每段以单独一行的编号标记（如 [[1]]）开头。"
+            "请逐段翻译，原样保留每个编号标记并各占一行，标记顺序不变，不要合并或省略任何段落，不要输出其他内容。"
+        )
+        body = "\n".join(f"[[{i}]]\n{t}" for i, t in enumerate(texts, 1))
+        return instruction, body
+
+    @classmethod
+    def _unpack_batch(cls, reply, count):
+        """Split a batch reply back into `count` segments; None if markers don't line up."""
+        if not reply:
+            return None
+        matches = list(cls._BATCH_MARKER_RE.finditer(reply))
+        if [int(m.group(1)) for m in matches] != list(range(1, count + 1)):
+            return None
+        segments = []
+        for k, m in enumerate(matches):
+            end = matches[k + 1].start() if k + 1 < len(matches) else len(reply)
+            segment = reply[m.end():end].strip()
+            if not segment:
+                return None
+            segments.append(segment)
+        return segments
+
+    def _translate_batch_with_llm(self, texts, source_lang=None, on_token=None):
+        """Translate several paragraphs in one Ollama/OpenAI request.
+
+        Returns the translations in input order, or None if the request fails
+        or the reply cannot be split back into the same number of segments.
+        Successful segments are written to the cache individually.
+        With on_token(segment_index, token) the reply is streamed and split
+        on the markers as it arrives.
+        """
+        try:
+            cleaned = [self._clean_text(t) for t in texts]
+            instruction, body = self._pack_batch(cleaned)
+            engine = str(self.translation_engine or '').lower()
+            print(f"批量翻译模式: {len(cleaned)} 段合并为一次{engine}请求")
+            splitter = _BatchStreamSplitter(len(cleaned), on_token) if on_token else None
+            if engine == "ollama":
+                prompt = self.translation_prompt.format(
+                    source_lang=self._source(source_lang),
+                    target_lang=self.target_lang,
+                    text=f"{instruction}\n\n{body}"
+                )
+                if splitter:
+                    reply = self._ollama_generate_stream(prompt, splitter.feed)
+                else:
+                    reply = self._ollama_generate(prompt)
+            else:
+                system_prompt = f"{self._openai_system_prompt(source_lang)}\n\n{instruction}"
+                if splitter:
+                    reply = self._openai_chat_stream(system_prompt, body, splitter.feed)
+                else:
+                    reply = self._openai_chat(system_prompt, body)
+            if splitter:
+                splitter.finish()
+            segments = self._unpack_batch(reply, len(cleaned))
+            if segments is None:
+                print("批量翻译结果无法按段拆分，回退为逐段翻译")
+                return None
+            for text, translated in zip(cleaned, segments):
+                self._update_cache(self._cache_key(text, source_lang), translated)
+            return segments
+        except Exception as e:
+            print(f"批量翻译失败，回退为逐段翻译: {e}")
+            return None
+
+    def _translate_with_default_api(self, text, source_lang=None):
         """Translate text using the default API"""
         payload = {
-            "source_lang": self.source_lang,
+            "source_lang": self._source(source_lang),
             "target_lang": self.target_lang,
             "text_list": [text],
             "placeholder_markers": None
@@ -256,7 +772,7 @@ class Translator:
         }
         
         print("\n发送API请求...")
-        response = requests.post(self.api_url, json=payload, headers=headers, timeout=30)
+        response = self.http.post(self.api_url, json=payload, headers=headers)
         print(f"API响应状态码: {response.status_code}")
         
         result = response.json()
@@ -268,14 +784,14 @@ class Translator:
             # 如果API返回了错误，但仍然提供了翻译结果，使用它
             if "translations" in result and len(result["translations"]) > 0:
                 translated_text = result["translations"][0]["text"]
-                cache_key = f"{text}_{self.source_lang}_{self.target_lang}"
+                cache_key = f"{text}_{self._source(source_lang)}_{self.target_lang}"
                 self._update_cache(cache_key, translated_text)
                 return translated_text
             return None
         
         if "translations" in result and len(result["translations"]) > 0:
             translated_text = result["translations"][0]["text"]
-            cache_key = self._cache_key(text)
+            cache_key = self._cache_key(text, source_lang)
             self._update_cache(cache_key, translated_text)
             return translated_text
         else:
@@ -283,32 +799,19 @@ class Translator:
             return None
 
     def _update_cache(self, cache_key, translated_text):
-        """Update the LRU translation cache and persist to disk."""
-        self.translation_cache[cache_key] = translated_text
-        # Move to MRU
-        try:
-            self.translation_cache.move_to_end(cache_key, last=True)
-        except Exception:
-            # If underlying type changed, ignore
-            pass
-        # Trim cache if too large
-        while len(self.translation_cache) > self.max_cache_size:
-            try:
-                self.translation_cache.popitem(last=False)
-            except Exception:
-                # Fallback: pop first key
-                self.translation_cache.pop(next(iter(self.translation_cache)))
-                break
-        # Persist
-        self._save_cache()
-
-    def _translate_with_test_server(self, text):
+        """Insert/refresh an entry in the persistent LRU translation cache."""
+        # 竞速模式下只缓存胜出引擎的结果
+        if getattr(self._race_local, 'suppress_cache', False):
+            return
+        self.translation_cache.put(cache_key, translated_text)
+
+    def _translate_with_test_server(self, text, source_lang=None):
         """Translate text using test server API"""
         try:
             scene = config.get('OCR_TRANSLATION', 'scene', 1)  # Get scene from config
             
             payload = {
-                "source_lang": self.source_lang,
+                "source_lang": self._source(source_lang),
                 "target_lang": self.target_lang,
                 "text_list": [text],
                 "placeholder_markers": None,
@@ -320,11 +823,11 @@ class Translator:
             }
             
             print("\n发送测试服务器API请求...")
-            response = requests.post(
+            response = self.http.post(
                 "https://ollama-cjsfy-git-testpublic-sfz009900s-projects.vercel.app/translate",
                 json=payload,
                 headers=headers,
-                timeout=60  # 添加30秒超时设置
+                read_timeout=60  # 测试服务器响应较慢，放宽读取超时
             )
             print(f"API响应状态码: {response.status_code}")
             
@@ -333,7 +836,7 @@ class Translator:
             
             if "translations" in result and len(result["translations"]) > 0:
                 translated_text = result["translations"][0]["text"]
-                cache_key = self._cache_key(text)
+                cache_key = self._cache_key(text, source_lang)
                 self._update_cache(cache_key, translated_text)
                 return translated_text
             else:
@@ -344,7 +847,7 @@ class Translator:
             print(f"Error during test server translation: {e}")
             return None
 
-    def _translate_with_google(self, text):
+    def _translate_with_google(self, text, source_lang=None):
         """Translate text using Google Translate API"""
         try:
             base_url = "http://translate.google.com/translate_a/single"
@@ -353,7 +856,7 @@ class Translator:
                 "dt": "t",
                 "dj": "1",
                 "ie": "UTF-8",
-                "sl": self.source_lang,
+                "sl": self._source(source_lang),
                 "tl": self.target_lang,
                 "q": text
             }
@@ -363,7 +866,7 @@ class Translator:
             }
             
             print("\n发送Google翻译API请求...")
-            response = requests.get(base_url, params=params, headers=headers, timeout=15)
+            response = self.http.get(base_url, params=params, headers=headers, read_timeout=15)
             print(f"API响应状态码: {response.status_code}")
             
             result = response.json()
@@ -371,7 +874,7 @@ class Translator:
             
             if "sentences" in result and len(result["sentences"]) > 0:
                 translated_text = result["sentences"][0]["trans"]
-                cache_key = self._cache_key(text)
+                cache_key = self._cache_key(text, source_lang)
                 self._update_cache(cache_key, translated_text)
                 return translated_text
             else:
@@ -382,19 +885,19 @@ class Translator:
             print(f"Error during Google translation: {e}")
             return None
 
-    def _translate_with_microsoft(self, text):
+    def _translate_with_microsoft(self, text, source_lang=None):
         """Translate text using Microsoft Translator API"""
         try:
             base_url = "api.microsofttranslator.com/v2/Http.svc/Translate"
             params = {
                 "appId": "AFC76A66CF4F434ED080D245C30CF1E71C22959C",
-                "from": self.source_lang,
+                "from": self._source(source_lang),
                 "to": self.target_lang,
                 "text": text
             }
             
             print("\n发送Microsoft翻译API请求...")
-            response = requests.get(f"http://{base_url}", params=params, timeout=30)
+            response = self.http.get(f"http://{base_url}", params=params)
             print(f"API响应状态码: {response.status_code}")
             
             result = response.text
@@ -404,7 +907,7 @@ class Translator:
             # Response format: <string xmlns="http://schemas.microsoft.com/2003/10/Serialization/">translated_text</string>
             if result and "</string>" in result:
                 translated_text = result.split(">")[1].split("<")[0]
-                cache_key = self._cache_key(text)
+                cache_key = self._cache_key(text, source_lang)
                 self._update_cache(cache_key, translated_text)
                 return translated_text
             else:
@@ -415,7 +918,7 @@ class Translator:
             print(f"Error during Microsoft translation: {e}")
             return None
 
-    def _translate_with_kerten(self, text):
+    def _translate_with_kerten(self, text, source_lang=None):
         """Translate text using Kerten Translation API"""
         try:
             base_url = "api.kertennet.com/live/translate"
@@ -425,7 +928,7 @@ class Translator:
             }
             
             print("\n发送可腾翻译API请求...")
-            response = requests.get(f"http://{base_url}", params=params, timeout=30)
+            response = self.http.get(f"http://{base_url}", params=params)
             print(f"API响应状态码: {response.status_code}")
             
             result = response.json()
@@ -433,7 +936,7 @@ class Translator:
             
             if result.get("code") == 200 and "data" in result:
                 translated_text = result["data"]["target"]
-                cache_key = self._cache_key(text)
+                cache_key = self._cache_key(text, source_lang)
                 self._update_cache(cache_key, translated_text)
                 return translated_text
             else:
@@ -467,11 +970,77 @@ class Translator:
             return 'en'
         return lang
 
-    def translate(self, text):
+    def _translate_paragraphs(self, paragraphs, on_token=None, source_lang=None):
+        """Translate paragraphs concurrently, preserving their original order.
+
+        Cache hits are answered inline; only misses go through the bounded
+        worker pool. Failed paragraphs fall back to the source text. With
+        on_token, the joined translation is streamed in paragraph order.
+        """
+        results = list(paragraphs)
+        pending = []
+        stream = _OrderedTokenStream(len(paragraphs), on_token) if on_token else None
+        for i, paragraph in enumerate(paragraphs):
+            if not paragraph.strip():
+                if stream:
+                    stream.finish(i, paragraph)
+                continue
+            cached = self._lookup_cache(paragraph, source_lang)
+            if cached is not None:
+                results[i] = cached
+                if stream:
+                    stream.finish(i, cached)
+            else:
+                pending.append(i)
+
+        # 批量流式请求中已收到token的段落；回退逐段翻译时不再流式追加，避免界面上重复
+        streamed = set()
+
+        def run(i):
+            feed = (lambda token: stream.feed(i, token)) if stream and i not in streamed else None
+            translated_para = self.translate_text(paragraphs[i], on_token=feed, source_lang=source_lang)
+            # 如果翻译失败，保留原文
+            results[i] = translated_para or paragraphs[i]
+            if stream:
+                stream.finish(i, results[i])
+
+        print(f"检测到多段落文本: 共{len(paragraphs)}段，缓存命中{len(paragraphs) - len(pending)}段，待翻译{len(pending)}段")
+        if len(pending) > 1 and self._batch_mode_enabled():
+            on_batch_token = None
+            if stream:
+                # 流式输出时按编号标记拆分回复，各段token送到对应段落，标记本身不会出现在界面上
+                def on_batch_token(k, token):
+                    streamed.add(pending[k])
+                    stream.feed(pending[k], token)
+            batch = self._translate_batch_with_llm([paragraphs[i] for i in pending], source_lang,
+                                                   on_token=on_batch_token)
+            if batch is not None:
+                for i, translated_para in zip(pending, batch):
+                    results[i] = translated_para
+                    if stream:
+                        stream.finish(i, translated_para)
+                return results
+        if len(pending) == 1:
+            run(pending[0])
+        elif pending:
+            futures = {i: self._submit(run, i) for i in pending}
+            for i, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"段落{i+1}翻译出错: {e}")
+                    results[i] = paragraphs[i]
+                    if stream:
+                        stream.finish(i, results[i])
+        return results
+
+    def translate(self, text, on_token=None):
         """Translate text from source_lang to target_lang
         
         Args:
             text (str): The text to translate
+            on_token (callable, optional): Receives the translation incrementally
+                (see translate_text); paragraphs are streamed in order
             
         Returns:
             dict: Translation result with keys:
@@ -484,60 +1053,37 @@ class Translator:
                 return None
 
             # Auto-detect source language if configured
-            original_source = self.source_lang
-            effective_source = original_source
-            if str(original_source).lower() in {"auto", "detect", ""}:
-                effective_source = self._detect_language(text)
-            # Temporarily apply detected source for this translation
-            self.source_lang = effective_source
+            # 检测结果只作为参数向下传递，不改写 self.source_lang，避免并发调用互相串语言
+            effective_source = self._effective_source(text)
             
             # 检查是否含有多个段落
             has_paragraphs = "\n\n" in text
             
             if has_paragraphs:
-                # 处理多段落文本
-                print("检测到多段落文本，分段处理翻译...")
+                # 处理多段落文本：缓存命中直接返回，其余段落并发翻译
                 paragraphs = text.split("\n\n")
-                translated_paragraphs = []
-                
-                for i, paragraph in enumerate(paragraphs):
-                    print(f"翻译段落 {i+1}/{len(paragraphs)}: {paragraph[:50]}...")
-                    translated_para = self.translate_text(paragraph)
-                    if translated_para:
-                        translated_paragraphs.append(translated_para)
-                    else:
-                        # 如果翻译失败，保留原文
-                        translated_paragraphs.append(paragraph)
+                translated_paragraphs = self._translate_paragraphs(
+                    paragraphs, on_token=on_token, source_lang=effective_source)
                 
                 # 合并翻译后的段落，保留原始格式
                 translated_text = "\n\n".join(translated_paragraphs)
             else:
                 # 处理单段落文本
-                translated_text = self.translate_text(text)
+                translated_text = self.translate_text(text, on_token=on_token, source_lang=effective_source)
             
             if not translated_text:
                 print("翻译失败")
-                # restore before return
-                self.source_lang = original_source
                 return None
             
             # 返回翻译结果
-            result = {
+            return {
                 'translated_text': translated_text,
-                'source_lang': self.source_lang,
+                'source_lang': effective_source,
                 'target_lang': self.target_lang
             }
-            # restore original setting
-            self.source_lang = original_source
-            return result
         except Exception as e:
             self.translation_errors += 1
             print(f"翻译过程中发生错误: {str(e)}")
             import traceback
             traceback.print_exc()
-            # ensure restore
-            try:
-                self.source_lang = original_source
-            except Exception:
-                pass
             return None
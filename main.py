@@ -4,6 +4,8 @@ Main entry point for the OCR translator application.
 import sys
 import os
 import platform
+import time
+import multiprocessing
 from PIL import ImageGrab
 from PyQt5 import QtWidgets, QtGui, QtCore
 from PyQt5.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QAction, QStyle
@@ -16,11 +18,13 @@ from core.ocr_translator import OCRTranslator
 def register_hotkey(hotkeys, translator):
     """Register global hotkeys using Windows RegisterHotKey."""
     try:
-        # 1 = screenshot, 2 = AI 学习
+        # 1 = screenshot, 2 = AI 学习, 3 = 监视区域
         hotkeys.register(1, config.SCREENSHOT_HOTKEY, translator.start_translation)
         ai_hotkey = config.get('HOTKEYS', 'AI_STUDY_HOTKEY', 'ctrl+alt+x')
         hotkeys.register(2, ai_hotkey, translator.show_ai_study)
-        print(f"已注册全局热键: {config.SCREENSHOT_HOTKEY}，AI学习: {ai_hotkey}")
+        watch_hotkey = config.get('HOTKEYS', 'WATCH_HOTKEY', 'ctrl+alt+w')
+        hotkeys.register(3, watch_hotkey, translator.toggle_watch_region)
+        print(f"已注册全局热键: {config.SCREENSHOT_HOTKEY}，AI学习: {ai_hotkey}，监视区域: {watch_hotkey}")
     except Exception as e:
         print(f"注册系统热键失败: {e}")
 
@@ -34,6 +38,10 @@ def main():
     """
     Main function to start the OCR translator application.
     """
+    startup_begin = time.perf_counter()
+    phase_start = startup_begin
+    startup_timings = {}
+
     # 使用系统级热键，无需 keyboard 句柄
     # 创建 QApplication 实例
     app = QApplication(sys.argv)
@@ -42,8 +50,13 @@ def main():
     app.setApplicationName("OCR Translator")
     app.setQuitOnLastWindowClosed(False)  # 关闭窗口时不退出应用
     
-    # 创建 OCRTranslator 实例
+    startup_timings['qt_app'] = time.perf_counter() - phase_start
+    phase_start = time.perf_counter()
+
+    # 创建 OCRTranslator 实例（OCR引擎稍后在后台加载）
     translator = OCRTranslator()
+    startup_timings['translator'] = time.perf_counter() - phase_start
+    phase_start = time.perf_counter()
     
     # 提前定义变量，供后续闭包引用
     hotkeys = None
@@ -80,6 +93,14 @@ def main():
     translate_action.triggered.connect(translator.start_translation)
     menu.addAction(translate_action)
     
+    # 监视上一次选区（字幕模式），再次点击停止
+    watch_action = QAction("监视上次选区（字幕模式）")
+    watch_action.setCheckable(True)
+    watch_action.triggered.connect(translator.toggle_watch_region)
+    # 勾选状态跟随实际监视状态（托盘、热键或新截图都会改变它）
+    translator.signals.watch_state.connect(watch_action.setChecked)
+    menu.addAction(watch_action)
+    
     # 添加查看历史记录动作
     history_action = QAction("查看历史记录")
     history_action.triggered.connect(translator.show_history)
@@ -144,6 +165,22 @@ def main():
     # 设置托盘菜单
     tray_icon.setContextMenu(menu)
     tray_icon.show()
+    startup_timings['tray'] = time.perf_counter() - phase_start
+    startup_timings['total'] = time.perf_counter() - startup_begin
+    print("启动耗时: " + ", ".join(f"{name}={seconds:.2f}s" for name, seconds in startup_timings.items()))
+
+    # 托盘出现后再在后台加载OCR引擎；就绪前的截图会排队等待
+    tray_icon.setToolTip("OCR Translator（OCR引擎加载中…）")
+    translator.ocr_handler.start_background_init()
+
+    def ocr_ready_check():
+        if translator.ocr_handler.is_ready():
+            tray_icon.setToolTip("OCR Translator")
+            ocr_ready_timer.stop()
+
+    ocr_ready_timer = QTimer()
+    ocr_ready_timer.timeout.connect(ocr_ready_check)
+    ocr_ready_timer.start(500)
 
     # 到期提醒：每隔 20 分钟提示一次（仅当有到期且未显示窗口）
     def due_check():
@@ -186,4 +223,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 打包后的OCR工作进程需要
+    multiprocessing.freeze_support()
     main() 
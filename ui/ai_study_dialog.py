@@ -4,7 +4,7 @@ from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPlainTextEdit,
     QTextEdit, QPushButton, QMessageBox, QWidget, QSizePolicy, QSpacerItem
 )
-import requests
+from core.http_pool import get_shared_pool
 
 
 class _OllamaWorker(QThread):
@@ -41,7 +41,8 @@ class _OllamaWorker(QThread):
                 "stream": False,
             }
 
-            resp = requests.post(f"{self.host}/api/generate", json=payload, timeout=120)
+            # 复用翻译器的共享连接池（keep-alive）
+            resp = get_shared_pool().post(f"{self.host}/api/generate", json=payload, read_timeout=120)
             if resp.status_code != 200:
                 self.error.emit(f"请求失败: HTTP {resp.status_code} | {resp.text[:500]}")
                 return
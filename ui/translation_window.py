@@ -4,8 +4,8 @@ Translation window implementation for the OCR translator application.
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                            QLabel, QTextEdit, QPushButton, QFrame, QHBoxLayout, 
                            QStatusBar, QMessageBox, QShortcut)
-from PyQt5.QtCore import Qt, QPoint, QTimer, QPropertyAnimation
-from PyQt5.QtGui import QFont, QPalette, QColor, QKeySequence, QTextOption
+from PyQt5.QtCore import Qt, QPoint, QTimer, QPropertyAnimation, pyqtSignal
+from PyQt5.QtGui import QFont, QPalette, QColor, QKeySequence, QTextOption, QTextCursor
 
 import time
 try:
@@ -17,6 +17,9 @@ except Exception:
         AIStudyDialog = None
 
 class TranslationWindow(QMainWindow):
+    # 窗口关闭或隐藏（淡出/ESC/×）时发出，用于取消为本窗口准备的后台任务
+    closed = pyqtSignal()
+
     def __init__(self, translated_text, source_text, source_lang, target_lang, pos_x, pos_y, width, height, original_coords=None):
         super().__init__()
         self.translated_text = translated_text
@@ -298,11 +301,11 @@ class TranslationWindow(QMainWindow):
         lang_icon.setStyleSheet("font-size: 16px; padding: 0px;")
 
         # 添加语言标识
-        title_label = QLabel(f"{self.source_lang} → {self.target_lang}")
-        title_label.setObjectName("titleLabel")
+        self.title_label = QLabel(f"{self.source_lang} → {self.target_lang}")
+        self.title_label.setObjectName("titleLabel")
 
         title_layout.addWidget(lang_icon)
-        title_layout.addWidget(title_label)
+        title_layout.addWidget(self.title_label)
         title_layout.addStretch()
 
         # 添加最小化按钮
@@ -341,14 +344,7 @@ class TranslationWindow(QMainWindow):
         content_layout.addWidget(source_label)
 
         self.source_text_edit = QTextEdit()
-        # 保持段落格式，使用双换行符
-        if self.source_text and "\n\n" in self.source_text:
-            # 段落格式化文本 - 替换换行符为html格式
-            formatted_text = self.source_text.replace("\n\n", "</p><p>")
-            formatted_text = f"<p>{formatted_text}</p>"
-            self.source_text_edit.setHtml(formatted_text)
-        else:
-            self.source_text_edit.setPlainText(self.source_text if self.source_text else "")
+        self._render_source_text()
         self.source_text_edit.setReadOnly(True)
         self.source_text_edit.setMaximumHeight(130)
         self.source_text_edit.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
@@ -360,14 +356,9 @@ class TranslationWindow(QMainWindow):
         content_layout.addWidget(target_label)
 
         self.translated_text_edit = QTextEdit()
-        # 保持段落格式，使用双换行符
-        if self.translated_text and "\n\n" in self.translated_text:
-            # 段落格式化文本 - 替换换行符为html格式
-            formatted_text = self.translated_text.replace("\n\n", "</p><p>")
-            formatted_text = f"<p>{formatted_text}</p>"
-            self.translated_text_edit.setHtml(formatted_text)
-        else:
-            self.translated_text_edit.setPlainText(self.translated_text)
+        # 流式模式下窗口先于译文出现
+        self.translated_text_edit.setPlaceholderText("正在翻译…")
+        self._render_translated_text()
         self.translated_text_edit.setReadOnly(True)
         self.translated_text_edit.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
         content_layout.addWidget(self.translated_text_edit)
@@ -463,6 +454,51 @@ class TranslationWindow(QMainWindow):
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("")
 
+    def _render_source_text(self):
+        """按段落格式显示原文"""
+        # 保持段落格式，使用双换行符
+        if self.source_text and "\n\n" in self.source_text:
+            # 段落格式化文本 - 替换换行符为html格式
+            formatted_text = self.source_text.replace("\n\n", "</p><p>")
+            formatted_text = f"<p>{formatted_text}</p>"
+            self.source_text_edit.setHtml(formatted_text)
+        else:
+            self.source_text_edit.setPlainText(self.source_text if self.source_text else "")
+
+    def set_source_text(self, source_text):
+        """监视模式：原地更新原文"""
+        self.source_text = source_text or ""
+        self._render_source_text()
+
+    def _render_translated_text(self):
+        """按段落格式显示完整译文"""
+        # 保持段落格式，使用双换行符
+        if self.translated_text and "\n\n" in self.translated_text:
+            # 段落格式化文本 - 替换换行符为html格式
+            formatted_text = self.translated_text.replace("\n\n", "</p><p>")
+            formatted_text = f"<p>{formatted_text}</p>"
+            self.translated_text_edit.setHtml(formatted_text)
+        else:
+            self.translated_text_edit.setPlainText(self.translated_text)
+
+    def append_translation_chunk(self, token):
+        """流式翻译：把新到的token追加到译文末尾"""
+        if not token:
+            return
+        self.translated_text = (self.translated_text or "") + token
+        cursor = self.translated_text_edit.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(token)
+        self.translated_text_edit.ensureCursorVisible()
+
+    def finish_translation(self, translated_text, source_lang, target_lang):
+        """流式翻译结束：用最终译文替换增量内容并更新语言标识"""
+        self.translated_text = translated_text or ""
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.title_label.setText(f"{self.source_lang} → {self.target_lang}")
+        self._render_translated_text()
+
     def open_ai_study(self):
         try:
             # 复用全局 Translator 上的单例 AI学习 窗口
@@ -517,6 +553,12 @@ class TranslationWindow(QMainWindow):
         """鼠标离开窗口时的事件处理"""
         pass  # 不做任何处理，移除自动隐藏功能
     
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        # 关闭按钮/Esc 走 fade_out -> hide()，所以在这里发 closed；最小化也会触发 hideEvent，此时窗口仍在用，不发
+        if not self.isMinimized():
+            self.closed.emit()
+
     def fade_out(self):
         """淡出并隐藏窗口"""
         try:
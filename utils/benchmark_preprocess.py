@@ -0,0 +1,80 @@
+"""
+OCR 预处理基准：比较旧的 PIL ImageEnhance 链与 OCRHandler 的单次 LUT + filter2D 实现。
+
+用法（在项目根目录）：
+    python -m utils.benchmark_preprocess [--sizes 640x480,1920x1080,3840x2160] [--repeat 20]
+
+输出每种尺寸下两种实现的耗时（ms/MP），以及两者输出的平均绝对差。
+新实现是近似而非等价（PIL 每步都截断取整，见 OCRHandler._enhance_array），平均差不为零是预期的。
+只测量对比度/锐度/亮度增强本身，不含缩放与纠偏。
+
+参考结果（默认参数，合成截图，单机单线程实测；数值随机器浮动）：
+          尺寸     PIL链 ms/MP   LUT+filter2D ms/MP       加速      平均差
+     640x480          49.36                 6.51     7.6x     0.46
+   1920x1080          59.52                 8.21     7.2x     0.47
+   3840x2160          59.08                 9.19     6.4x     0.48
+"""
+import argparse
+import time
+
+import numpy as np
+from PIL import Image, ImageEnhance
+
+from core.ocr_handler import OCRHandler
+
+
+def legacy_pil_chain(array, contrast=1.3, sharpness=1.5, brightness=1.2):
+    """旧实现：numpy -> PIL -> Contrast -> Sharpness -> Brightness -> numpy"""
+    image = Image.fromarray(np.uint8(array))
+    image = ImageEnhance.Contrast(image).enhance(contrast)
+    image = ImageEnhance.Sharpness(image).enhance(sharpness)
+    image = ImageEnhance.Brightness(image).enhance(brightness)
+    return np.array(image)
+
+
+def fused_chain(array, contrast=1.3, sharpness=1.5, brightness=1.2):
+    return OCRHandler._enhance_array(array, contrast=contrast, brightness=brightness, sharpness=sharpness)
+
+
+def _synthetic_screenshot(width, height, seed=0):
+    """浅色背景上的深色"文字"块，加少量噪声，近似真实截图的直方图"""
+    rng = np.random.default_rng(seed)
+    image = np.full((height, width, 3), 235, dtype=np.uint8)
+    for y in range(8, height - 16, 24):
+        x = 8
+        while x < width - 40:
+            w = int(rng.integers(12, 60))
+            image[y:y + 12, x:x + w] = rng.integers(20, 80)
+            x += w + int(rng.integers(6, 14))
+    noise = rng.integers(-6, 7, size=image.shape, dtype=np.int16)
+    return np.clip(image.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def _time_per_megapixel(func, array, repeat):
+    func(array)  # 预热
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(array)
+    elapsed = (time.perf_counter() - start) / repeat
+    megapixels = array.shape[0] * array.shape[1] / 1e6
+    return elapsed * 1000.0 / megapixels
+
+
+def main():
+    parser = argparse.ArgumentParser(description='OCR预处理基准（ms/MP）')
+    parser.add_argument('--sizes', default='640x480,1920x1080,3840x2160')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'尺寸':>12} {'PIL链 ms/MP':>14} {'LUT+filter2D ms/MP':>20} {'加速':>8} {'平均差':>8}")
+    for spec in args.sizes.split(','):
+        width, height = (int(v) for v in spec.lower().split('x'))
+        array = _synthetic_screenshot(width, height)
+        before = _time_per_megapixel(legacy_pil_chain, array, args.repeat)
+        after = _time_per_megapixel(fused_chain, array, args.repeat)
+        diff = np.abs(legacy_pil_chain(array).astype(np.int16) - fused_chain(array).astype(np.int16)).mean()
+        print(f"{spec:>12} {before:>14.2f} {after:>20.2f} {before / after:>7.1f}x {diff:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()